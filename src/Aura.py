@@ -1,55 +1,119 @@
+from startup_trace import trace, Lazy
 import subprocess
 import os
 import sys
 import platform
-from dotenv import load_dotenv
-from openai import OpenAI
-import pyttsx3
-import speech_recognition as sr
 from datetime import date
 import time
 import webbrowser
 import datetime
+import asyncio
+import threading
 from threading import Thread
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 import urllib.parse
-import app
+with trace.span('import app (eel)'):
+    import app
+with trace.span('import aura modules'):
+    from dotenv import load_dotenv
+    from llm_client import default_client, sentence_chunks
+    from conversation_memory import ConversationMemory, LLMSummarizer
+    from response_cache import ResponseCache
+    from intent_router import aura_router
+    from speech_output import SpeechWorker, pyttsx3_engine
+    from speech_cache import SpeechCache
+    from voice_metrics import VoiceMetrics
+    from recognizers import RecognitionError, RecognitionTimeout, default_recognizer
+    from file_browser import FileBrowser, FileIndex, launch
 
 load_dotenv()
 
-# Initialize OpenAI client
-client = OpenAI()
-conversation_history = [
-    {"role": "system", "content": "You are a concise assistant. Respond in 1-2 lines (max 10 words) unless the user asks for details."}
-]
-
-# Voice engine
-engine = pyttsx3.init()
-voices = engine.getProperty('voices')
-engine.setProperty('voice', voices[1].id)
-engine.setProperty('rate', 190)
-engine.setProperty('volume', 0.7)
-
-# Recognizer
-r = sr.Recognizer()
-with sr.Microphone() as source:
-    r.energy_threshold = 500
-    r.dynamic_energy_threshold = False
-
-# OS-safe keyboard controller
-keyboard = None
-if platform.system() != "Linux":
+# Heavy subsystems (speech engine, microphone, recognizer, keyboard) are
+# built lazily or warmed up on background threads, so the chat window
+# shows and accepts typed input right away. See startup_trace.py.
+
+SYSTEM_PROMPT = "You are a concise assistant. Respond in 1-2 lines (max 10 words) unless the user asks for details."
+# Streaming chat client, OpenAI unless AURA_LLM_URL points to another endpoint
+llm = default_client()
+# Bounded history, older turns are summarized; the session resumes from the log.
+# Summaries get their own client, the chat replies are capped far below their length.
+SUMMARY_WORDS = 60
+memory = Lazy('conversation memory', lambda: ConversationMemory(
+    SYSTEM_PROMPT,
+    summarizer=LLMSummarizer(default_client(max_tokens=2 * SUMMARY_WORDS), words=SUMMARY_WORDS),
+    log_path=os.environ.get('AURA_SESSION_LOG', os.path.join(os.path.expanduser('~'), '.aura', 'conversation.jsonl'))
+)).warm()
+# Replies to repeated, context free questions
+response_cache = Lazy('response cache', lambda: ResponseCache(
+    os.path.join(os.path.expanduser('~'), '.aura', 'responses.jsonl'))).warm()
+cache_context = getattr(llm, 'model', '') + SYSTEM_PROMPT
+
+# Voice output, spoken on a worker thread so replies don't block the loop
+speech_cache = trace.call('load speech cache', SpeechCache)
+speech = SpeechWorker(lambda: trace.call('init tts engine', pyttsx3_engine, voice_index=1, rate=190, volume=0.7),
+                      cache=speech_cache)
+# Fixed replies, synthesized once in the background and played from disk after
+speech.warm((
+    "Good Morning!", "Good Afternoon!", "Good Evening!", "I am Aura, how may I help you?",
+    'My name is Aura!', 'Copied', 'Pasted', 'Reversed the changes', 'This is what I found',
+    'Which place are you looking for?', "Opening calculator.", "Opening Google Calendar.",
+    'Files in root directory:', 'Opened Successfully', 'Moved back', "File explorer closed.",
+    "Launched Successfully.", "Gesture recognition stopped.", "Good bye! Have a nice day.",
+    "Exit Successful", 'Sorry, I did not catch that',
+))
+
+# Per command stage latencies, on http://127.0.0.1:27006/metrics (AURA_METRICS_PORT=0 turns it off)
+metrics = VoiceMetrics(os.environ.get('AURA_TRACE_LOG'))
+metrics_port = int(os.environ.get('AURA_METRICS_PORT', '27006'))
+if metrics_port:
+    metrics.serve(metrics_port)
+
+# Voice input, set up by 'init_voice'
+recognizer = None
+capture = None
+wake_gate = None
+
+def init_voice():
+    """opens the microphone stream and loads the recognizer and wake word gate."""
+    global recognizer, capture, wake_gate, ACCEPT, REJECT
+    sr = trace.import_module('speech_recognition')
+    from audio_capture import AudioCapture, MicrophoneSource
+    from wake_word import ACCEPT, REJECT, WakeWordDetector
+    # Recognition backends (AURA_ASR) under a deadline, hedged at their p95, fed
+    # with utterances endpointed on one persistent microphone stream
+    recognizer = trace.call('load recognizers', default_recognizer, sr,
+                            on_latency=lambda name, ms, ok: metrics.record('asr_' + name, ms))
+    capture = AudioCapture(trace.call('open microphone', MicrophoneSource)).start()
+    # Local "aura" spotter in front of cloud recognition, None until templates are enrolled
+    wake_gate = trace.call('load wake word', WakeWordDetector.from_directory)
+    if wake_gate is None:
+        print("[Aura] no wake word templates, every utterance goes to recognition "
+              "(enroll with: python wake_word.py enroll FILE.wav ...)")
+    return capture
+
+voice = Lazy('voice input', init_voice).warm()
+
+def init_keyboard():
+    """returns OS-safe keyboard controller, None where unsupported."""
+    if platform.system() == "Linux":
+        return None
     try:
-        from pynput.keyboard import Key, Controller
-        keyboard = Controller()
+        from pynput.keyboard import Controller
+        return Controller()
     except ImportError:
-        keyboard = None
+        return None
+
+keyboard = Lazy('keyboard', init_keyboard)
+
+# Voice file explorer, the filename index for "open <name>" is built from home
+browser = Lazy('file browser', lambda: FileBrowser(
+    index=FileIndex(os.path.expanduser('~')).start())).warm()
 
 # Variables
 today = date.today()
 file_exp_status = False
-files = []
-path = ''
 is_awake = True
+pending_answer = None  # Future set while a command waits for a spoken answer
 contacts = {
     "sagar": "916392608363",
     "mummy": "918840357683",
@@ -60,8 +124,7 @@ contacts = {
 def reply(audio):
     app.ChatBot.addAppMsg(audio)
     print(audio)
-    engine.say(audio)
-    engine.runAndWait()
+    speech.say(audio, on_start=metrics.replying())
 
 def wish():
     hour = int(datetime.datetime.now().hour)
@@ -73,36 +136,80 @@ def wish():
         reply("Good Evening!")
     reply("I am Aura, how may I help you?")
 
-def get_conversational_response(user_input):
-    conversation_history.append({"role": "user", "content": user_input})
+def reply_stream(chunks):
+    """speaks and shows every chunk as it arrives, returns seconds to the first one."""
+    start = time.perf_counter()
+    first_audio = None
+    for chunk in chunks:
+        if first_audio is None:
+            first_audio = time.perf_counter() - start
+            metrics.add('llm_first', first_audio * 1000.0)
+            print(f"[Aura] time to first audio: {first_audio * 1000:.0f}ms")
+        reply(chunk)
+    return first_audio
+
+def stream_conversational_response(user_input):
+    """yields the assistant reply sentence by sentence while it is generated."""
+    cached = response_cache.get().get(user_input, cache_context)
+    if cached is not None:
+        yield from sentence_chunks([cached])
+        memory.get().add_turn(user_input, cached)
+        return
+    parts = []
+    complete = True
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=conversation_history,
-            max_tokens=30,
-            temperature=0.7,
-            store=True
-        )
-        assistant_reply = completion.choices[0].message.content.strip()
-        conversation_history.append({"role": "assistant", "content": assistant_reply})
-        return assistant_reply
+        for chunk in sentence_chunks(llm.stream(memory.get().messages(user_input))):
+            parts.append(chunk)
+            yield chunk
     except Exception as e:
         print("ChatGPT API Error:", e)
-        return "I'm sorry, I couldn't process that."
+        complete = False
+        if not parts:
+            yield "I'm sorry, I couldn't process that."
+    if parts:
+        response = " ".join(parts)
+        memory.get().add_turn(user_input, response)
+        if complete:
+            response_cache.get().put(user_input, response, cache_context)
 
-def record_audio():
-    with sr.Microphone() as source:
-        r.pause_threshold = 0.8
-        voice_data = ''
-        audio = r.listen(source, phrase_time_limit=5)
-        try:
-            voice_data = r.recognize_google(audio)
-        except sr.RequestError:
-            reply('Sorry, check your Internet connection')
-        except sr.UnknownValueError:
+def get_conversational_response(user_input):
+    return " ".join(stream_conversational_response(user_input))
+
+def record_audio(timeout=0.5, gated=True):
+    """
+    returns (transcript, voice_metrics.Trace) of the next utterance, ('', None)
+    if none within 'timeout'. With 'gated', utterances without the wake word
+    are dropped before recognition, unless the wake word gate is unsure.
+    """
+    utterance = capture.get(timeout)
+    if utterance is None:
+        return '', None
+    timing = metrics.trace('voice', utterance.detected)
+    woken = False
+    if gated and wake_gate is not None:
+        with timing.span('wake'):
+            decision = wake_gate.gate(utterance)
+        if decision == REJECT:
+            return '', None
+        # unsure ones are recognized and kept only if the transcript has "aura"
+        woken = decision == ACCEPT
+    voice_data = ''
+    try:
+        with timing.span('recognize'):
+            voice_data = recognizer.recognize(utterance).text
+        if not voice_data:
             print('Unrecognized speech')
-            pass
-        return voice_data.lower()
+    except RecognitionTimeout as e:
+        print('[Aura] recognition:', e)
+        reply('Sorry, I did not catch that')
+    except RecognitionError as e:
+        print('[Aura] recognition:', e)
+        reply('Sorry, check your Internet connection')
+    voice_data = voice_data.lower()
+    if woken and voice_data and 'aura' not in voice_data:
+        # heard locally, the transcript may spell it differently
+        voice_data = 'aura ' + voice_data
+    return voice_data, timing
 
 def open_calculator():
     try:
@@ -131,199 +238,342 @@ def open_whatsapp_chat(contact_name):
     else:
         reply(f"No contact info for {contact_name}.")
 
-def respond(voice_data):
-    global file_exp_status, files, is_awake, path
-    print(voice_data)
-    voice_data = voice_data.replace('aura', '').strip()
-    app.eel.addUserMsg(voice_data)
+# Command handlers, called by the intent router with the 'Match'
+def on_wake(match):
+    global is_awake
+    is_awake = True
+    wish()
 
-    if not is_awake:
-        if 'wake up' in voice_data:
-            is_awake = True
-            wish()
-        return
+def on_name(match):
+    reply('My name is Aura!')
 
-    if 'hello' in voice_data:
-        wish()
+def on_date(match):
+    reply(today.strftime("%B %d, %Y"))
 
-    elif 'what is your name' in voice_data:
-        reply('My name is Aura!')
+def on_time(match):
+    reply(str(datetime.datetime.now()).split(" ")[1].split('.')[0])
 
-    elif 'date' in voice_data:
-        reply(today.strftime("%B %d, %Y"))
-
-    elif 'time' in voice_data:
-        reply(str(datetime.datetime.now()).split(" ")[1].split('.')[0])
-
-    elif 'search' in voice_data:
-        query = voice_data.split('search')[-1].strip()
-        reply(f'Searching for {query}')
-        url = f'https://google.com/search?q={query}'
+def on_search(match):
+    query = match.arg
+    reply(f'Searching for {query}')
+    url = f'https://google.com/search?q={urllib.parse.quote(query)}'
+    try:
+        webbrowser.open(url)
+        reply('This is what I found')
+    except:
+        reply('Please check your Internet')
+
+def listen_for_answer(timeout=8):
+    """
+    returns the next spoken transcript, taken ahead of the command queue,
+    None (after telling the user) if there is no voice input.
+    """
+    global pending_answer
+    try:
+        voice.get()
+    except Exception:
+        # typed input only, see 'listen_loop'
+        reply("Voice input is unavailable, I can't listen for an answer.")
+        return None
+    # don't record our own question
+    speech.wait(5)
+    capture.clear()
+    pending_answer = Future()
+    try:
+        return pending_answer.result(timeout)
+    except FutureTimeout:
+        return ''
+    finally:
+        pending_answer = None
+
+def on_location(match):
+    reply('Which place are you looking for?')
+    temp_audio = listen_for_answer()
+    if temp_audio is None:
+        return
+    if temp_audio:
+        encoded_location = urllib.parse.quote(temp_audio)
+        url = f'https://www.google.com/maps/place/{encoded_location}'
         try:
             webbrowser.open(url)
-            reply('This is what I found')
+            reply(f'This is what I found for "{temp_audio}"')
         except:
-            reply('Please check your Internet')
-
-    elif 'location' in voice_data:
-        reply('Which place are you looking for?')
-        temp_audio = record_audio()
-        if temp_audio:
-            encoded_location = urllib.parse.quote(temp_audio)
-            url = f'https://www.google.com/maps/place/{encoded_location}'
-            try:
-                webbrowser.open(url)
-                reply(f'This is what I found for "{temp_audio}"')
-            except:
-                reply('Error opening location. Check your internet.')
-        else:
-            reply('I couldn’t understand the location.')
-
-    elif 'copy' in voice_data and keyboard:
-        with keyboard.pressed(Key.ctrl):
-            keyboard.press('c')
-            keyboard.release('c')
-        reply('Copied')
-
-    elif 'undo' in voice_data and keyboard:
-        with keyboard.pressed(Key.ctrl):
-            keyboard.press('z')
-            keyboard.release('z')
-        reply('Reversed the changes')
-
-    elif ('paste' in voice_data or 'pest' in voice_data or 'page' in voice_data) and keyboard:
-        with keyboard.pressed(Key.ctrl):
-            keyboard.press('v')
-            keyboard.release('v')
-        reply('Pasted')
-
-    elif ('copy' in voice_data or 'undo' in voice_data or 'paste' in voice_data) and not keyboard:
+            reply('Error opening location. Check your internet.')
+    else:
+        reply('I couldn’t understand the location.')
+
+def keyboard_shortcut(key, message):
+    controller = keyboard.get()
+    if not controller:
         reply("Keyboard control not supported on this platform.")
+        return
+    from pynput.keyboard import Key
+    with controller.pressed(Key.ctrl):
+        controller.press(key)
+        controller.release(key)
+    reply(message)
 
-    elif 'list' in voice_data:
-        counter = 0
-        path = 'C://'
-        files = os.listdir(path)
-        filestr = ""
-        for f in files:
-            counter += 1
-            print(f"{counter}:  {f}")
-            filestr += f"{counter}:  {f}<br>"
-        file_exp_status = True
-        reply('Files in root directory:')
-        app.ChatBot.addAppMsg(filestr)
-
-    elif file_exp_status:
-        counter = 0
-        if 'open' in voice_data:
-            try:
-                file_index = int(voice_data.split(' ')[-1]) - 1
-                target_path = os.path.join(path, files[file_index])
-                if os.path.isfile(target_path):
-                    os.startfile(target_path)
-                else:
-                    path = os.path.join(path, files[file_index]) + '//'
-                    files = os.listdir(path)
-                    filestr = ""
-                    for f in files:
-                        counter += 1
-                        filestr += f"{counter}:  {f}<br>"
-                    reply('Opened Successfully')
-                    app.ChatBot.addAppMsg(filestr)
-            except:
-                reply("Invalid number or path error.")
-        elif 'back' in voice_data:
-            if path == 'C://':
-                reply('Root directory reached')
-            else:
-                path = '//'.join(path.split('//')[:-2]) + '//'
-                files = os.listdir(path)
-                filestr = ""
-                for f in files:
-                    counter += 1
-                    filestr += f"{counter}:  {f}<br>"
-                reply('Moved back')
-                app.ChatBot.addAppMsg(filestr)
-        elif 'close' in voice_data:
-            file_exp_status = False
-            reply("File explorer closed.")
-
-    elif 'open calculator' in voice_data:
-        open_calculator()
-
-    elif 'open calendar' in voice_data:
-        open_calendar()
-
-    elif 'open whatsapp chat' in voice_data:
-        if "of" in voice_data:
-            open_whatsapp_chat(voice_data.split("of")[-1].strip())
-        elif "for" in voice_data:
-            open_whatsapp_chat(voice_data.split("for")[-1].strip())
-        else:
-            reply("Please specify the contact name.")
+def show_files():
+    app.ChatBot.addAppMsg(browser.get().render())
 
-    elif 'launch gesture recognition' in voice_data:
-        try:
-            from Gesture_Controller import has_display, GestureController
-            if not has_display:
-                reply("Gesture recognition is not supported in this environment.")
-            elif GestureController.gc_mode:
-                reply("Gesture recognition is already active.")
-            else:
-                gc = GestureController()
-                t = Thread(target=gc.start)
-                t.start()
-                reply("Launched Successfully.")
-        except Exception as e:
-            print("Error launching gesture recognition:", e)
-            reply("Failed to launch gesture recognition.")
-
-    elif 'stop gesture recognition' in voice_data:
-        try:
-            from Gesture_Controller import GestureController
-            if GestureController.gc_mode:
-                GestureController.gc_mode = 0
-                reply("Gesture recognition stopped.")
-            else:
-                reply("Gesture recognition is already inactive.")
-        except Exception as e:
-            print("Error stopping gesture recognition:", e)
-            reply("Failed to stop gesture recognition.")
-
-    elif 'bye' in voice_data or 'sleep' in voice_data:
-        reply("Good bye! Have a nice day.")
-        is_awake = False
-
-    elif 'exit' in voice_data or 'terminate' in voice_data:
-        app.ChatBot.close()
-        sys.exit()
+def on_list(match):
+    global file_exp_status
+    try:
+        browser.get().open()
+    except OSError:
+        reply("I couldn't read the files.")
+        return
+    file_exp_status = True
+    reply('Files in root directory:')
+    show_files()
 
+def on_file_open(match):
+    files = browser.get()
+    try:
+        entry, exact = files.resolve(match.arg)
+        if entry is None:
+            reply("Invalid number or path error.")
+        elif entry.is_dir:
+            files.open(entry.path)
+            reply('Opened Successfully')
+            show_files()
+        elif exact:
+            launch(entry.path)
+            reply(f"Opening {entry.name}")
+        else:
+            # misheard or elsewhere under home, never launched without a pick
+            reply(f"Did you mean {entry.name}? Say open and the number.")
+            app.ChatBot.addAppMsg(files.render_candidates())
+    except OSError:
+        reply("Invalid number or path error.")
+
+def on_file_back(match):
+    files = browser.get()
+    try:
+        moved = files.back()
+    except OSError:
+        reply("Invalid number or path error.")
+        return
+    if not moved:
+        reply('Root directory reached')
     else:
-        response = get_conversational_response(voice_data)
-        reply(response)
+        reply('Moved back')
+        show_files()
 
-# --- Main Driver ---
-t1 = Thread(target=app.ChatBot.start)
-t1.daemon = True
-t1.start()
+def on_file_next(match):
+    if browser.get().next_page():
+        show_files()
+    else:
+        reply('Last page reached')
 
-while not app.ChatBot.started:
-    time.sleep(0.5)
+def on_file_previous(match):
+    if browser.get().previous_page():
+        show_files()
+    else:
+        reply('First page reached')
 
-wish()
+def on_file_close(match):
+    global file_exp_status
+    file_exp_status = False
+    reply("File explorer closed.")
 
-while True:
-    if app.ChatBot.isUserInput():
-        voice_data = app.ChatBot.popUserInput()
+def on_whatsapp(match):
+    if match.arg:
+        open_whatsapp_chat(match.arg)
     else:
-        voice_data = record_audio()
+        reply("Please specify the contact name.")
+
+def on_gesture_start(match):
+    try:
+        from Gesture_Controller import has_display, GestureController
+        if not has_display:
+            reply("Gesture recognition is not supported in this environment.")
+        elif GestureController.gc_mode:
+            reply("Gesture recognition is already active.")
+        else:
+            gc = GestureController()
+            t = Thread(target=gc.start)
+            t.start()
+            reply("Launched Successfully.")
+    except Exception as e:
+        print("Error launching gesture recognition:", e)
+        reply("Failed to launch gesture recognition.")
+
+def on_gesture_stop(match):
+    try:
+        from Gesture_Controller import GestureController
+        if GestureController.gc_mode:
+            GestureController.gc_mode = 0
+            reply("Gesture recognition stopped.")
+        else:
+            reply("Gesture recognition is already inactive.")
+    except Exception as e:
+        print("Error stopping gesture recognition:", e)
+        reply("Failed to stop gesture recognition.")
+
+def on_sleep(match):
+    global is_awake
+    reply("Good bye! Have a nice day.")
+    is_awake = False
+
+def on_exit(match):
+    app.ChatBot.close()
+    memory.get().close()
+    response_cache.get().close()
+    sys.exit()
+
+router = aura_router({
+    'wake': on_wake,
+    'hello': lambda match: wish(),
+    'name': on_name,
+    'date': on_date,
+    'time': on_time,
+    'search': on_search,
+    'location': on_location,
+    'copy': lambda match: keyboard_shortcut('c', 'Copied'),
+    'undo': lambda match: keyboard_shortcut('z', 'Reversed the changes'),
+    'paste': lambda match: keyboard_shortcut('v', 'Pasted'),
+    'list': on_list,
+    'file_open': on_file_open,
+    'file_back': on_file_back,
+    'file_next': on_file_next,
+    'file_previous': on_file_previous,
+    'file_close': on_file_close,
+    'calculator': lambda match: open_calculator(),
+    'calendar': lambda match: open_calendar(),
+    'whatsapp': on_whatsapp,
+    'gesture_start': on_gesture_start,
+    'gesture_stop': on_gesture_stop,
+    'sleep': on_sleep,
+    'exit': on_exit,
+})
 
-    if voice_data and 'aura' in voice_data:
+def respond(voice_data):
+    print(voice_data)
+    voice_data = voice_data.replace('aura', '').strip()
+    app.ChatBot.addUserMsg(voice_data)
+
+    if not is_awake:
+        # only waking up is handled while asleep
+        match = router.route(voice_data, ('asleep',))
+        if match is not None and match.name == 'wake':
+            on_wake(match)
+        return
+
+    with metrics.span('route'):
+        match = router.route(voice_data, ('files',) if file_exp_status else ())
+    if match is None:
+        with metrics.span('llm'):
+            reply_stream(stream_conversational_response(voice_data))
+    elif match.intent.handler is not None:
+        with metrics.span('handler'):
+            match.intent.handler(match)
+
+# --- Main Driver ---
+# An asyncio loop is the core: typed input (eel callback) and recognized
+# speech (listener thread) are posted to one queue, and every command is
+# dispatched as a task onto a single worker thread, so commands stay
+# ordered while the loop keeps taking input.
+command_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aura-command')
+stopped = threading.Event()
+loop_stats = {'inputs': 0, 'dispatch_ms': 0.0, 'max_dispatch_ms': 0.0}
+
+def listen_loop(loop, inputs):
+    """recognizes speech on a thread and posts transcripts to the loop."""
+    try:
+        voice.get()
+    except Exception as e:
+        print("[Aura] voice input unavailable, typed input only:", e)
+        return
+    if trace.enabled:
+        trace.print_report()
+    while not stopped.is_set():
+        answer = pending_answer
+        voice_data, timing = record_audio(gated=answer is None)
+        if not voice_data:
+            continue
+        if answer is not None and not answer.done():
+            answer.set_result(voice_data)
+            continue
+        if speech.speaking and speech.is_echo(voice_data):
+            # the microphone picked up Aura's own voice
+            continue
+        timing.posted = time.perf_counter()
+        loop.call_soon_threadsafe(inputs.put_nowait, (timing, voice_data))
+
+def run_command(timing, voice_data):
+    delay = (time.perf_counter() - timing.posted) * 1000.0
+    loop_stats['inputs'] += 1
+    loop_stats['dispatch_ms'] += (delay - loop_stats['dispatch_ms']) / loop_stats['inputs']
+    loop_stats['max_dispatch_ms'] = max(loop_stats['max_dispatch_ms'], delay)
+    with metrics.command(timing):
+        respond(voice_data)
+
+async def dispatch(timing, voice_data):
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(command_executor, run_command, timing, voice_data)
+    except SystemExit:
+        reply("Exit Successful")
+        stopped.set()
+    except Exception as e:
+        print("Exception raised while closing:", e)
+        stopped.set()
+
+async def heartbeat():
+    """lets the speech worker measure loop responsiveness while speaking."""
+    while not stopped.is_set():
+        speech.tick()
+        await asyncio.sleep(0.05)
+
+async def main():
+    loop = asyncio.get_running_loop()
+    inputs = asyncio.Queue()
+
+    def on_typed(msg):
+        # typed input interrupts Aura while it is speaking
+        speech.interrupt()
+        timing = metrics.trace('typed')
+        timing.posted = timing.start
+        loop.call_soon_threadsafe(inputs.put_nowait, (timing, msg))
+
+    app.ChatBot.on_input = on_typed
+    Thread(target=app.ChatBot.start, daemon=True).start()
+    await loop.run_in_executor(None, app.ChatBot.ready.wait)
+    print("[Aura] chat window ready in {:.0f}ms".format(trace.mark('chat window ready')))
+
+    wish()
+    Thread(target=listen_loop, args=(loop, inputs), daemon=True).start()
+    tasks = {loop.create_task(heartbeat())}
+    while not stopped.is_set():
         try:
-            respond(voice_data)
-        except SystemExit:
-            reply("Exit Successful")
-            break
-        except Exception as e:
-            print("Exception raised while closing:", e)
-            break
+            timing, voice_data = await asyncio.wait_for(inputs.get(), 0.5)
+        except asyncio.TimeoutError:
+            continue
+        if voice_data and 'aura' in voice_data:
+            # barge-in, new command cancels what is being said
+            speech.interrupt()
+            task = loop.create_task(dispatch(timing, voice_data))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+
+asyncio.run(main())
+
+command_executor.shutdown(wait=False)
+speech.close()
+print("[Aura] speech:", speech.report())
+print("[Aura] speech cache:", speech_cache.report())
+print("[Aura] commands:", loop_stats)
+print("[Aura] chat window:", app.ChatBot.report())
+print("[Aura] traces:", metrics.report())
+if recognizer is not None:
+    print("[Aura] recognition:", recognizer.report())
+    recognizer.close()
+metrics.print_report()
+metrics.close()
+if capture is not None:
+    capture.close()
+    print("[Aura] capture:", capture.report())
+if wake_gate is not None:
+    print("[Aura] wake word:", wake_gate.report())
@@ -5,497 +5,1005 @@
 
 import os
 import math
+import time
 from enum import IntEnum
+from itertools import chain
+from operator import attrgetter
+import numpy as np
 
 # Check for GUI environment
 has_display = 'DISPLAY' in os.environ or os.name == 'nt'
 
 # Imports that work in both GUI and headless environments
-from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-import screen_brightness_control as sbcontrol
-
-if has_display:
-    import pyautogui
-    import cv2
-    import mediapipe as mp
-    import time
-    import numpy as np
-    from google.protobuf.json_format import MessageToDict
-    class GestureController:
-        gc_mode = 0
-
-        def __init__(self):
-            self.cap = cv2.VideoCapture(0)
-            self.hands = mp.solutions.hands.Hands()
-            self.prev_time = time.time()
-
-        def start(self):
-            GestureController.gc_mode = 1
-            print("Gesture recognition started")
-            while GestureController.gc_mode and self.cap.isOpened():
-                ret, frame = self.cap.read()
-                if not ret:
-                    break
-                # Gesture processing here (omitted for brevity)
-                time.sleep(0.05)
-            self.cap.release()
-            print("Gesture recognition stopped")
+from gesture_actuation import (Actuator, LevelActuator, default_injector,
+                               default_volume_backend, default_brightness_backend)
+from gesture_filters import CursorFilter
+from startup_trace import trace
+
+_xyz = attrgetter('x', 'y', 'z')
+
+# Gesture Encodings
+class Gest(IntEnum):
+    # Binary Encoded
+    """
+    Enum for mapping all hand gesture to binary number.
+    """
+    FIST = 0
+    PINKY = 1
+    RING = 2
+    MID = 4
+    LAST3 = 7
+    INDEX = 8
+    FIRST2 = 12
+    LAST4 = 15
+    THUMB = 16    
+    PALM = 31
+    
+    # Extra Mappings
+    V_GEST = 33
+    TWO_FINGER_CLOSED = 34
+    PINCH_MAJOR = 35
+    PINCH_MINOR = 36
+
+# Multi-handedness Labels
+class HLabel(IntEnum):
+    MINOR = 0
+    MAJOR = 1
+
+# Convert Mediapipe Landmarks to recognizable Gestures
+class HandRecog:
+    """
+    Convert Mediapipe Landmarks to recognizable Gestures.
+    """
+    
+    # Landmark index pairs used by 'set_finger_state', evaluated in one batch.
+    # Rows 0-3: finger tip -> middle knuckle, rows 4-7: middle knuckle -> wrist
+    # for index, middle, ring and pinky finger.
+    # Row 8: index tip -> thumb tip (pinch), rows 9-10: index tip -> middle tip
+    # and index base -> middle base (V gesture ratio).
+    PAIR_A = np.array([8, 12, 16, 20, 5, 9, 13, 17, 8, 8, 5])
+    PAIR_B = np.array([5, 9, 13, 17, 0, 0, 0, 0, 4, 12, 9])
+    # PAIR_DIFF @ landmarks gives landmarks[PAIR_A] - landmarks[PAIR_B]
+    # for all pairs in a single matrix product.
+    PAIR_DIFF = np.zeros((len(PAIR_A), 21), dtype=np.float32)
+    PAIR_DIFF[np.arange(len(PAIR_A)), PAIR_A] += 1
+    PAIR_DIFF[np.arange(len(PAIR_B)), PAIR_B] -= 1
+    FINGER_BITS = np.array([8, 4, 2, 1])
+
+    def __init__(self, hand_label):
+        """
+        Constructs all the necessary attributes for the HandRecog object.
 
+        Parameters
+        ----------
+            finger : int
+                Represent gesture corresponding to Enum 'Gest',
+                stores computed gesture for current frame.
+            ori_gesture : int
+                Represent gesture corresponding to Enum 'Gest',
+                stores gesture being used.
+            prev_gesture : int
+                Represent gesture corresponding to Enum 'Gest',
+                stores gesture computed for previous frame.
+            frame_count : int
+                total no. of frames since 'ori_gesture' is updated.
+            hand_result : Object
+                Landmarks obtained from mediapipe.
+            landmarks : ndarray
+                (21,3) float32 copy of 'hand_result', refreshed once per frame.
+            pinch_dist : float
+                distance between index tip and thumb tip.
+            v_ratio : float
+                ratio of index/middle tip distance to index/middle base distance.
+            dz : float
+                absolute difference on z-axis between index tip and middle tip.
+            hand_label : int
+                Represents multi-handedness corresponding to Enum 'HLabel'.
+        """
 
-    pyautogui.FAILSAFE = False
-    mp_drawing = mp.solutions.drawing_utils
-    mp_hands = mp.solutions.hands
+        self.finger = 0
+        self.ori_gesture = Gest.PALM
+        self.prev_gesture = Gest.PALM
+        self.frame_count = 0
+        self.hand_result = None
+        self.landmarks = np.zeros((21, 3), dtype=np.float32)
+        self.pinch_dist = 0.0
+        self.v_ratio = 0.0
+        self.dz = 0.0
+        self.hand_label = hand_label
+
+    @staticmethod
+    def landmarks_to_array(hand_result, out=None):
+        """
+        returns (21,3) float32 array of x, y, z for mediapipe landmarks.
 
-    # Gesture Encodings
-    class Gest(IntEnum):
-        # Binary Encoded
+        Parameters
+        ----------
+        hand_result : Object
+            Landmarks obtained from mediapipe, or an array of shape (21,3).
+        out : ndarray, optional
+            preallocated (21,3) float32 array to fill.
+
+        Returns
+        -------
+        ndarray
         """
-        Enum for mapping all hand gesture to binary number.
+        if out is None:
+            out = np.empty((21, 3), dtype=np.float32)
+        if isinstance(hand_result, np.ndarray):
+            out[:] = hand_result
+        else:
+            out.reshape(-1)[:] = np.fromiter(
+                chain.from_iterable(map(_xyz, hand_result.landmark)), np.float32, 63)
+        return out
+
+    def update_hand_result(self, hand_result):
+        self.hand_result = hand_result
+        if hand_result is not None:
+            HandRecog.landmarks_to_array(hand_result, self.landmarks)
+
+    def get_signed_dist(self, point):
         """
-        FIST = 0
-        PINKY = 1
-        RING = 2
-        MID = 4
-        LAST3 = 7
-        INDEX = 8
-        FIRST2 = 12
-        LAST4 = 15
-        THUMB = 16    
-        PALM = 31
+        returns signed euclidean distance between 'point'.
+
+        Parameters
+        ----------
+        point : list containing two elements of type list/tuple which represents 
+            landmark point.
         
-        # Extra Mappings
-        V_GEST = 33
-        TWO_FINGER_CLOSED = 34
-        PINCH_MAJOR = 35
-        PINCH_MINOR = 36
-
-    # Multi-handedness Labels
-    class HLabel(IntEnum):
-        MINOR = 0
-        MAJOR = 1
-
-    # Convert Mediapipe Landmarks to recognizable Gestures
-    class HandRecog:
+        Returns
+        -------
+        float
         """
-        Convert Mediapipe Landmarks to recognizable Gestures.
+        a = self.landmarks[point[0]]
+        b = self.landmarks[point[1]]
+        sign = 1 if a[1] < b[1] else -1
+        return math.hypot(a[0] - b[0], a[1] - b[1]) * sign
+    
+    def get_dist(self, point):
         """
-        
-        def __init__(self, hand_label):
-            """
-            Constructs all the necessary attributes for the HandRecog object.
+        returns euclidean distance between 'point'.
 
-            Parameters
-            ----------
-                finger : int
-                    Represent gesture corresponding to Enum 'Gest',
-                    stores computed gesture for current frame.
-                ori_gesture : int
-                    Represent gesture corresponding to Enum 'Gest',
-                    stores gesture being used.
-                prev_gesture : int
-                    Represent gesture corresponding to Enum 'Gest',
-                    stores gesture computed for previous frame.
-                frame_count : int
-                    total no. of frames since 'ori_gesture' is updated.
-                hand_result : Object
-                    Landmarks obtained from mediapipe.
-                hand_label : int
-                    Represents multi-handedness corresponding to Enum 'HLabel'.
-            """
+        Parameters
+        ----------
+        point : list containing two elements of type list/tuple which represents 
+            landmark point.
+        
+        Returns
+        -------
+        float
+        """
+        a = self.landmarks[point[0]]
+        b = self.landmarks[point[1]]
+        return math.hypot(a[0] - b[0], a[1] - b[1])
+    
+    def get_dz(self,point):
+        """
+        returns absolute difference on z-axis between 'point'.
 
-            self.finger = 0
-            self.ori_gesture = Gest.PALM
-            self.prev_gesture = Gest.PALM
-            self.frame_count = 0
-            self.hand_result = None
-            self.hand_label = hand_label
+        Parameters
+        ----------
+        point : list containing two elements of type list/tuple which represents 
+            landmark point.
         
-        def update_hand_result(self, hand_result):
-            self.hand_result = hand_result
+        Returns
+        -------
+        float
+        """
+        return abs(float(self.landmarks[point[0], 2] - self.landmarks[point[1], 2]))
+    
+    @staticmethod
+    def finger_features(landmarks):
+        """
+        returns (finger, dist, dz) for landmarks of shape (21, 3).
 
-        def get_signed_dist(self, point):
-            """
-            returns signed euclidean distance between 'point'.
+        'finger' is the finger state encoding, 'dist' holds the distances for
+        every 'PAIR_A' / 'PAIR_B' pair, 'dz' is the absolute z difference
+        between index tip and middle tip.
 
-            Parameters
-            ----------
-            point : list containing two elements of type list/tuple which represents 
-                landmark point.
-            
-            Returns
-            -------
-            float
-            """
-            sign = -1
-            if self.hand_result.landmark[point[0]].y < self.hand_result.landmark[point[1]].y:
-                sign = 1
-            dist = (self.hand_result.landmark[point[0]].x - self.hand_result.landmark[point[1]].x)**2
-            dist += (self.hand_result.landmark[point[0]].y - self.hand_result.landmark[point[1]].y)**2
-            dist = math.sqrt(dist)
-            return dist*sign
+        Returns
+        -------
+        tuple of ndarray
+        """
+        delta = HandRecog.PAIR_DIFF @ landmarks
+        dist = np.hypot(delta[..., 0], delta[..., 1])
+        # positive when the first point of the pair is above the second one
+        signed = np.copysign(dist, -delta[..., 1])
+
+        base = signed[..., 4:8]
+        base = np.where(base == 0, 0.01, base)
+        ratio = np.round(signed[..., :4] / base, 1)
+        # thumb is always reported closed
+        finger = (ratio > 0.5) @ HandRecog.FINGER_BITS
+        return finger, dist, np.abs(delta[..., 9, 2])
+
+    # Function to find Gesture Encoding using current finger_state.
+    # Finger_state: 1 if finger is open, else 0
+    def set_finger_state(self):
+        """
+        set 'finger' by computing ratio of distance between finger tip 
+        , middle knuckle, base knuckle.
+        Also sets 'pinch_dist', 'v_ratio' and 'dz' used by 'get_gesture',
+        all from a single batched evaluation over 'PAIR_A' / 'PAIR_B'.
+
+        Returns
+        -------
+        None
+        """
+        if self.hand_result is None:
+            return
+
+        finger, dist, dz = HandRecog.finger_features(self.landmarks)
+        self.finger = int(finger)
+        dist = dist.tolist()
+        self.pinch_dist = dist[8]
+        self.v_ratio = dist[9] / dist[10] if dist[10] else math.inf
+        self.dz = float(dz)
+
+    # Handling Fluctuations due to noise
+    def get_gesture(self):
+        """
+        returns int representing gesture corresponding to Enum 'Gest'.
+        sets 'frame_count', 'ori_gesture', 'prev_gesture', 
+        handles fluctuations due to noise.
         
-        def get_dist(self, point):
-            """
-            returns euclidean distance between 'point'.
+        Returns
+        -------
+        int
+        """
+        if self.hand_result is None:
+            return Gest.PALM
 
-            Parameters
-            ----------
-            point : list containing two elements of type list/tuple which represents 
-                landmark point.
-            
-            Returns
-            -------
-            float
-            """
-            dist = (self.hand_result.landmark[point[0]].x - self.hand_result.landmark[point[1]].x)**2
-            dist += (self.hand_result.landmark[point[0]].y - self.hand_result.landmark[point[1]].y)**2
-            dist = math.sqrt(dist)
-            return dist
-        
-        def get_dz(self,point):
-            """
-            returns absolute difference on z-axis between 'point'.
+        current_gesture = Gest.PALM
+        if self.finger in [Gest.LAST3,Gest.LAST4] and self.pinch_dist < 0.05:
+            if self.hand_label == HLabel.MINOR :
+                current_gesture = Gest.PINCH_MINOR
+            else:
+                current_gesture = Gest.PINCH_MAJOR
 
-            Parameters
-            ----------
-            point : list containing two elements of type list/tuple which represents 
-                landmark point.
+        elif Gest.FIRST2 == self.finger :
+            if self.v_ratio > 1.7:
+                current_gesture = Gest.V_GEST
+            else:
+                if self.dz < 0.1:
+                    current_gesture =  Gest.TWO_FINGER_CLOSED
+                else:
+                    current_gesture =  Gest.MID
             
-            Returns
-            -------
-            float
-            """
-            return abs(self.hand_result.landmark[point[0]].z - self.hand_result.landmark[point[1]].z)
+        else:
+            current_gesture =  self.finger
         
-        # Function to find Gesture Encoding using current finger_state.
-        # Finger_state: 1 if finger is open, else 0
-        def set_finger_state(self):
-            """
-            set 'finger' by computing ratio of distance between finger tip 
-            , middle knuckle, base knuckle.
-
-            Returns
-            -------
-            None
-            """
-            if self.hand_result == None:
-                return
-
-            points = [[8,5,0],[12,9,0],[16,13,0],[20,17,0]]
-            self.finger = 0
-            self.finger = self.finger | 0 #thumb
-            for idx,point in enumerate(points):
-                
-                dist = self.get_signed_dist(point[:2])
-                dist2 = self.get_signed_dist(point[1:])
-                
-                try:
-                    ratio = round(dist/dist2,1)
-                except:
-                    ratio = round(dist/0.01,1)
+        if current_gesture == self.prev_gesture:
+            self.frame_count += 1
+        else:
+            self.frame_count = 0
 
-                self.finger = self.finger << 1
-                if ratio > 0.5 :
-                    self.finger = self.finger | 1
+        self.prev_gesture = current_gesture
+
+        if self.frame_count > 4 :
+            self.ori_gesture = current_gesture
+        return self.ori_gesture
+
+def select_action(handmajor, handminor, hr_major, hr_minor):
+    """
+    classifies both hands and returns the action to execute for this frame.
+
+    Parameters
+    ----------
+    handmajor, handminor : HandRecog
+        recognizers of the major and minor hand.
+    hr_major, hr_minor : Object
+        landmarks of the major / minor hand, None if not visible.
+
+    Returns
+    -------
+    tuple
+        (hand_label, hand_result, gesture) for 'Controller.process',
+        None if there is nothing to execute.
+    """
+    handmajor.update_hand_result(hr_major)
+    handminor.update_hand_result(hr_minor)
+    handmajor.set_finger_state()
+    handminor.set_finger_state()
+    gest_name = handminor.get_gesture()
+    if gest_name == Gest.PINCH_MINOR:
+        return (HLabel.MINOR, handminor.hand_result, gest_name)
+    if handmajor.hand_result is not None:
+        return (HLabel.MAJOR, handmajor.hand_result, handmajor.get_gesture())
+    return None
+
+# Executes commands according to detected gestures
+class Controller:
+    """
+    Executes commands according to detected gestures.
+
+    Attributes
+    ----------
+    tx_old : int
+        previous mouse location x coordinate
+    ty_old : int
+        previous mouse location y coordinate
+    flag : bool
+        true if V gesture is detected
+    grabflag : bool
+        true if FIST gesture is detected
+    pinchmajorflag : bool
+        true if PINCH gesture is detected through MAJOR hand,
+        on x-axis 'Controller.changesystembrightness', 
+        on y-axis 'Controller.changesystemvolume'.
+    pinchminorflag : bool
+        true if PINCH gesture is detected through MINOR hand,
+        on x-axis 'Controller.scrollHorizontal', 
+        on y-axis 'Controller.scrollVertical'.
+    pinchstartxcoord : int
+        x coordinate of hand landmark when pinch gesture is started.
+    pinchstartycoord : int
+        y coordinate of hand landmark when pinch gesture is started.
+    pinchdirectionflag : bool
+        true if pinch gesture movement is along x-axis,
+        otherwise false
+    prevpinchlv : int
+        stores quantized magnitude of prev pinch gesture displacement, from 
+        starting position
+    pinchlv : int
+        stores quantized magnitude of pinch gesture displacement, from 
+        starting position
+    framecount : int
+        stores no. of frames since 'pinchlv' is updated.
+    prev_hand : tuple
+        stores (x, y) coordinates of hand in previous frame.
+    pinch_threshold : float
+        step size for quantization of 'pinchlv'.
+    backend : Object
+        pointer actuation backend exposing the pyautogui calls used here
+        ('size', 'moveTo', 'moveRel', 'dragTo', 'mouseDown', 'mouseUp',
+        'click', 'scroll', 'hscroll') plus 'flush', called once at the end
+        of every frame. A 'gesture_actuation.Actuator' when a display is
+        available, replay uses one with a stub injector.
+    volume : gesture_actuation.LevelActuator
+        applies system volume changes off the gesture thread.
+    brightness : gesture_actuation.LevelActuator
+        applies display brightness changes, fading off the gesture thread.
+    cursor_filter : gesture_filters.CursorFilter
+        smooths the index finger tip before it is mapped to the screen,
+        None to use raw landmarks.
+    stream : gesture_stream.GestureStream
+        publishes gesture changes, the filtered cursor and pinch levels to
+        other apps, None to publish nothing.
+    """
+
+    tx_old = 0
+    ty_old = 0
+    trial = True
+    flag = False
+    grabflag = False
+    pinchmajorflag = False
+    pinchminorflag = False
+    pinchstartxcoord = None
+    pinchstartycoord = None
+    pinchdirectionflag = None
+    prevpinchlv = 0
+    pinchlv = 0
+    framecount = 0
+    prev_hand = None
+    pinch_threshold = 0.3
+    backend = None
+    volume = None
+    brightness = None
+    cursor_filter = None
+    stream = None
+    
+    @staticmethod
+    def reset():
+        """resets all gesture state, e.g. before replaying a recording."""
+        Controller.tx_old = 0
+        Controller.ty_old = 0
+        Controller.flag = False
+        Controller.grabflag = False
+        Controller.pinchmajorflag = False
+        Controller.pinchminorflag = False
+        Controller.pinchstartxcoord = None
+        Controller.pinchstartycoord = None
+        Controller.pinchdirectionflag = None
+        Controller.prevpinchlv = 0
+        Controller.pinchlv = 0
+        Controller.framecount = 0
+        Controller.prev_hand = None
+        if Controller.cursor_filter is not None:
+            Controller.cursor_filter.reset()
+
+    @staticmethod
+    def getpinchylv(hand_result):
+        """returns distance between starting pinch y coord and current hand position y coord."""
+        dist = round((Controller.pinchstartycoord - hand_result.landmark[8].y)*10,1)
+        return dist
+
+    @staticmethod
+    def getpinchxlv(hand_result):
+        """returns distance between starting pinch x coord and current hand position x coord."""
+        dist = round((hand_result.landmark[8].x - Controller.pinchstartxcoord)*10,1)
+        return dist
+    
+    @staticmethod
+    def changesystembrightness():
+        """sets system brightness based on 'Controller.pinchlv', without blocking."""
+        if Controller.brightness is not None:
+            Controller.brightness.change_level(Controller.pinchlv/50.0)
+    
+    @staticmethod
+    def changesystemvolume():
+        """sets system volume based on 'Controller.pinchlv', without blocking."""
+        if Controller.volume is not None:
+            Controller.volume.change_level(Controller.pinchlv/50.0)
+
+    @staticmethod
+    def scrollVertical(level):
+        """scrolls vertically by amount 'level'."""
+        Controller.backend.scroll(level * 120)  
+
+    @staticmethod
+    def scrollHorizontal(level):
+        """scrolls horizontally by amount 'level'."""
+        Controller.backend.hscroll(level * 120)
         
-
-        # Handling Fluctuations due to noise
-        def get_gesture(self):
-            """
-            returns int representing gesture corresponding to Enum 'Gest'.
-            sets 'frame_count', 'ori_gesture', 'prev_gesture', 
-            handles fluctuations due to noise.
-            
-            Returns
-            -------
-            int
-            """
-            if self.hand_result == None:
-                return Gest.PALM
-
-            current_gesture = Gest.PALM
-            if self.finger in [Gest.LAST3,Gest.LAST4] and self.get_dist([8,4]) < 0.05:
-                if self.hand_label == HLabel.MINOR :
-                    current_gesture = Gest.PINCH_MINOR
-                else:
-                    current_gesture = Gest.PINCH_MAJOR
-
-            elif Gest.FIRST2 == self.finger :
-                point = [[8,12],[5,9]]
-                dist1 = self.get_dist(point[0])
-                dist2 = self.get_dist(point[1])
-                ratio = dist1/dist2
-                if ratio > 1.7:
-                    current_gesture = Gest.V_GEST
+    @staticmethod
+    def mouse_move(x, y):
+        Controller.backend.moveTo(x, y)
+
+    @staticmethod
+    def mouse_drag(x, y):
+        Controller.backend.dragTo(x, y, button='left')
+
+    @staticmethod
+    def left_click():
+        Controller.backend.click(button='left')
+
+    @staticmethod
+    def right_click():
+        Controller.backend.click(button='right')
+
+    @staticmethod
+    def pinch_handler(hand_label, hand_result, ori_gesture, timestamp=None):
+        """Handles pinch gestures on major and minor hands."""
+        if ori_gesture == Gest.PINCH_MAJOR:
+            if not Controller.pinchmajorflag:
+                Controller.pinchmajorflag = True
+                Controller.pinchstartxcoord = hand_result.landmark[8].x
+                Controller.pinchstartycoord = hand_result.landmark[8].y
+                Controller.prevpinchlv = 0
+                Controller.pinchlv = 0
+                Controller.framecount = 0
+            else:
+                if Controller.pinchdirectionflag is None:
+                    delta_x = abs(hand_result.landmark[8].x - Controller.pinchstartxcoord)
+                    delta_y = abs(hand_result.landmark[8].y - Controller.pinchstartycoord)
+                    Controller.pinchdirectionflag = (delta_x > delta_y)
+                if Controller.pinchdirectionflag:
+                    Controller.pinchlv = Controller.getpinchxlv(hand_result)
                 else:
-                    if self.get_dz([8,12]) < 0.1:
-                        current_gesture =  Gest.TWO_FINGER_CLOSED
+                    Controller.pinchlv = Controller.getpinchylv(hand_result)
+                if Controller.stream is not None:
+                    Controller.stream.pinch(hand_label, 0 if Controller.pinchdirectionflag else 1,
+                                            Controller.pinchlv, timestamp)
+                if abs(Controller.pinchlv - Controller.prevpinchlv) > Controller.pinch_threshold:
+                    if Controller.pinchdirectionflag:
+                        Controller.changesystembrightness()
                     else:
-                        current_gesture =  Gest.MID
-                
+                        Controller.changesystemvolume()
+                    Controller.prevpinchlv = Controller.pinchlv
+
+        else:
+            Controller.pinchmajorflag = False
+            Controller.pinchdirectionflag = None
+
+        if ori_gesture == Gest.PINCH_MINOR:
+            if not Controller.pinchminorflag:
+                Controller.pinchminorflag = True
+                Controller.pinchstartxcoord = hand_result.landmark[8].x
+                Controller.pinchstartycoord = hand_result.landmark[8].y
+                Controller.prevpinchlv = 0
+                Controller.pinchlv = 0
+                Controller.framecount = 0
             else:
-                current_gesture =  self.finger
-            
-            if current_gesture == self.prev_gesture:
-                self.frame_count += 1
+                if Controller.pinchdirectionflag is None:
+                    delta_x = abs(hand_result.landmark[8].x - Controller.pinchstartxcoord)
+                    delta_y = abs(hand_result.landmark[8].y - Controller.pinchstartycoord)
+                    Controller.pinchdirectionflag = (delta_x > delta_y)
+                if Controller.pinchdirectionflag:
+                    Controller.pinchlv = Controller.getpinchxlv(hand_result)
+                else:
+                    Controller.pinchlv = Controller.getpinchylv(hand_result)
+                if Controller.stream is not None:
+                    Controller.stream.pinch(hand_label, 0 if Controller.pinchdirectionflag else 1,
+                                            Controller.pinchlv, timestamp)
+                if abs(Controller.pinchlv - Controller.prevpinchlv) > Controller.pinch_threshold:
+                    if Controller.pinchdirectionflag:
+                        Controller.scrollHorizontal(round(Controller.pinchlv))
+                    else:
+                        Controller.scrollVertical(round(Controller.pinchlv))
+                    Controller.prevpinchlv = Controller.pinchlv
+        else:
+            Controller.pinchminorflag = False
+            Controller.pinchdirectionflag = None
+    
+    @staticmethod
+    def process(hand_label, hand_result, gesture, timestamp=None):
+        """
+        Processes gesture commands for the hand.
+
+        Parameters
+        ----------
+        hand_label : int
+            Label indicating which hand (HLabel.MINOR or HLabel.MAJOR)
+        hand_result : mediapipe hand landmarks object
+        gesture : int
+            Gesture from Gest Enum
+        timestamp : float, optional
+            capture time of the frame in seconds, used by 'cursor_filter'.
+            Defaults to the current time.
+        
+        Returns
+        -------
+        None
+        """
+        # Handle pinch gestures first (for volume/brightness and scrolling)
+        Controller.pinch_handler(hand_label, hand_result, gesture, timestamp)
+
+        # Get current hand x,y coordinates (index finger tip)
+        hx = hand_result.landmark[8].x
+        hy = hand_result.landmark[8].y
+        if Controller.cursor_filter is not None:
+            if timestamp is None:
+                timestamp = time.perf_counter()
+            hx, hy = Controller.cursor_filter.filter(hand_label, timestamp, hx, hy)
+        if Controller.stream is not None:
+            Controller.stream.gesture(hand_label, gesture, hx, hy, timestamp)
+            Controller.stream.cursor(hand_label, hx, hy, timestamp)
+        screen = Controller.backend.size()
+        x = int(hx * screen.width)
+        y = int(hy * screen.height)
+
+        # Store previous coordinates for reference
+        if Controller.prev_hand is None:
+            Controller.prev_hand = (x, y)
+
+        # If gesture is FIST, drag mouse
+        if gesture == Gest.FIST:
+            if not Controller.grabflag:
+                Controller.grabflag = True
+                Controller.tx_old = x
+                Controller.ty_old = y
+                Controller.backend.mouseDown()
             else:
-                self.frame_count = 0
+                dx = x - Controller.tx_old
+                dy = y - Controller.ty_old
+                Controller.tx_old = x
+                Controller.ty_old = y
+                Controller.backend.moveRel(dx, dy)
+        else:
+            if Controller.grabflag:
+                Controller.grabflag = False
+                Controller.backend.mouseUp()
+
+        # If gesture is V_GEST, left click once
+        if gesture == Gest.V_GEST:
+            if not Controller.flag:
+                Controller.flag = True
+                Controller.left_click()
+        else:
+            Controller.flag = False
+
+        # If gesture is PALM, right click once
+        if gesture == Gest.PALM:
+            Controller.right_click()
+        
+        # Update previous hand position
+        Controller.prev_hand = (x, y)
 
-            self.prev_gesture = current_gesture
+        # Inject all pointer events of this frame at once
+        Controller.backend.flush()
 
-            if self.frame_count > 4 :
-                self.ori_gesture = current_gesture
-            return self.ori_gesture
 
-    # Executes commands according to detected gestures
-    class Controller:
+if has_display:
+    import queue
+    from collections import deque
+    from threading import Thread
+    from gesture_governor import FrameGovernor
+
+    # cv2 / mediapipe and the system actuation backends (pycaw, comtypes,
+    # pyautogui, ...) are loaded on the first 'GestureController()', not on
+    # import, so importing this module stays cheap.
+    cv2 = None
+    mp = None
+
+    def load_vision():
+        """imports the camera / landmark detection stack once."""
+        global cv2, mp, RoiTracker, FrameRing, GcMonitor
+        if mp is not None:
+            return
+        cv2 = trace.import_module('cv2')
+        mp = trace.import_module('mediapipe')
+        from gesture_tracking import RoiTracker
+        from gesture_buffers import FrameRing, GcMonitor
+
+    def setup_actuation():
+        """installs the system actuation backends on 'Controller' once."""
+        if Controller.backend is not None:
+            return
+        with trace.span('init gesture actuation'):
+            import pyautogui
+            pyautogui.FAILSAFE = False
+            Controller.backend = Actuator(default_injector())
+            Controller.volume = LevelActuator(default_volume_backend())
+            Controller.brightness = LevelActuator(default_brightness_backend(), fade_step=0.02)
+            # ~50 ms from capture to cursor, see bench_filters.py
+            Controller.cursor_filter = CursorFilter('one_euro', prediction=0.05)
+            # gesture events for other apps, see gesture_stream.py (AURA_GESTURE_STREAM=off disables)
+            from gesture_stream import GestureStream, default_address
+            address = default_address()
+            if address is not None:
+                try:
+                    Controller.stream = GestureStream(address).start()
+                except OSError as e:
+                    print("[GestureController] gesture stream unavailable:", e)
+
+    class LatestQueue:
         """
-        Executes commands according to detected gestures.
+        Bounded queue which drops the oldest item when full, so that the
+        consumer always works on the freshest item instead of a backlog.
 
         Attributes
         ----------
-        tx_old : int
-            previous mouse location x coordinate
-        ty_old : int
-            previous mouse location y coordinate
-        flag : bool
-            true if V gesture is detected
-        grabflag : bool
-            true if FIST gesture is detected
-        pinchmajorflag : bool
-            true if PINCH gesture is detected through MAJOR hand,
-            on x-axis 'Controller.changesystembrightness', 
-            on y-axis 'Controller.changesystemvolume'.
-        pinchminorflag : bool
-            true if PINCH gesture is detected through MINOR hand,
-            on x-axis 'Controller.scrollHorizontal', 
-            on y-axis 'Controller.scrollVertical'.
-        pinchstartxcoord : int
-            x coordinate of hand landmark when pinch gesture is started.
-        pinchstartycoord : int
-            y coordinate of hand landmark when pinch gesture is started.
-        pinchdirectionflag : bool
-            true if pinch gesture movement is along x-axis,
-            otherwise false
-        prevpinchlv : int
-            stores quantized magnitude of prev pinch gesture displacement, from 
-            starting position
-        pinchlv : int
-            stores quantized magnitude of pinch gesture displacement, from 
-            starting position
-        framecount : int
-            stores no. of frames since 'pinchlv' is updated.
-        prev_hand : tuple
-            stores (x, y) coordinates of hand in previous frame.
-        pinch_threshold : float
-            step size for quantization of 'pinchlv'.
+        dropped : int
+            total no. of items discarded because the queue was full.
         """
 
-        tx_old = 0
-        ty_old = 0
-        trial = True
-        flag = False
-        grabflag = False
-        pinchmajorflag = False
-        pinchminorflag = False
-        pinchstartxcoord = None
-        pinchstartycoord = None
-        pinchdirectionflag = None
-        prevpinchlv = 0
-        pinchlv = 0
-        framecount = 0
-        prev_hand = None
-        pinch_threshold = 0.3
-        
-        @staticmethod
-        def getpinchylv(hand_result):
-            """returns distance between starting pinch y coord and current hand position y coord."""
-            dist = round((Controller.pinchstartycoord - hand_result.landmark[8].y)*10,1)
-            return dist
+        def __init__(self, maxsize=1, on_drop=None):
+            """
+            Parameters
+            ----------
+            maxsize : int
+            on_drop : callable, optional
+                called with every discarded item, e.g. to recycle its buffer.
+            """
+            self.queue = queue.Queue(maxsize)
+            self.on_drop = on_drop
+            self.dropped = 0
 
-        @staticmethod
-        def getpinchxlv(hand_result):
-            """returns distance between starting pinch x coord and current hand position x coord."""
-            dist = round((hand_result.landmark[8].x - Controller.pinchstartxcoord)*10,1)
-            return dist
-        
-        @staticmethod
-        def changesystembrightness():
-            """sets system brightness based on 'Controller.pinchlv'."""
-            currentBrightnessLv = sbcontrol.get_brightness(display=0)/100.0
-            currentBrightnessLv += Controller.pinchlv/50.0
-            if currentBrightnessLv > 1.0:
-                currentBrightnessLv = 1.0
-            elif currentBrightnessLv < 0.0:
-                currentBrightnessLv = 0.0       
-            sbcontrol.fade_brightness(int(100*currentBrightnessLv) , start = sbcontrol.get_brightness(display=0))
-        
-        @staticmethod
-        def changesystemvolume():
-            """sets system volume based on 'Controller.pinchlv'."""
-            devices = AudioUtilities.GetSpeakers()
-            interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-            volume = cast(interface, POINTER(IAudioEndpointVolume))
-            currentVolumeLv = volume.GetMasterVolumeLevelScalar()
-            currentVolumeLv += Controller.pinchlv/50.0
-            if currentVolumeLv > 1.0:
-                currentVolumeLv = 1.0
-            elif currentVolumeLv < 0.0:
-                currentVolumeLv = 0.0
-            volume.SetMasterVolumeLevelScalar(currentVolumeLv, None)
+        def put(self, item):
+            """puts 'item', discarding the oldest queued item if full."""
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        dropped = self.queue.get_nowait()
+                        self.dropped += 1
+                        if self.on_drop is not None:
+                            self.on_drop(dropped)
+                    except queue.Empty:
+                        pass
+
+        def get(self, timeout=None):
+            """returns the next item, raises 'queue.Empty' on timeout."""
+            return self.queue.get(timeout=timeout)
+
+    class StageStats:
+        """
+        Rolling latency statistics (in milliseconds) for one pipeline stage.
+        """
 
-        @staticmethod
-        def scrollVertical(level):
-            """scrolls vertically by amount 'level'."""
-            pyautogui.scroll(level * 120)  
+        def __init__(self, window=300):
+            self.samples = deque(maxlen=window)
+            self.count = 0
+
+        def add(self, seconds):
+            self.samples.append(seconds * 1000.0)
+            self.count += 1
+
+        def report(self):
+            """returns dict with count, mean, p50, p99 and max latency in ms."""
+            if not self.samples:
+                return {'count': self.count}
+            ordered = sorted(self.samples)
+            last = len(ordered) - 1
+            return {
+                'count': self.count,
+                'mean': sum(ordered) / len(ordered),
+                'p50': ordered[int(0.50 * last)],
+                'p99': ordered[int(0.99 * last)],
+                'max': ordered[-1],
+            }
 
-        @staticmethod
-        def scrollHorizontal(level):
-            """scrolls horizontally by amount 'level'."""
-            pyautogui.hscroll(level * 120)
-            
-        @staticmethod
-        def mouse_move(x, y):
-            pyautogui.moveTo(x, y)
+    class GestureController:
+        """
+        Runs the capture -> inference -> actuation pipeline.
 
-        @staticmethod
-        def mouse_drag(x, y):
-            pyautogui.dragTo(x, y, button='left')
+        Each stage runs on its own thread and hands work to the next one
+        through a 'LatestQueue' of size 1, so a slow stage never builds a
+        backlog: it always picks up the freshest frame / decision.
 
-        @staticmethod
-        def left_click():
-            pyautogui.click(button='left')
+        Attributes
+        ----------
+        gc_mode : int
+            1 while gesture recognition is running.
+        dom_hand : bool
+            True if the right hand is the major (dominant) hand.
+        hr_major : Object
+            landmarks of the major hand for the current frame.
+        hr_minor : Object
+            landmarks of the minor hand for the current frame.
+        stats : dict
+            'StageStats' for 'frame_period', 'capture', 'inference',
+            'actuation' and end-to-end 'motion_to_cursor' latency.
+        errors : dict
+            failed iterations of the 'inference' and 'actuation' stages;
+            a stage failing 'max_stage_failures' times in a row stops the
+            pipeline.
+        """
 
-        @staticmethod
-        def right_click():
-            pyautogui.click(button='right')
+        gc_mode = 0
+        dom_hand = True
+        hr_major = None
+        hr_minor = None
+        report_interval = 10.0
+        max_stage_failures = 30
 
-        @staticmethod
-        def pinch_handler(hand_label, hand_result, ori_gesture):
-            """Handles pinch gestures on major and minor hands."""
-            if ori_gesture == Gest.PINCH_MAJOR:
-                if not Controller.pinchmajorflag:
-                    Controller.pinchmajorflag = True
-                    Controller.pinchstartxcoord = hand_result.landmark[8].x
-                    Controller.pinchstartycoord = hand_result.landmark[8].y
-                    Controller.prevpinchlv = 0
-                    Controller.pinchlv = 0
-                    Controller.framecount = 0
-                else:
-                    if Controller.pinchdirectionflag is None:
-                        delta_x = abs(hand_result.landmark[8].x - Controller.pinchstartxcoord)
-                        delta_y = abs(hand_result.landmark[8].y - Controller.pinchstartycoord)
-                        Controller.pinchdirectionflag = (delta_x > delta_y)
-                    if Controller.pinchdirectionflag:
-                        Controller.pinchlv = Controller.getpinchxlv(hand_result)
-                    else:
-                        Controller.pinchlv = Controller.getpinchylv(hand_result)
-                    if abs(Controller.pinchlv - Controller.prevpinchlv) > Controller.pinch_threshold:
-                        if Controller.pinchdirectionflag:
-                            Controller.changesystembrightness()
-                        else:
-                            Controller.changesystemvolume()
-                        Controller.prevpinchlv = Controller.pinchlv
+        def __init__(self, recorder=None, roi_tracking=True, governor=True):
+            """
+            Parameters
+            ----------
+            recorder : gesture_replay.LandmarkRecorder, optional
+                if given, landmarks of every processed frame are recorded.
+            roi_tracking : bool
+                True to run landmark detection on a crop around the tracked
+                hands, falling back to 'self.hands' on the full frame.
+            governor : bool
+                True to adapt frame rate and resolution to hand presence
+                and inference time, see 'gesture_governor.FrameGovernor'.
+            """
+            load_vision()
+            setup_actuation()
+            self.cap = cv2.VideoCapture(0)
+            self.recorder = recorder
+            self.hands = mp.solutions.hands.Hands()
+            self.governor = FrameGovernor() if governor else None
+            self.tracker = None
+            if roi_tracking:
+                self.tracker = RoiTracker(self.hands, mp.solutions.hands.Hands())
+            self.prev_time = time.time()
+            self.ring = FrameRing(4)
+            self.frame_queue = LatestQueue(1, on_drop=lambda item: self.ring.release(item[1]))
+            self.gc_monitor = None
+            self.action_queue = LatestQueue(1)
+            self.stats = {name: StageStats() for name in
+                          ('frame_period', 'capture', 'inference', 'actuation', 'motion_to_cursor')}
+            self.errors = {'inference': 0, 'actuation': 0}
 
-            else:
-                Controller.pinchmajorflag = False
-                Controller.pinchdirectionflag = None
-
-            if ori_gesture == Gest.PINCH_MINOR:
-                if not Controller.pinchminorflag:
-                    Controller.pinchminorflag = True
-                    Controller.pinchstartxcoord = hand_result.landmark[8].x
-                    Controller.pinchstartycoord = hand_result.landmark[8].y
-                    Controller.prevpinchlv = 0
-                    Controller.pinchlv = 0
-                    Controller.framecount = 0
-                else:
-                    if Controller.pinchdirectionflag is None:
-                        delta_x = abs(hand_result.landmark[8].x - Controller.pinchstartxcoord)
-                        delta_y = abs(hand_result.landmark[8].y - Controller.pinchstartycoord)
-                        Controller.pinchdirectionflag = (delta_x > delta_y)
-                    if Controller.pinchdirectionflag:
-                        Controller.pinchlv = Controller.getpinchxlv(hand_result)
-                    else:
-                        Controller.pinchlv = Controller.getpinchylv(hand_result)
-                    if abs(Controller.pinchlv - Controller.prevpinchlv) > Controller.pinch_threshold:
-                        if Controller.pinchdirectionflag:
-                            Controller.scrollHorizontal(int(Controller.pinchlv))
-                        else:
-                            Controller.scrollVertical(int(Controller.pinchlv))
-                        Controller.prevpinchlv = Controller.pinchlv
-            else:
-                Controller.pinchminorflag = False
-                Controller.pinchdirectionflag = None
-        
         @staticmethod
-        def process(hand_label, hand_result, gesture):
+        def classify_hands(results):
             """
-            Processes gesture commands for the hand.
+            sets 'hr_major', 'hr_minor' based on handedness reported by mediapipe.
 
             Parameters
             ----------
-            hand_label : int
-                Label indicating which hand (HLabel.MINOR or HLabel.MAJOR)
-            hand_result : mediapipe hand landmarks object
-            gesture : int
-                Gesture from Gest Enum
-            
-            Returns
-            -------
-            None
+            results : Object
+                output of 'mp.solutions.hands.Hands.process'.
             """
-            # Handle pinch gestures first (for volume/brightness and scrolling)
-            Controller.pinch_handler(hand_label, hand_result, gesture)
-
-            # Get current hand x,y coordinates (index finger tip)
-            x = int(hand_result.landmark[8].x * pyautogui.size().width)
-            y = int(hand_result.landmark[8].y * pyautogui.size().height)
-
-            # Store previous coordinates for reference
-            if Controller.prev_hand is None:
-                Controller.prev_hand = (x, y)
-
-            # If gesture is FIST, drag mouse
-            if gesture == Gest.FIST:
-                if not Controller.grabflag:
-                    Controller.grabflag = True
-                    Controller.tx_old = x
-                    Controller.ty_old = y
-                    pyautogui.mouseDown()
+            left, right = None, None
+            for landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                if handedness.classification[0].label == 'Right':
+                    right = landmarks
                 else:
-                    dx = x - Controller.tx_old
-                    dy = y - Controller.ty_old
-                    Controller.tx_old = x
-                    Controller.ty_old = y
-                    pyautogui.moveRel(dx, dy)
-            else:
-                if Controller.grabflag:
-                    Controller.grabflag = False
-                    pyautogui.mouseUp()
-
-            # If gesture is V_GEST, left click once
-            if gesture == Gest.V_GEST:
-                if not Controller.flag:
-                    Controller.flag = True
-                    Controller.left_click()
+                    left = landmarks
+
+            if GestureController.dom_hand:
+                GestureController.hr_major = right
+                GestureController.hr_minor = left
             else:
-                Controller.flag = False
+                GestureController.hr_major = left
+                GestureController.hr_minor = right
+
+        def capture_loop(self):
+            """
+            reads frames at camera rate and publishes the latest one,
+            decoded into a slot borrowed from 'self.ring'.
+
+            With a governor, every frame is grabbed (cheap, keeps the camera
+            buffer fresh) but only decoded and published once per
+            'governor.frame_interval()', at the governor's resolution.
+            """
+            prev = None
+            applied = None
+            last_publish = 0.0
+            while GestureController.gc_mode and self.cap.isOpened():
+                if self.governor is not None and applied != (self.governor.size, self.governor.fps):
+                    applied = (self.governor.size, self.governor.fps)
+                    self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, applied[0][0])
+                    self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, applied[0][1])
+                    self.cap.set(cv2.CAP_PROP_FPS, applied[1])
+                start = time.perf_counter()
+                if not self.cap.grab():
+                    GestureController.gc_mode = 0
+                    break
+                if (self.governor is not None
+                        and start - last_publish < self.governor.frame_interval()):
+                    continue
+                slot = self.ring.acquire()
+                if slot is None:
+                    continue
+                ret = self.ring.retrieve(self.cap, slot)
+                captured = time.perf_counter()
+                if not ret:
+                    self.ring.release(slot)
+                    GestureController.gc_mode = 0
+                    break
+                last_publish = start
+                self.stats['capture'].add(captured - start)
+                if prev is not None:
+                    self.stats['frame_period'].add(captured - prev)
+                prev = captured
+                self.frame_queue.put((captured, slot))
+
+        def inference_loop(self):
+            """runs landmark detection and gesture recognition on the latest frame."""
+            handmajor = HandRecog(HLabel.MAJOR)
+            handminor = HandRecog(HLabel.MINOR)
+            failures = 0
+            while GestureController.gc_mode:
+                try:
+                    captured, slot = self.frame_queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                start = time.perf_counter()
+                try:
+                    image = self.ring.to_rgb(slot)
+                    if self.tracker is not None:
+                        results = self.tracker.process(image)
+                    else:
+                        results = self.hands.process(image)
+                    self.ring.release(slot)
+                    slot = None
+                    if self.recorder is not None:
+                        self.recorder.write_results(captured, results)
+
+                    action = None
+                    if results.multi_hand_landmarks:
+                        GestureController.classify_hands(results)
+                        action = select_action(handmajor, handminor,
+                                               GestureController.hr_major, GestureController.hr_minor)
+                except Exception as e:
+                    failures = self.stage_failed('inference', e, failures)
+                    continue
+                finally:
+                    if slot is not None:
+                        self.ring.release(slot)
+                failures = 0
+                elapsed = time.perf_counter() - start
+                self.stats['inference'].add(elapsed)
+                if self.governor is not None:
+                    self.governor.update(bool(results.multi_hand_landmarks), elapsed)
+                self.action_queue.put((captured, action))
+
+        def actuation_loop(self):
+            """executes the latest gesture decision."""
+            failures = 0
+            while GestureController.gc_mode:
+                try:
+                    captured, action = self.action_queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                start = time.perf_counter()
+                try:
+                    if action is None:
+                        Controller.prev_hand = None
+                        if Controller.stream is not None:
+                            Controller.stream.lost(captured)
+                    else:
+                        Controller.process(*action, timestamp=captured)
+                except Exception as e:
+                    failures = self.stage_failed('actuation', e, failures)
+                    continue
+                failures = 0
+                done = time.perf_counter()
+                self.stats['actuation'].add(done - start)
+                self.stats['motion_to_cursor'].add(done - captured)
+
+        def stage_failed(self, stage, error, failures):
+            """
+            logs a failed iteration of 'stage' and returns the no. of failures
+            in a row; stops the pipeline after 'max_stage_failures'.
+            """
+            self.errors[stage] += 1
+            failures += 1
+            print("[GestureController] {} failed: {!r}".format(stage, error))
+            if failures >= GestureController.max_stage_failures:
+                print("[GestureController] {} failed {} times in a row, stopping".format(stage, failures))
+                GestureController.gc_mode = 0
+            return failures
+
+        def stage_report(self):
+            """returns dict of per-stage latency reports and dropped frame counts."""
+            report = {name: stats.report() for name, stats in self.stats.items()}
+            report['errors'] = dict(self.errors)
+            report['dropped_frames'] = self.frame_queue.dropped
+            report['dropped_actions'] = self.action_queue.dropped
+            if self.tracker is not None:
+                report['tracking'] = self.tracker.report()
+            if self.governor is not None:
+                report['governor'] = self.governor.report()
+            report['buffers'] = self.ring.report()
+            if self.gc_monitor is not None:
+                report['gc'] = self.gc_monitor.report()
+            if Controller.stream is not None:
+                report['stream'] = Controller.stream.report()
+            return report
+
+        def print_report(self):
+            report = self.stage_report()
+            print("[GestureController] dropped frames: {}, dropped actions: {}, stage errors: {}".format(
+                report.pop('dropped_frames'), report.pop('dropped_actions'), report.pop('errors')))
+            tracking = report.pop('tracking', None)
+            if tracking is not None:
+                print("[GestureController] detection frames: {detection_frames} ({detection_ms:.1f}ms), "
+                      "tracking frames: {tracking_frames} ({tracking_ms:.1f}ms), "
+                      "fallbacks: {fallbacks}, saved: {saved_ms:.0f}ms".format(**tracking))
+            governor = report.pop('governor', None)
+            if governor is not None:
+                print("[GestureController] mode: {mode} ({interval_ms:.0f}ms/frame), "
+                      "active frames: {active_frames}, idle frames: {idle_frames}, "
+                      "idle: {idle_seconds:.0f}s, switches: {switches}".format(**governor))
+            buffers = report.pop('buffers')
+            print("[GestureController] frame buffers allocated: {allocations}, "
+                  "acquired: {acquired}, ring exhausted: {exhausted}".format(**buffers))
+            gc_report = report.pop('gc', None)
+            if gc_report is not None:
+                print("[GestureController] gc collections: {collections}, pause total: "
+                      "{pause_total_ms:.1f}ms, max: {pause_max_ms:.2f}ms, "
+                      "python block growth: {block_growth}".format(**gc_report))
+            stream = report.pop('stream', None)
+            if stream is not None:
+                print("[GestureController] stream subscribers: {subscribers}, events: {published}, "
+                      "dropped for slow subscribers: {dropped}, disconnected: {disconnected}".format(**stream))
+            for name, stage in report.items():
+                if 'mean' in stage:
+                    print("[GestureController] {:<16} n={:<6} mean={:6.1f}ms p50={:6.1f}ms p99={:6.1f}ms max={:6.1f}ms".format(
+                        name, stage['count'], stage['mean'], stage['p50'], stage['p99'], stage['max']))
+
+        def start(self):
+            GestureController.gc_mode = 1
+            print("Gesture recognition started")
+            self.gc_monitor = GcMonitor()
+            workers = [Thread(target=self.capture_loop, daemon=True),
+                       Thread(target=self.actuation_loop, daemon=True)]
+            for worker in workers:
+                worker.start()
+            inference = Thread(target=self.inference_loop, daemon=True)
+            inference.start()
+            while GestureController.gc_mode:
+                inference.join(GestureController.report_interval)
+                if GestureController.gc_mode:
+                    self.print_report()
+            inference.join()
+            for worker in workers:
+                worker.join()
+            self.cap.release()
+            self.hands.close()
+            if self.tracker is not None:
+                self.tracker.roi_hands.close()
+            if self.recorder is not None:
+                self.recorder.close()
+            self.print_report()
+            self.gc_monitor.close()
+            print("Gesture recognition stopped")
 
-            # If gesture is PALM, right click once
-            if gesture == Gest.PALM:
-                Controller.right_click()
-            
-            # Update previous hand position
-            Controller.prev_hand = (x, y)
 
 else:
     print("[Gesture_Controller] DISPLAY not found. Gesture control disabled.")
 
     class GestureController:
-        def __init__(self):
+        def __init__(self, recorder=None, roi_tracking=True, governor=True):
             print("GestureController cannot initialize (no DISPLAY)")
 
         def start(self):
@@ -1,11 +1,22 @@
 import eel
 import os
+import threading
+import time
 from queue import Queue
+from startup_trace import trace
 
 class ChatBot:
 
     started = False
+    ready = threading.Event()  # set once the window is up
     userinputQueue = Queue()
+    on_input = None  # if set, called with every typed message instead of queueing it
+    # messages for the window, sent in batches of one frame by 'sender'
+    BATCH_S = 0.016
+    outbox = []
+    outbox_lock = threading.Lock()
+    outbox_ready = threading.Event()
+    stats = {'messages': 0, 'batches': 0, 'max_batch': 0}
 
     def isUserInput():
         return not ChatBot.userinputQueue.empty()
@@ -20,31 +31,60 @@ class ChatBot:
 
     @eel.expose
     def getUserInput(msg):
-        ChatBot.userinputQueue.put(msg)
+        if ChatBot.on_input is not None:
+            ChatBot.on_input(msg)
+        else:
+            ChatBot.userinputQueue.put(msg)
         print(msg)
     
     def close():
         ChatBot.started = False
     
     def addUserMsg(msg):
-        eel.addUserMsg(msg)
+        ChatBot.send('user', msg)
     
     def addAppMsg(msg):
-        eel.addAppMsg(msg)
+        ChatBot.send('app', msg)
+
+    def send(kind, msg):
+        with ChatBot.outbox_lock:
+            ChatBot.outbox.append((kind, msg))
+        ChatBot.outbox_ready.set()
+
+    def sender():
+        # one eel call per batch instead of one per message
+        while ChatBot.started:
+            if not ChatBot.outbox_ready.wait(1.0):
+                continue
+            time.sleep(ChatBot.BATCH_S)
+            ChatBot.outbox_ready.clear()
+            with ChatBot.outbox_lock:
+                batch, ChatBot.outbox = ChatBot.outbox, []
+            if batch:
+                eel.addMessages(batch)
+                stats = ChatBot.stats
+                stats['messages'] += len(batch)
+                stats['batches'] += 1
+                stats['max_batch'] = max(stats['max_batch'], len(batch))
+
+    def report():
+        return dict(ChatBot.stats)
 
     def start():
         path = os.path.dirname(os.path.abspath(__file__))
-        eel.init(path + r'\web', allowed_extensions=['.js', '.html'])
+        trace.call('eel init', eel.init, path + r'\web', allowed_extensions=['.js', '.html'])
         try:
-            eel.start('index.html', mode='chrome',
-                                    host='localhost',
-                                    port=27005,
-                                    block=False,
-                                    size=(350, 480),
-                                    position=(10,100),
-                                    disable_cache=True,
-                                    close_callback=ChatBot.close_callback)
+            trace.call('eel start', eel.start, 'index.html', mode='chrome',
+                       host='localhost',
+                       port=27005,
+                       block=False,
+                       size=(350, 480),
+                       position=(10,100),
+                       disable_cache=True,
+                       close_callback=ChatBot.close_callback)
             ChatBot.started = True
+            threading.Thread(target=ChatBot.sender, daemon=True).start()
+            ChatBot.ready.set()
             while ChatBot.started:
                 try:
                     eel.sleep(10.0)
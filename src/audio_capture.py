@@ -0,0 +1,392 @@
+# audio_capture.py
+
+# Continuous microphone capture with voice activity endpointing.
+# 'AudioCapture' reads fixed size frames from one persistent source on a
+# background thread, keeps recent audio in a preallocated 'RingBuffer'
+# and runs 'EnergyVAD' on every frame. The VAD adapts its noise floor
+# while nobody speaks, opens an utterance after a few loud frames and
+# closes it after 'hangover_ms' of silence, so short commands end quickly
+# and long phrases are not cut off. Complete utterances, including a bit
+# of audio before the detected start, are handed to recognition through
+# a queue. Sources are the microphone ('MicrophoneSource') or WAV files
+# ('WavSource'), so the pipeline runs the same on recorded fixtures.
+#
+# Usage: python audio_capture.py FILE.wav [FILE.wav ...] [--realtime]
+
+import argparse
+import queue
+import threading
+import time
+import wave
+from collections import deque
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+
+
+class Utterance:
+    """
+    Attributes
+    ----------
+    pcm : bytes
+        16 bit mono samples.
+    sample_rate : int
+    start, end : float
+        seconds since capture start, in audio time.
+    detected : float
+        'time.perf_counter' when the end of speech was detected.
+    """
+
+    __slots__ = ('pcm', 'sample_rate', 'start', 'end', 'detected')
+
+    def __init__(self, pcm, sample_rate, start, end, detected):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.start = start
+        self.end = end
+        self.detected = detected
+
+    @property
+    def duration(self):
+        return len(self.pcm) / 2 / self.sample_rate
+
+
+class MicrophoneSource:
+    """Persistent PyAudio input stream, opened once."""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS, device_index=None):
+        import pyaudio
+        self.sample_rate = sample_rate
+        self.frame = sample_rate * frame_ms // 1000
+        self.audio = pyaudio.PyAudio()
+        self.stream = self.audio.open(format=pyaudio.paInt16, channels=1, rate=sample_rate,
+                                      input=True, input_device_index=device_index,
+                                      frames_per_buffer=self.frame)
+
+    def read(self):
+        """returns the next frame as int16 array, blocks until available."""
+        data = self.stream.read(self.frame, exception_on_overflow=False)
+        return np.frombuffer(data, dtype=np.int16)
+
+    def close(self):
+        self.stream.stop_stream()
+        self.stream.close()
+        self.audio.terminate()
+
+
+class WavSource:
+    """
+    Frames of a WAV file, converted to mono at 'sample_rate'.
+
+    Attributes
+    ----------
+    realtime : bool
+        pace frames at the audio rate like a microphone, else as fast as possible.
+    """
+
+    def __init__(self, path, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS, realtime=False):
+        self.sample_rate = sample_rate
+        self.frame = sample_rate * frame_ms // 1000
+        self.realtime = realtime
+        self.samples = read_wav(path, sample_rate)
+        self.position = 0
+        self.started = None
+
+    def read(self):
+        """returns the next frame as int16 array, None at the end of the file."""
+        if self.position + self.frame > len(self.samples):
+            return None
+        if self.realtime:
+            if self.started is None:
+                self.started = time.perf_counter()
+            delay = self.started + (self.position + self.frame) / self.sample_rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        frame = self.samples[self.position:self.position + self.frame]
+        self.position += self.frame
+        return frame
+
+    def close(self):
+        pass
+
+
+def read_wav(path, sample_rate=SAMPLE_RATE):
+    """returns int16 mono samples of the WAV file at 'path', resampled to 'sample_rate'."""
+    with wave.open(path, 'rb') as f:
+        channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+        data = f.readframes(f.getnframes())
+    if width != 2:
+        raise ValueError("{}: only 16 bit WAV files are supported".format(path))
+    samples = np.frombuffer(data, dtype=np.int16).reshape(-1, channels).mean(axis=1)
+    if rate != sample_rate:
+        positions = np.arange(0, len(samples) * sample_rate // rate) * rate / sample_rate
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+    return samples.astype(np.int16)
+
+
+def write_wav(path, samples, sample_rate=SAMPLE_RATE):
+    """writes int16 mono 'samples' to a WAV file."""
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+
+
+class RingBuffer:
+    """
+    Preallocated circular buffer of int16 samples.
+
+    Attributes
+    ----------
+    total : int
+        no. of samples written since creation, positions are in this count.
+    """
+
+    def __init__(self, capacity):
+        self.data = np.zeros(capacity, dtype=np.int16)
+        self.total = 0
+
+    def write(self, frame):
+        capacity = len(self.data)
+        start = self.total % capacity
+        end = start + len(frame)
+        if end <= capacity:
+            self.data[start:end] = frame
+        else:
+            split = capacity - start
+            self.data[start:] = frame[:split]
+            self.data[:end - capacity] = frame[split:]
+        self.total += len(frame)
+
+    def read(self, start, end):
+        """returns bytes of samples [start, end), clipped to what is still buffered."""
+        capacity = len(self.data)
+        start = max(start, self.total - capacity, 0)
+        end = min(end, self.total)
+        if end <= start:
+            return b''
+        a, b = start % capacity, end % capacity
+        if a < b or b == 0:
+            return self.data[a:b or capacity].tobytes()
+        return self.data[a:].tobytes() + self.data[:b].tobytes()
+
+
+class EnergyVAD:
+    """
+    Energy based voice activity detector with an adaptive noise floor.
+
+    Attributes
+    ----------
+    start_ratio, stop_ratio : float
+        frame RMS relative to the noise floor to open / keep an utterance.
+    min_level : float
+        floor of the noise floor estimate, stops digital silence from
+        making every sound speech.
+    adapt : float
+        noise floor smoothing factor per non speech frame.
+    min_window : int
+        frames of the minimum statistics window. During an utterance the
+        floor rises towards the quietest frame of the last 'min_window'
+        frames: pauses in speech keep that minimum at the noise, a lasting
+        rise of the background (fan, music) lifts it, so the utterance
+        closes and the floor follows the new noise.
+    start_frames : int
+        consecutive loud frames to open an utterance.
+    hangover_frames : int
+        consecutive quiet frames to close it.
+    max_frames : int
+        utterances are closed after this many frames.
+    noise_floor : float
+    speaking : bool
+    """
+
+    START = 'start'
+    END = 'end'
+
+    def __init__(self, frame_ms=FRAME_MS, start_ratio=3.0, stop_ratio=2.0, min_level=60.0,
+                 adapt=0.05, start_ms=90, hangover_ms=300, max_utterance_s=15.0, min_window_ms=3000):
+        self.start_ratio = start_ratio
+        self.stop_ratio = stop_ratio
+        self.min_level = min_level
+        self.adapt = adapt
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.max_frames = int(max_utterance_s * 1000 / frame_ms)
+        self.min_window = max(1, min_window_ms // frame_ms)
+        self.recent = deque(maxlen=self.min_window)
+        self.noise_floor = None
+        self.speaking = False
+        self.run = 0
+        self.frames = 0
+        self.last_voiced = 0
+
+    def process(self, frame):
+        """returns 'START' / 'END' when an utterance opens / closes with 'frame', else None."""
+        rms = float(np.sqrt(np.mean(np.square(frame, dtype=np.float32))))
+        if self.noise_floor is None:
+            self.noise_floor = max(rms, self.min_level)
+        floor = self.noise_floor
+        if not self.speaking:
+            if rms > floor * self.start_ratio:
+                self.run += 1
+                if self.run >= self.start_frames:
+                    self.speaking = True
+                    self.recent.clear()
+                    self.frames = self.run
+                    self.last_voiced = self.run
+                    self.run = 0
+                    return self.START
+            else:
+                self.run = 0
+                self.noise_floor = max(self.min_level, floor + self.adapt * (rms - floor))
+            return None
+
+        self.frames += 1
+        recent = self.recent
+        recent.append(rms)
+        if self.frames >= self.min_window:
+            quietest = min(recent)
+            if quietest > floor:
+                floor = self.noise_floor = floor + self.adapt * (quietest - floor)
+        if rms > floor * self.stop_ratio:
+            self.last_voiced = self.frames
+        elif self.frames - self.last_voiced >= self.hangover_frames:
+            self.speaking = False
+            return self.END
+        if self.frames >= self.max_frames:
+            # no pause for the whole utterance: the background itself is that loud
+            self.noise_floor = max(self.min_level, min(recent))
+            self.speaking = False
+            return self.END
+        return None
+
+
+class AudioCapture:
+    """
+    Captures audio continuously and queues complete utterances.
+
+    Attributes
+    ----------
+    source : MicrophoneSource or WavSource
+    vad : EnergyVAD
+    preroll_ms : int
+        audio kept before the detected start of speech.
+    tail_ms : int
+        audio kept after the last voiced frame.
+    utterances : queue.Queue
+        complete 'Utterance's.
+    stats : dict
+        'frames', 'utterances', 'noise_floor', mean 'endpoint_ms' (audio
+        time from the last voiced frame to the end decision) and
+        'max_duration_s'.
+    """
+
+    def __init__(self, source, vad=None, preroll_ms=300, tail_ms=150, max_utterance_s=15.0):
+        self.source = source
+        self.sample_rate = source.sample_rate
+        self.frame = source.frame
+        frame_ms = self.frame * 1000 // self.sample_rate
+        self.vad = vad or EnergyVAD(frame_ms, max_utterance_s=max_utterance_s)
+        self.preroll = self.sample_rate * preroll_ms // 1000
+        self.tail = self.sample_rate * tail_ms // 1000
+        self.ring = RingBuffer(int(self.sample_rate * (max_utterance_s + 2 * preroll_ms / 1000.0)) + self.frame)
+        self.utterances = queue.Queue()
+        self.running = False
+        self.finished = threading.Event()
+        self.thread = None
+        self.stats = {'frames': 0, 'utterances': 0, 'noise_floor': 0.0, 'endpoint_ms': 0.0,
+                      'max_duration_s': 0.0}
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        ring, vad, stats = self.ring, self.vad, self.stats
+        speech_start = 0
+        try:
+            while self.running:
+                frame = self.source.read()
+                if frame is None:
+                    break
+                ring.write(frame)
+                stats['frames'] += 1
+                event = vad.process(frame)
+                if event == EnergyVAD.START:
+                    speech_start = ring.total - vad.frames * self.frame
+                elif event == EnergyVAD.END:
+                    self.emit(speech_start)
+                stats['noise_floor'] = vad.noise_floor
+            if vad.speaking:
+                # source ended mid utterance
+                vad.speaking = False
+                self.emit(speech_start)
+        finally:
+            self.finished.set()
+
+    def emit(self, speech_start):
+        vad = self.vad
+        last_voiced = self.ring.total - (vad.frames - vad.last_voiced) * self.frame
+        start = max(0, speech_start - self.preroll)
+        end = min(self.ring.total, last_voiced + self.tail)
+        utterance = Utterance(self.ring.read(start, end), self.sample_rate,
+                              start / self.sample_rate, end / self.sample_rate, time.perf_counter())
+        stats = self.stats
+        stats['utterances'] += 1
+        endpoint = (self.ring.total - last_voiced) * 1000.0 / self.sample_rate
+        stats['endpoint_ms'] += (endpoint - stats['endpoint_ms']) / stats['utterances']
+        stats['max_duration_s'] = max(stats['max_duration_s'], utterance.duration)
+        self.utterances.put(utterance)
+
+    def get(self, timeout=None):
+        """returns the next complete utterance, None if none arrived within 'timeout'."""
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def clear(self):
+        """drops utterances captured so far, e.g. before asking a question."""
+        while True:
+            try:
+                self.utterances.get_nowait()
+            except queue.Empty:
+                return
+
+    def report(self):
+        """returns a copy of 'stats'."""
+        return dict(self.stats)
+
+    def close(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(1.0)
+        self.source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run VAD endpointing over WAV files.')
+    parser.add_argument('wavs', nargs='+')
+    parser.add_argument('--realtime', action='store_true')
+    args = parser.parse_args()
+
+    for path in args.wavs:
+        capture = AudioCapture(WavSource(path, realtime=args.realtime)).start()
+        capture.finished.wait()
+        print(path)
+        while True:
+            utterance = capture.get(timeout=0)
+            if utterance is None:
+                break
+            print("  {:7.2f}s - {:7.2f}s  ({:.2f}s)".format(utterance.start, utterance.end, utterance.duration))
+        print("  {utterances} utterances, endpoint {endpoint_ms:.0f}ms, "
+              "noise floor {noise_floor:.0f}".format(**capture.report()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# bench_file_browser.py
+
+# Benchmark of the voice file explorer on a large directory.
+# Creates a directory with N empty files (50k by default) and compares
+# the old handlers (os.listdir on every step, the whole listing as one
+# HTML message) with file_browser.FileBrowser: first listing, cached
+# relisting after "back", one page of HTML, and fuzzy "open <name>"
+# lookups in the index, with whether the match would be launched directly
+# or offered as a candidate.
+#
+# Usage: python bench_file_browser.py [--count N] [--keep DIR]
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from file_browser import DirectoryCache, FileBrowser, FileIndex
+
+WORDS = ('report', 'invoice', 'holiday', 'photo', 'notes', 'budget', 'draft', 'scan', 'song', 'video')
+EXTENSIONS = ('.pdf', '.txt', '.jpg', '.docx', '.mp3')
+
+
+def populate(directory, count):
+    """creates 'count' empty files plus one subdirectory, returns the file names."""
+    os.makedirs(os.path.join(directory, 'big', 'sub'), exist_ok=True)
+    names = []
+    for i in range(count):
+        name = "{} {} {}{}".format(WORDS[i % len(WORDS)], WORDS[i // len(WORDS) % len(WORDS)], i,
+                                   EXTENSIONS[i % len(EXTENSIONS)])
+        open(os.path.join(directory, 'big', name), 'w').close()
+        names.append(name)
+    return names
+
+
+def legacy_list(path):
+    """the old handler: list, then build one message with every entry."""
+    files = os.listdir(path)
+    filestr = ""
+    for counter, f in enumerate(files, 1):
+        filestr += f"{counter}:  {f}<br>"
+    return files, filestr
+
+
+def timed(fn, repeat=5):
+    """returns (result, best of 'repeat' runs in ms)."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000.0
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='File explorer listing / paging / fuzzy open benchmark.')
+    parser.add_argument('--count', type=int, default=50000)
+    parser.add_argument('--keep', help='directory to keep the generated files in')
+    args = parser.parse_args()
+
+    directory = args.keep or tempfile.mkdtemp()
+    names = populate(directory, args.count)
+    big = os.path.join(directory, 'big')
+
+    (files, filestr), legacy_ms = timed(lambda: legacy_list(big), 3)
+    print("legacy: listdir + whole listing   {:8.1f}ms, message {:,} bytes".format(legacy_ms, len(filestr)))
+
+    index = FileIndex(directory).start()
+    index.ready.wait()
+    browser = FileBrowser(directory, index=index)
+    start = time.perf_counter()
+    browser.open(big)
+    first_ms = (time.perf_counter() - start) * 1000.0
+    html, render_ms = timed(browser.render)
+    print("browser: first listing (scan)     {:8.1f}ms".format(first_ms))
+    browser.back()
+    _, cached_ms = timed(lambda: browser.open(big))
+    print("browser: relisting (mtime check)  {:8.3f}ms".format(cached_ms))
+    print("browser: one page of HTML         {:8.3f}ms, message {:,} bytes".format(render_ms, len(html)))
+    _, page_ms = timed(lambda: (browser.next_page(), browser.render()))
+    print("browser: next page                {:8.3f}ms".format(page_ms))
+
+    queries = [
+        ('exact', names[12345 % len(names)]),
+        ('no extension', os.path.splitext(names[777 % len(names)])[0]),
+        ('spoken', names[4242 % len(names)].replace('.', ' dot ')),
+        ('misheard', 'holliday photos'),
+    ]
+    for label, query in queries:
+        matches, find_ms = timed(lambda: index.find(query, prefer=browser.cwd), 3)
+        exact = bool(matches) and browser.is_exact(matches[0], query)
+        print("find {:<13} {:8.1f}ms  {!r} -> {!r} ({})".format(
+            label, find_ms, query, matches[0].name if matches else None, 'opens' if exact else 'asks'))
+
+    # a change to the directory is picked up on the next listing
+    cache = DirectoryCache()
+    cache.listing(big)
+    time.sleep(0.01)
+    open(os.path.join(big, 'new file.txt'), 'w').close()
+    relisted = cache.listing(big)
+    print("after adding a file: {} entries, cache {}".format(len(relisted), cache.report()))
+    print("index:", index.report())
+
+    if not args.keep:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
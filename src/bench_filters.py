@@ -0,0 +1,151 @@
+# bench_filters.py
+
+# Jitter / lag benchmark for cursor smoothing filters (gesture_filters.py).
+# Runs every filter configuration over the index finger tip trajectory of
+# landmark recordings (see gesture_replay.py) and reports:
+#   jitter  RMS frame-to-frame cursor motion while the hand is still (px),
+#           from 0.3 s after it stopped, so catching up is counted as lag
+#   lag     time shift that best aligns output with the reference (ms),
+#           negative when prediction runs ahead
+#   rmse    RMS distance to the reference (px)
+#   cost    filter time per sample (us)
+# The reference is the noise free path for the synthetic trajectory used
+# when no recording is given, and the raw landmarks for recordings, taken
+# LATENCY ms after each sample: the cursor moves that much after the camera
+# captured the hand (see the 'motion_to_cursor' stage of GestureController),
+# so the best output for a sample is where the hand is once it is applied.
+#
+# Usage: python bench_filters.py [RECORDING ...] [--width W] [--height H] [--latency MS]
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from gesture_filters import CursorFilter
+from gesture_replay import load_recording
+
+CONFIGS = [
+    ('none', {}),
+    ('exponential', {'alpha': 0.5}),
+    ('exponential', {'alpha': 0.3}),
+    ('one_euro', {'min_cutoff': 1.0, 'beta': 20.0, 'd_cutoff': 1.0}),
+    ('one_euro', {}),
+    ('kalman', {}),
+    ('one_euro', {'prediction': 0.033}),
+    ('one_euro', {'prediction': 0.05}),
+    ('one_euro', {'prediction': 0.05, 'prediction_speed': 0.0}),
+    ('kalman', {'prediction': 0.05}),
+]
+
+
+def synthetic_path(seconds=60.0, fps=30.0, noise=0.002, seed=0, latency=0.0):
+    """
+    returns (t, truth, raw) of a hand alternating between holds and smooth moves,
+    'truth' is the noise free position 'latency' seconds after each sample.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(0.0, seconds, 1.0 / fps)
+    truth = np.zeros((len(t), 2))
+    point = rng.uniform(0.2, 0.8, 2)
+    i = 0
+    while i < len(t):
+        hold = int(rng.uniform(0.5, 1.5) * fps)
+        truth[i:i + hold] = point
+        i += hold
+        move = int(rng.uniform(0.3, 0.8) * fps)
+        target = rng.uniform(0.2, 0.8, 2)
+        s = np.linspace(0.0, 1.0, move, endpoint=False)
+        s = 10 * s**3 - 15 * s**4 + 6 * s**5  # minimum jerk profile
+        truth[i:i + move] = (point + np.outer(s, target - point))[:len(t) - i]
+        i += move
+        point = target
+    raw = truth + rng.normal(0.0, noise, truth.shape)
+    shifted = np.column_stack([np.interp(t + latency, t, truth[:, k]) for k in range(2)])
+    t = t + rng.normal(0.0, 0.002, len(t))  # capture timestamp jitter
+    return t, shifted, raw
+
+
+def recording_path(path, latency=0.0):
+    """
+    returns (t, ref, raw) for the first hand of every frame of a recording,
+    'ref' is the raw position 'latency' seconds after each frame.
+    """
+    frames = load_recording(path)
+    frames = frames[frames['n_hands'] > 0]
+    t = frames['timestamp'].astype(np.float64)
+    raw = frames['landmarks'][:, 0, 8, :2].astype(np.float64)
+    ref = np.column_stack([np.interp(t + latency, t, raw[:, k]) for k in range(2)])
+    return t, ref, raw
+
+
+def run_filter(cursor_filter, t, raw):
+    out = np.empty_like(raw)
+    start = time.perf_counter()
+    for i in range(len(t)):
+        out[i] = cursor_filter.filter(0, t[i], raw[i, 0], raw[i, 1])
+    return out, (time.perf_counter() - start) / max(len(t), 1)
+
+
+def evaluate(out, ref, t, scale, max_shift=15, settle=0.3):
+    """returns (jitter px, lag ms, rmse px) of 'out' against 'ref'."""
+    out = out * scale
+    ref = ref * scale
+    # smoothed reference speed decides which frames count as still
+    kernel = np.ones(5) / 5
+    smooth = np.column_stack([np.convolve(ref[:, k], kernel, mode='same') for k in range(2)])
+    speed = np.r_[0.0, np.hypot(*np.diff(smooth, axis=0).T)]
+    still = speed < 1.0
+    # frames of a hold before the output had 'settle' seconds to catch up are left out
+    frame = np.arange(len(still))
+    last_move = np.maximum.accumulate(np.where(still, -len(still), frame))
+    settled = still & (frame - last_move >= round(settle / float(np.median(np.diff(t)))))
+    step = np.r_[0.0, np.hypot(*np.diff(out, axis=0).T)]
+    jitter = float(np.sqrt(np.mean(step[settled] ** 2))) if settled.any() else float('nan')
+
+    moving = ~still
+    best, best_err = 0, float('inf')
+    for shift in range(-max_shift, max_shift + 1):
+        a = out[max_shift:len(out) - max_shift]
+        b = ref[max_shift - shift:len(ref) - max_shift - shift]
+        mask = moving[max_shift:len(out) - max_shift]
+        if not mask.any():
+            break
+        err = np.mean(np.sum((a[mask] - b[mask]) ** 2, axis=1))
+        if err < best_err:
+            best, best_err = shift, err
+    lag = best * float(np.median(np.diff(t))) * 1000.0
+    rmse = float(np.sqrt(np.mean(np.sum((out - ref) ** 2, axis=1))))
+    return jitter, lag, rmse
+
+
+def describe(mode, params):
+    return mode + ''.join(' {}={}'.format(k, v) for k, v in sorted(params.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cursor filter jitter / lag benchmark.')
+    parser.add_argument('recordings', nargs='*')
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--latency', type=float, default=50.0, help='capture to cursor latency, ms')
+    args = parser.parse_args()
+
+    latency = args.latency / 1000.0
+    sources = [('synthetic', synthetic_path(latency=latency))] if not args.recordings else [
+        (os.path.basename(path), recording_path(path, latency)) for path in args.recordings]
+    scale = np.array([args.width, args.height], dtype=np.float64)
+
+    for name, (t, ref, raw) in sources:
+        print("{}: {} samples, {:.0f} ms latency".format(name, len(t), args.latency))
+        print("  {:<50} {:>9} {:>9} {:>9} {:>9}".format('filter', 'jitter px', 'lag ms', 'rmse px', 'cost us'))
+        for mode, params in CONFIGS:
+            out, cost = run_filter(CursorFilter(mode, **params), t, raw)
+            jitter, lag, rmse = evaluate(out, ref, t, scale)
+            print("  {:<50} {:>9.2f} {:>9.1f} {:>9.2f} {:>9.1f}".format(
+                describe(mode, params), jitter, lag, rmse, cost * 1e6))
+
+
+if __name__ == '__main__':
+    main()
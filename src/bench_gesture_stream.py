@@ -0,0 +1,108 @@
+# bench_gesture_stream.py
+
+# Benchmark of the gesture event stream.
+# Measures the cost of 'GestureStream.publish' on the publishing thread
+# without subscribers and while RATE events per second go out, paced like
+# the gesture thread, to N subscriber processes; each subscriber reports
+# the events received, sequence gaps and delivery latency. A last
+# subscriber connects but never reads, to show that it loses its oldest
+# events and is disconnected while the others keep up.
+#
+# Usage: python bench_gesture_stream.py [--rate HZ] [--seconds S] [--subscribers N]
+
+import argparse
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+
+from gesture_stream import GestureStream, subscribe
+
+
+def consume(address, results, ready):
+    """subscriber process: counts events and gaps, measures delivery latency."""
+    received = lost = 0
+    last = None
+    latencies = []
+    events = subscribe(address)
+    ready.set()
+    for seq, stamp, kind, hand, value, x, y in events:
+        if seq == 0:
+            continue
+        if last is not None and seq != last + 1:
+            lost += seq - last - 1
+        last = seq
+        received += 1
+        latencies.append((time.time() - stamp) * 1000.0)
+    latencies.sort()
+    results.put((received, lost, latencies[len(latencies) // 2] if latencies else 0.0,
+                 latencies[int(len(latencies) * 0.99)] if latencies else 0.0))
+
+
+def publish_paced(stream, rate, seconds):
+    """publishes cursor events at 'rate' per second, returns per call costs in µs."""
+    costs = []
+    interval = 1.0 / rate
+    count = int(rate * seconds)
+    next_at = time.perf_counter()
+    for i in range(count):
+        # sleeping, like the gesture thread between frames, lets the I/O thread run
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        next_at += interval
+        start = time.perf_counter()
+        stream.cursor(1, (i % 1000) / 1000.0, 0.5, start)
+        costs.append((time.perf_counter() - start) * 1e6)
+    costs.sort()
+    return costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gesture event stream publish cost / fan out benchmark.')
+    parser.add_argument('--rate', type=float, default=5000.0, help='events per second')
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--subscribers', type=int, default=4)
+    args = parser.parse_args()
+
+    address = os.path.join(tempfile.mkdtemp(), 'gestures.sock') if hasattr(socket, 'AF_UNIX') \
+        else ('127.0.0.1', 27017)
+    stream = GestureStream(address, max_lag=1.0).start()
+
+    start = time.perf_counter()
+    for i in range(100000):
+        stream.cursor(1, 0.5, 0.5)
+    print("publish, no subscribers          {:6.2f}µs".format((time.perf_counter() - start) * 10.0))
+
+    results = multiprocessing.Queue()
+    workers = []
+    for _ in range(args.subscribers):
+        ready = multiprocessing.Event()
+        worker = multiprocessing.Process(target=consume, args=(address, results, ready), daemon=True)
+        worker.start()
+        ready.wait(10.0)
+        workers.append(worker)
+    stalled = socket.socket(socket.AF_UNIX if isinstance(address, str) else socket.AF_INET)
+    stalled.connect(address)
+    while stream.report()['subscribers'] < args.subscribers + 1:
+        time.sleep(0.01)
+
+    costs = publish_paced(stream, args.rate, args.seconds)
+    print("publish, {} subscribers, {:.0f}/s   p50 {:6.2f}µs  p99 {:6.2f}µs  max {:7.2f}µs".format(
+        args.subscribers + 1, args.rate, costs[len(costs) // 2], costs[int(len(costs) * 0.99)], costs[-1]))
+    time.sleep(0.2)
+    report = stream.report()
+    stream.close()
+    for _ in workers:
+        received, lost, p50, p99 = results.get(timeout=10.0)
+        print("  subscriber: {} events, {} lost, latency p50 {:.2f}ms p99 {:.2f}ms".format(
+            received, lost, p50, p99))
+    stalled.close()
+    print("  stalled subscriber: disconnected {}, dropped {} events".format(
+        report['disconnected'], report['dropped']))
+    print("stream:", report)
+
+
+if __name__ == '__main__':
+    main()
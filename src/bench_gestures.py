@@ -0,0 +1,117 @@
+# bench_gestures.py
+
+# Headless gesture benchmark suite.
+# Replays landmark recordings (see gesture_replay.py) through HandRecog and
+# Controller with a stub actuation backend and reports frames/s, p50/p99
+# classification latency and gesture-decision accuracy.
+# Without recordings, a labelled synthetic recording is generated, so the
+# suite runs on a Linux CI box without webcam or display.
+#
+# Usage: python bench_gestures.py [RECORDING ...] [--realtime]
+#                                 [--min-accuracy A] [--min-fps F]
+
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from Gesture_Controller import Gest
+from gesture_replay import (LandmarkRecorder, ReplayDriver, load_recording,
+                            NO_LABEL, RIGHT)
+
+FINGERS = [(5, 6, 7, 8), (9, 10, 11, 12), (13, 14, 15, 16), (17, 18, 19, 20)]
+FINGER_X = [0.44, 0.49, 0.54, 0.59]
+
+# open fingers (index, middle, ring, pinky) of every synthetic pose
+POSES = {
+    Gest.FIST: (0, 0, 0, 0),
+    Gest.INDEX: (1, 0, 0, 0),
+    Gest.V_GEST: (1, 1, 0, 0),
+    Gest.TWO_FINGER_CLOSED: (1, 1, 0, 0),
+    Gest.LAST4: (1, 1, 1, 1),
+    Gest.PINCH_MAJOR: (0, 1, 1, 1),
+}
+
+
+def hand_pose(gesture, rng, noise=0.002):
+    """returns (21,3) landmarks of a right hand showing 'gesture' (a key of 'POSES')."""
+    lm = np.zeros((21, 3), dtype=np.float32)
+    lm[0] = (0.5, 0.8, 0.0)
+    for (mcp, pip, dip, tip), x, is_open in zip(FINGERS, FINGER_X, POSES[gesture]):
+        lm[mcp] = (x, 0.6, 0.0)
+        ys = (0.53, 0.47, 0.40) if is_open else (0.62, 0.64, 0.66)
+        for point, y in zip((pip, dip, tip), ys):
+            lm[point] = (x, y, 0.0)
+    if gesture == Gest.V_GEST:
+        lm[8, 0] -= 0.04
+        lm[12, 0] += 0.04
+    lm[1:5] = [(0.42, 0.75, 0.0), (0.39, 0.72, 0.0), (0.37, 0.71, 0.0), (0.35, 0.70, 0.0)]
+    if gesture == Gest.PINCH_MAJOR:
+        lm[4] = lm[8] + (0.01, 0.0, 0.0)
+    # move the whole hand around a little, plus per landmark jitter
+    lm[:, :2] += rng.uniform(-0.1, 0.1, 2)
+    lm += rng.normal(0.0, noise, lm.shape)
+    return lm
+
+
+def synthesize_recording(path, frames=3000, fps=30.0, seed=0):
+    """
+    writes a labelled synthetic recording of a right hand switching poses.
+
+    Frames right after a pose change are left unlabelled, since the
+    debounce in 'HandRecog.get_gesture' needs a few frames to follow.
+    """
+    rng = np.random.default_rng(seed)
+    gestures = list(POSES)
+    index = 0
+    with LandmarkRecorder(path) as recorder:
+        while index < frames:
+            gesture = gestures[rng.integers(len(gestures))]
+            hold = int(rng.integers(10, 40))
+            for step in range(min(hold, frames - index)):
+                label = int(gesture) if step > 6 else NO_LABEL
+                recorder.write(index / fps, hand_pose(gesture, rng)[None], [RIGHT], label)
+                index += 1
+
+
+def bench(path, realtime):
+    report = ReplayDriver(load_recording(path), realtime=realtime).run()
+    accuracy = report['accuracy']
+    print("{:<28} frames={:<6} fps={:>9.0f} p50={:6.1f}us p99={:6.1f}us accuracy={}".format(
+        os.path.basename(path)[-28:], report['frames'], report['fps'],
+        report['p50_us'], report['p99_us'],
+        'n/a' if accuracy is None else '{:.2%} of {}'.format(accuracy, report['labelled'])))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless gesture benchmark suite.')
+    parser.add_argument('recordings', nargs='*')
+    parser.add_argument('--realtime', action='store_true', help='replay at recorded speed')
+    parser.add_argument('--synthetic-frames', type=int, default=3000)
+    parser.add_argument('--min-accuracy', type=float, default=None)
+    parser.add_argument('--min-fps', type=float, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recordings = args.recordings
+        if not recordings:
+            synthetic = os.path.join(tmp, 'synthetic.lmk')
+            synthesize_recording(synthetic, args.synthetic_frames)
+            recordings = [synthetic]
+
+        failed = False
+        for path in recordings:
+            report = bench(path, args.realtime)
+            if args.min_fps is not None and report['fps'] < args.min_fps:
+                failed = True
+            if (args.min_accuracy is not None and report['accuracy'] is not None
+                    and report['accuracy'] < args.min_accuracy):
+                failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
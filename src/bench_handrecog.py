@@ -0,0 +1,148 @@
+# bench_handrecog.py
+
+# Micro-benchmark for per-hand gesture classification.
+# Compares the previous protobuf-indexing HandRecog (LegacyHandRecog) against
+# the vectorized (21,3) array implementation in Gesture_Controller.
+#
+# Usage: python bench_handrecog.py [--hands N] [--repeat R]
+
+import argparse
+import math
+import time
+from types import SimpleNamespace
+
+import numpy as np
+try:
+    from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+except ImportError:
+    descriptor_pb2 = None
+
+from Gesture_Controller import HLabel, HandRecog
+
+
+class LegacyHandRecog(HandRecog):
+    """
+    HandRecog as it was before vectorization, reading every distance
+    straight from the protobuf landmark list. Kept only as a baseline.
+    """
+
+    def update_hand_result(self, hand_result):
+        self.hand_result = hand_result
+
+    def get_signed_dist(self, point):
+        sign = -1
+        if self.hand_result.landmark[point[0]].y < self.hand_result.landmark[point[1]].y:
+            sign = 1
+        dist = (self.hand_result.landmark[point[0]].x - self.hand_result.landmark[point[1]].x)**2
+        dist += (self.hand_result.landmark[point[0]].y - self.hand_result.landmark[point[1]].y)**2
+        dist = math.sqrt(dist)
+        return dist*sign
+
+    def get_dist(self, point):
+        dist = (self.hand_result.landmark[point[0]].x - self.hand_result.landmark[point[1]].x)**2
+        dist += (self.hand_result.landmark[point[0]].y - self.hand_result.landmark[point[1]].y)**2
+        return math.sqrt(dist)
+
+    def get_dz(self, point):
+        return abs(self.hand_result.landmark[point[0]].z - self.hand_result.landmark[point[1]].z)
+
+    def set_finger_state(self):
+        if self.hand_result is None:
+            return
+        points = [[8,5,0],[12,9,0],[16,13,0],[20,17,0]]
+        self.finger = 0
+        for point in points:
+            dist = self.get_signed_dist(point[:2])
+            dist2 = self.get_signed_dist(point[1:])
+            try:
+                ratio = round(dist/dist2,1)
+            except ZeroDivisionError:
+                ratio = round(dist/0.01,1)
+            self.finger = self.finger << 1
+            if ratio > 0.5:
+                self.finger = self.finger | 1
+        self.pinch_dist = self.get_dist([8,4])
+        dist2 = self.get_dist([5,9])
+        self.v_ratio = self.get_dist([8,12]) / dist2 if dist2 else math.inf
+        self.dz = self.get_dz([8,12])
+
+
+def landmark_list_class():
+    """
+    returns a protobuf message class shaped like mediapipe's
+    NormalizedLandmarkList, or None if protobuf is not installed.
+    Attribute access cost on protobuf is what the vectorized path avoids,
+    so plain python objects would understate the legacy cost.
+    """
+    try:
+        from mediapipe.framework.formats.landmark_pb2 import NormalizedLandmarkList
+        return NormalizedLandmarkList
+    except ImportError:
+        pass
+    if descriptor_pb2 is None:
+        return None
+    field = descriptor_pb2.FieldDescriptorProto
+    proto = descriptor_pb2.FileDescriptorProto(name='bench_landmark.proto', package='bench')
+    landmark = proto.message_type.add(name='NormalizedLandmark')
+    for number, name in enumerate('xyz', 1):
+        landmark.field.add(name=name, number=number, type=field.TYPE_FLOAT, label=field.LABEL_OPTIONAL)
+    landmarks = proto.message_type.add(name='NormalizedLandmarkList')
+    landmarks.field.add(name='landmark', number=1, type=field.TYPE_MESSAGE,
+                        type_name='.bench.NormalizedLandmark', label=field.LABEL_REPEATED)
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(proto)
+    return message_factory.GetMessageClass(pool.FindMessageTypeByName('bench.NormalizedLandmarkList'))
+
+
+def make_hands(n, seed=0):
+    """returns 'n' random hands as mediapipe-like landmark objects."""
+    rng = np.random.default_rng(seed)
+    message = landmark_list_class()
+    hands = []
+    for _ in range(n):
+        points = rng.random((21, 3), dtype=np.float32)
+        if message is not None:
+            hand = message()
+            for x, y, z in points:
+                hand.landmark.add(x=x, y=y, z=z)
+        else:
+            # float32 round trip so both implementations see identical values
+            hand = SimpleNamespace(landmark=[
+                SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in points])
+        hands.append(hand)
+    return hands
+
+
+def run(recog, hands, repeat):
+    """returns (seconds per hand, gestures) for classifying 'hands'."""
+    gestures = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        gestures.clear()
+        for hand in hands:
+            recog.update_hand_result(hand)
+            recog.set_finger_state()
+            gestures.append(recog.get_gesture())
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(hands)), gestures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hands', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    hands = make_hands(args.hands)
+    legacy, legacy_gest = run(LegacyHandRecog(HLabel.MAJOR), hands, args.repeat)
+    vector, vector_gest = run(HandRecog(HLabel.MAJOR), hands, args.repeat)
+
+    agree = sum(a == b for a, b in zip(legacy_gest, vector_gest)) / len(hands)
+    print("hands: {}  repeat: {}".format(args.hands, args.repeat))
+    print("legacy     : {:8.2f} us/hand".format(legacy * 1e6))
+    print("vectorized : {:8.2f} us/hand  ({:.2f}x)".format(vector * 1e6, legacy / vector))
+    print("agreement  : {:.2%}".format(agree))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+# bench_intents.py
+
+# Routing benchmark for intent_router against the old respond() if/elif chain.
+# Routes labelled utterances through both and reports throughput and routing
+# accuracy (fallback to the chat model counts as the label 'chat').
+# Utterances come from tab separated files of "label<TAB>utterance[<TAB>files]"
+# lines, where a third column marks the file explorer as open; without files
+# a labelled synthetic set is generated from templates, including the
+# substring traps of the old chain ("update", "page", ...).
+# Expect the compiled router to be slower per utterance than the chain
+# (Python automaton steps against C substring scans); what it buys is the
+# accuracy column.
+#
+# Usage: python bench_intents.py [UTTERANCES.tsv ...] [--count N] [--min-accuracy A]
+
+import argparse
+import random
+import sys
+import time
+
+from intent_router import aura_router
+
+TEMPLATES = [
+    ('hello', ['hello aura', 'aura hello there', 'hello']),
+    ('name', ['aura what is your name', "what's your name aura"]),
+    ('date', ['aura what is the date', "aura tell me today's date", 'what date is it today aura']),
+    ('time', ['aura what time is it', 'aura tell me the time']),
+    ('search', ['aura search for {thing}', 'aura search {thing}', 'can you search {thing} aura']),
+    ('location', ['aura show me a location', 'aura find a location']),
+    ('copy', ['aura copy', 'aura copy that']),
+    ('undo', ['aura undo', 'aura undo that']),
+    ('paste', ['aura paste', 'aura paste it here']),
+    ('list', ['aura list files', 'aura list']),
+    ('calculator', ['aura open calculator', 'aura please open calculator']),
+    ('calendar', ['aura open calendar']),
+    ('whatsapp', ['aura open whatsapp chat of {contact}', 'aura open whatsapp chat for {contact}']),
+    ('gesture_start', ['aura launch gesture recognition']),
+    ('gesture_stop', ['aura stop gesture recognition']),
+    ('sleep', ['aura bye', 'aura go to sleep', 'good bye aura']),
+    ('exit', ['aura exit', 'aura terminate']),
+    # phrases the old substring chain misroutes
+    ('chat', ['aura how do i update my laptop', 'aura write a page about {thing}',
+              'aura is a timeline the same as a schedule', 'aura tell me about {thing}',
+              'aura how does a bicycle work', 'aura which candidate won',
+              'aura what is an ecosystem', 'aura recommend a good playlist']),
+]
+FILE_TEMPLATES = [
+    ('file_open', ['aura open {n}', 'aura open number {n}']),
+    ('file_back', ['aura back', 'aura go back']),
+    ('file_close', ['aura close', 'aura close files']),
+]
+THINGS = ['cats', 'the weather in paris', 'python tutorials', 'black holes', 'pizza recipes']
+CONTACTS = ['sagar', 'mummy', 'nikhar']
+
+
+def synthesize(count, seed=0):
+    """returns list of (label, utterance, files_open)."""
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        files_open = rng.random() < 0.2
+        label, texts = rng.choice(FILE_TEMPLATES if files_open and rng.random() < 0.7 else TEMPLATES)
+        text = rng.choice(texts).format(thing=rng.choice(THINGS), contact=rng.choice(CONTACTS),
+                                        n=rng.randint(1, 30))
+        samples.append((label, text, files_open))
+    return samples
+
+
+def load(path):
+    samples = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            columns = line.rstrip('\n').split('\t')
+            if len(columns) >= 2:
+                samples.append((columns[0], columns[1], len(columns) > 2 and columns[2] == 'files'))
+    return samples
+
+
+def legacy_route(voice_data, files_open):
+    """returns intent name chosen by the old respond() substring chain."""
+    voice_data = voice_data.replace('aura', '').strip()
+    if 'hello' in voice_data:
+        return 'hello'
+    if 'what is your name' in voice_data:
+        return 'name'
+    if 'date' in voice_data:
+        return 'date'
+    if 'time' in voice_data:
+        return 'time'
+    if 'search' in voice_data:
+        return 'search'
+    if 'location' in voice_data:
+        return 'location'
+    if 'copy' in voice_data:
+        return 'copy'
+    if 'undo' in voice_data:
+        return 'undo'
+    if 'paste' in voice_data or 'pest' in voice_data or 'page' in voice_data:
+        return 'paste'
+    if 'list' in voice_data:
+        return 'list'
+    if files_open:
+        if 'open' in voice_data:
+            return 'file_open'
+        if 'back' in voice_data:
+            return 'file_back'
+        if 'close' in voice_data:
+            return 'file_close'
+        return 'none'
+    if 'open calculator' in voice_data:
+        return 'calculator'
+    if 'open calendar' in voice_data:
+        return 'calendar'
+    if 'open whatsapp chat' in voice_data:
+        return 'whatsapp'
+    if 'launch gesture recognition' in voice_data:
+        return 'gesture_start'
+    if 'stop gesture recognition' in voice_data:
+        return 'gesture_stop'
+    if 'bye' in voice_data or 'sleep' in voice_data:
+        return 'sleep'
+    if 'exit' in voice_data or 'terminate' in voice_data:
+        return 'exit'
+    return 'chat'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Intent routing benchmark.')
+    parser.add_argument('utterances', nargs='*')
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--min-accuracy', type=float, default=None)
+    args = parser.parse_args()
+
+    samples = [s for path in args.utterances for s in load(path)] if args.utterances else synthesize(args.count)
+    router = aura_router()
+    files = ('files',)
+
+    def route(text, files_open):
+        match = router.route(text.replace('aura', '').strip(), files if files_open else ())
+        return 'chat' if match is None else match.name
+
+    print("{} utterances".format(len(samples)))
+    print("{:<8} {:>14} {:>10} {:>10}".format('router', 'utterances/s', 'us p50', 'accuracy'))
+    accuracy = 0.0
+    for name, fn in (('legacy', legacy_route), ('compiled', route)):
+        correct = 0
+        times = []
+        for label, text, files_open in samples:
+            start = time.perf_counter()
+            result = fn(text, files_open)
+            times.append(time.perf_counter() - start)
+            correct += result == label
+        times.sort()
+        accuracy = correct / len(samples)
+        print("{:<8} {:>14.0f} {:>10.2f} {:>9.1f}%".format(
+            name, len(samples) / sum(times), times[len(times) // 2] * 1e6, accuracy * 100))
+
+    if args.min_accuracy is not None and accuracy < args.min_accuracy:
+        print("FAIL: routing accuracy {:.3f} < {}".format(accuracy, args.min_accuracy))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
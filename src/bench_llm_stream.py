@@ -0,0 +1,68 @@
+# bench_llm_stream.py
+
+# Time to first audio of Aura's conversational fallback, blocking vs streaming.
+# Replies come from llm_client.MockServer (or a real endpoint with --url)
+# and are consumed like Aura.reply_stream does, with speaking replaced by
+# a sleep proportional to the chunk length. Reports per mode:
+#   first    time from request to the first chunk handed to speech (ms)
+#   done     time until the last chunk has been spoken (ms)
+#
+# Usage: python bench_llm_stream.py [--url URL] [--runs N] [--first-delay S]
+#                                   [--delay S] [--speech-rate CHARS_PER_S]
+
+import argparse
+import time
+
+import numpy as np
+
+from llm_client import HTTPChatClient, MockServer, sentence_chunks
+
+REPLIES = [
+    "Sure! The capital of France is Paris, known for the Eiffel Tower.",
+    "It is sunny today. Expect a high of twenty four degrees.",
+    "Here is one: why did the scarecrow win an award? He was outstanding in his field.",
+]
+
+
+def run(client, streaming, speech_rate):
+    """returns (first, done) seconds for one reply."""
+    messages = [{'role': 'user', 'content': 'hello'}]
+    start = time.perf_counter()
+    chunks = sentence_chunks(client.stream(messages)) if streaming else [client.complete(messages)]
+    first = None
+    for chunk in chunks:
+        if first is None:
+            first = time.perf_counter() - start
+        time.sleep(len(chunk) / speech_rate)
+    return first, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LLM streaming time to first audio benchmark.')
+    parser.add_argument('--url', help='OpenAI compatible endpoint, default: local mock server')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--first-delay', type=float, default=0.4)
+    parser.add_argument('--delay', type=float, default=0.04)
+    parser.add_argument('--speech-rate', type=float, default=15.0)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server = MockServer(replies=REPLIES, first_delay=args.first_delay, delay=args.delay).start()
+        url = server.url
+    try:
+        print("{:<10} {:>10} {:>10} {:>10} {:>10}".format('mode', 'first p50', 'first p99', 'done p50', 'done p99'))
+        for streaming in (False, True):
+            client = HTTPChatClient(url)
+            times = np.array([run(client, streaming, args.speech_rate) for _ in range(args.runs)]) * 1000.0
+            print("{:<10} {:>10.0f} {:>10.0f} {:>10.0f} {:>10.0f}".format(
+                'streaming' if streaming else 'blocking',
+                *np.percentile(times[:, 0], [50, 99]), *np.percentile(times[:, 1], [50, 99])))
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# bench_memory.py
+
+# Long session benchmark for conversation_memory.ConversationMemory.
+# Simulates hours of conversational fallback turns against a mock client
+# (llm_client.MockChatClient, no delays) and reports, per block of turns,
+# the request size sent to the model and the time spent building requests
+# and recording turns. Both should stay flat however long the session runs.
+# Finally the session is resumed from its log to time the replay.
+#
+# Usage: python bench_memory.py [--turns N] [--block B] [--summarizer extractive|llm]
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from conversation_memory import ConversationMemory, LLMSummarizer, extractive_summary
+from llm_client import MockChatClient
+
+SYSTEM_PROMPT = "You are a concise assistant. Respond in 1-2 lines (max 10 words) unless the user asks for details."
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Conversation memory long session benchmark.')
+    parser.add_argument('--turns', type=int, default=5000)
+    parser.add_argument('--block', type=int, default=500)
+    parser.add_argument('--summarizer', choices=('extractive', 'llm'), default='extractive')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    client = MockChatClient(["Paris is the capital of France.", "It will rain later today, take an umbrella.",
+                             "Sure, I set a reminder for five o'clock."], first_delay=0.0, delay=0.0)
+    summarizer = extractive_summary if args.summarizer == 'extractive' else LLMSummarizer(
+        MockChatClient(["The user asked about travel, weather and reminders."], first_delay=0.0, delay=0.0))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'conversation.jsonl')
+        memory = ConversationMemory(SYSTEM_PROMPT, summarizer=summarizer, log_path=log_path)
+        print("{:>8} {:>12} {:>12} {:>12} {:>10}".format('turns', 'bytes mean', 'bytes max', 'us/turn', 'log KiB'))
+        sizes, cost = [], 0.0
+        for turn in range(1, args.turns + 1):
+            question = "question {} about {}".format(turn, "x" * int(rng.integers(10, 120)))
+            start = time.perf_counter()
+            messages = memory.messages(question)
+            cost += time.perf_counter() - start
+            answer = client.complete(messages)
+            start = time.perf_counter()
+            memory.add_turn(question, answer)
+            cost += time.perf_counter() - start
+            memory.wait()
+            sizes.append(memory.stats['request_bytes'])
+            if turn % args.block == 0:
+                print("{:>8} {:>12.0f} {:>12} {:>12.1f} {:>10.1f}".format(
+                    turn, np.mean(sizes), max(sizes), cost / len(sizes) * 1e6, memory.stats['log_bytes'] / 1024))
+                sizes, cost = [], 0.0
+        memory.close()
+
+        start = time.perf_counter()
+        resumed = ConversationMemory(SYSTEM_PROMPT, log_path=log_path)
+        print("resume: {:.1f}ms, {} turns verbatim, summary {} chars".format(
+            (time.perf_counter() - start) * 1000.0, len(resumed.turns), len(resumed.summary)))
+        resumed.close()
+
+
+if __name__ == '__main__':
+    main()
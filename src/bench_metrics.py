@@ -0,0 +1,78 @@
+# bench_metrics.py
+
+# Overhead and accuracy of voice_metrics.VoiceMetrics.
+# Runs the trace lifecycle of one command the way Aura does (trace,
+# command, route / handler spans, first reply, audio start, finish), with
+# and without the rotating trace log, and reports the cost per command
+# next to typical command times. Checks the histogram percentiles
+# against exact ones (numpy) on log-normally distributed latencies.
+#
+# Usage: python bench_metrics.py [--commands N]
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from voice_metrics import Histogram, VoiceMetrics
+
+
+def command(metrics):
+    timing = metrics.trace('voice', time.perf_counter())
+    with timing.span('recognize'):
+        pass
+    timing.posted = time.perf_counter()
+    with metrics.command(timing):
+        with metrics.span('route'):
+            pass
+        with metrics.span('handler'):
+            started = metrics.replying()
+    started(time.perf_counter())
+
+
+def cost_us(metrics, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        command(metrics)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Voice metrics overhead / percentile accuracy.')
+    parser.add_argument('--commands', type=int, default=20000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        plain = cost_us(VoiceMetrics(), args.commands)
+        logged_metrics = VoiceMetrics(os.path.join(directory, 'traces.jsonl'), max_bytes=256 * 1024)
+        logged = cost_us(logged_metrics, args.commands)
+        logged_metrics.close()
+        files = sorted(os.listdir(directory))
+    finally:
+        shutil.rmtree(directory)
+    print("per command: {:.1f}us, with trace log {:.1f}us (rotated into {} files)".format(plain, logged, len(files)))
+    for label, ms in (('typed command, ~1ms', 1.0), ('local intent by voice, ~600ms', 600.0),
+                      ('LLM reply by voice, ~1500ms', 1500.0)):
+        print("  {:<30} overhead {:.3%}".format(label, logged / 1000.0 / ms))
+
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(6.0, 0.6, 100000)
+    histogram = Histogram()
+    start = time.perf_counter()
+    for value in values:
+        histogram.record(float(value))
+    record_us = (time.perf_counter() - start) / len(values) * 1e6
+    print("histogram record: {:.2f}us".format(record_us))
+    for q in (0.5, 0.95, 0.99):
+        exact = float(np.percentile(values, q * 100))
+        estimate = histogram.percentile(q)
+        print("  p{:<3} exact {:8.1f}ms  histogram {:8.1f}ms  error {:+.2%}".format(
+            int(q * 100), exact, estimate, estimate / exact - 1))
+
+
+if __name__ == '__main__':
+    main()
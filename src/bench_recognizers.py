@@ -0,0 +1,92 @@
+# bench_recognizers.py
+
+# Benchmark of recognition tail latency against local mock servers.
+# The primary server answers in ~DELAY ms but takes SLOW_MS for a few
+# percent of the requests, like a cloud service under load; the backup is
+# a bit slower and steady. Compares the old call (one backend, no time
+# limit), one backend with a deadline, and 'HedgedRecognizer' hedging at
+# the primary's p95, then takes the primary down to show failover and
+# the circuit breaker.
+#
+# Usage: python bench_recognizers.py [--requests N] [--delay MS] [--slow P] [--slow-ms MS]
+
+import argparse
+import time
+
+from audio_capture import Utterance
+from recognizers import HedgedRecognizer, HTTPRecognizer, MockRecognizer, MockServer, RecognitionError
+
+
+def run(recognizer, utterance, requests):
+    """returns sorted request latencies, ms, and the no. of failed requests."""
+    latencies = []
+    failed = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        try:
+            recognizer.recognize(utterance)
+        except RecognitionError:
+            failed += 1
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return sorted(latencies), failed
+
+
+def summary(label, latencies, failed):
+    def q(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+    print("{:<30} p50 {:7.1f}  p95 {:7.1f}  p99 {:7.1f}  max {:7.1f} ms  failed {}".format(
+        label, q(0.5), q(0.95), q(0.99), latencies[-1], failed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recognition deadline / hedging / circuit breaker benchmark.')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=40.0, help='typical primary latency, ms')
+    parser.add_argument('--slow', type=float, default=0.03, help='share of slow primary answers')
+    parser.add_argument('--slow-ms', type=float, default=1500.0)
+    parser.add_argument('--deadline', type=float, default=1.0, help='s')
+    args = parser.parse_args()
+
+    utterance = Utterance(b'\x00\x00' * 16000 * 2, 16000, 0.0, 2.0, 0.0)
+    primary = MockServer(mock=MockRecognizer(delay=args.delay / 1000.0, jitter=args.delay / 4000.0,
+                                             slow=args.slow, slow_delay=args.slow_ms / 1000.0, seed=1)).start()
+    backup = MockServer(mock=MockRecognizer(delay=args.delay * 1.5 / 1000.0, jitter=args.delay / 4000.0,
+                                            seed=2)).start()
+
+    def backends():
+        first, second = HTTPRecognizer(primary.url), HTTPRecognizer(backup.url)
+        first.name, second.name = 'primary', 'backup'
+        return [first, second]
+
+    legacy = HedgedRecognizer(backends()[:1], deadline=60.0, initial_hedge=60.0)
+    summary("one backend, no time limit", *run(legacy, utterance, args.requests))
+    bounded = HedgedRecognizer(backends()[:1], deadline=args.deadline)
+    summary("one backend, {:.1f}s deadline".format(args.deadline), *run(bounded, utterance, args.requests))
+
+    served = primary.requests + backup.requests
+    hedged = HedgedRecognizer(backends(), deadline=args.deadline)
+    summary("hedged at p95", *run(hedged, utterance, args.requests))
+    report = hedged.report()
+    extra = primary.requests + backup.requests - served - args.requests
+    print("  hedged {} of {} requests ({:.1%} extra load), hedge answered first {}x, primary p95 {}ms, "
+          "breaker opened {}x".format(report['hedged'], report['requests'], extra / args.requests,
+                                      report['hedge_wins'], report['primary']['p95_ms'],
+                                      report['primary']['opens']))
+
+    # primary down: every request fails over until the breaker opens
+    primary.close()
+    start = time.perf_counter()
+    hedged.recognize(utterance)
+    first_ms = (time.perf_counter() - start) * 1000.0
+    latencies, failed = run(hedged, utterance, 50)
+    print("primary down: first request {:.1f}ms, then p50 {:.1f}ms, breaker {}, failovers {}".format(
+        first_ms, latencies[len(latencies) // 2], hedged.report()['primary']['state'],
+        hedged.report()['failovers']))
+
+    for recognizer in (legacy, bounded, hedged):
+        recognizer.close()
+    backup.close()
+
+
+if __name__ == '__main__':
+    main()
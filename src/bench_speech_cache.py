@@ -0,0 +1,67 @@
+# bench_speech_cache.py
+
+# Playback start latency of fixed phrases with and without
+# speech_cache.SpeechCache. Speaks Aura's built-in replies several times
+# through a 'SpeechWorker' and reports the mean time from 'say' until
+# playback has started ('start_ms'). The engine is a MockEngine whose
+# blocking synthesis delay stands in for pyttsx3 (--synthesis-ms, measure
+# yours by timing 'engine.say' + 'iterate'), clips play on a MockPlayer;
+# pass --real to use pyttsx3 and the sound card instead.
+#
+# Usage: python bench_speech_cache.py [--synthesis-ms MS] [--rounds N] [--real]
+
+import argparse
+import shutil
+import tempfile
+import time
+
+from speech_cache import ClipPlayer, MockPlayer, SpeechCache
+from speech_output import MockEngine, SpeechWorker, pyttsx3_engine
+
+PHRASES = ("Good Afternoon!", "I am Aura, how may I help you?", "Copied", "Pasted",
+           "Launched Successfully.", "Good bye! Have a nice day.")
+
+
+def run(cache, args):
+    if args.real:
+        worker = SpeechWorker(pyttsx3_engine, cache=cache, player_factory=ClipPlayer)
+    else:
+        worker = SpeechWorker(lambda: MockEngine(chars_per_second=200.0, synthesis_s=args.synthesis_ms / 1000.0),
+                              cache=cache, player_factory=MockPlayer)
+    if cache is not None:
+        worker.warm(PHRASES)
+        while worker.renders or len(cache.clips) < len(PHRASES):
+            time.sleep(0.05)
+    for _ in range(args.rounds):
+        for phrase in PHRASES:
+            worker.say(phrase)
+            # one command at a time, like a user talking to Aura
+            worker.wait()
+    worker.close()
+    return worker.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fixed phrase playback latency with / without the speech cache.')
+    parser.add_argument('--synthesis-ms', type=float, default=150.0)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--real', action='store_true')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        report = run(None, args)
+        print("engine:  start {start_ms:7.1f}ms  ({utterances} utterances)".format(**report))
+        cache = SpeechCache(directory)
+        report = run(cache, args)
+        print("cached:  start {start_ms:7.1f}ms  ({utterances} utterances, {cached} from clips)".format(**report))
+        print("store:", cache.report())
+        # eviction keeps the store under 'max_bytes'
+        small = SpeechCache(directory, max_bytes=cache.bytes // 2)
+        print("half size store:", small.report())
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
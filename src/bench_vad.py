@@ -0,0 +1,135 @@
+# bench_vad.py
+
+# Endpointing benchmark for audio_capture.AudioCapture.
+# Runs WAV fixtures through the capture pipeline and scores the detected
+# utterances against labelled speech segments:
+#   found     labelled segments overlapped by exactly one utterance
+#   split     segments broken into several utterances (phrase cut off)
+#   false     utterances that overlap no segment
+#   endpoint  delay from end of speech to the end decision (audio ms)
+# Labels are read from FILE.txt next to FILE.wav ("start end" seconds per
+# line). Without fixtures a labelled synthetic set is generated: voiced,
+# syllable-modulated tones with short pauses over background noise whose
+# level changes during the recording, and phrases longer than the old
+# 5 s phrase limit.
+#
+# Usage: python bench_vad.py [FILE.wav ...] [--keep DIR]
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from audio_capture import SAMPLE_RATE, AudioCapture, EnergyVAD, WavSource, write_wav
+
+
+def synthetic_speech(seconds, rng, level):
+    """returns voiced, syllable-modulated samples with short in-phrase pauses."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * 0.5 * t))
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    syllables = 0.6 + 0.4 * np.sin(2 * np.pi * rng.uniform(3, 5) * t)
+    # pauses between words, shorter than the VAD hangover
+    for start in rng.uniform(0.3, max(0.31, seconds - 0.3), int(seconds)):
+        syllables[int(start * SAMPLE_RATE):int((start + rng.uniform(0.08, 0.2)) * SAMPLE_RATE)] = 0.05
+    return voice * syllables * level
+
+
+def synthesize(path, seconds=120.0, seed=0):
+    """writes a labelled synthetic recording, returns the (start, end) segments."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    # background noise, level drifts like a room getting louder / quieter
+    drift = np.interp(np.arange(n), np.linspace(0, n, 8), rng.uniform(30, 250, 8))
+    samples = rng.normal(0.0, 1.0, n) * drift
+    segments = []
+    position = rng.uniform(1.0, 2.0)
+    while True:
+        duration = rng.choice([rng.uniform(0.4, 1.5), rng.uniform(2.0, 4.0), rng.uniform(5.5, 9.0)])
+        if position + duration > seconds - 1.0:
+            break
+        start = int(position * SAMPLE_RATE)
+        speech = synthetic_speech(duration, rng, rng.uniform(1500, 6000))
+        samples[start:start + len(speech)] += speech
+        segments.append((position, position + duration))
+        position += duration + rng.uniform(0.8, 3.0)
+    write_wav(path, np.clip(samples, -32768, 32767))
+    with open(os.path.splitext(path)[0] + '.txt', 'w') as f:
+        for start, end in segments:
+            f.write("{:.3f} {:.3f}\n".format(start, end))
+    return segments
+
+
+def load_segments(path):
+    with open(os.path.splitext(path)[0] + '.txt') as f:
+        return [tuple(map(float, line.split())) for line in f if line.strip()]
+
+
+def score(segments, utterances):
+    """returns (found, split, false, mean end error s) of detected vs labelled segments."""
+    found = split = 0
+    end_errors = []
+    used = set()
+    for start, end in segments:
+        hits = [i for i, u in enumerate(utterances) if u.start < end and u.end > start]
+        used.update(hits)
+        if len(hits) == 1:
+            found += 1
+            end_errors.append(abs(utterances[hits[0]].end - end))
+        elif len(hits) > 1:
+            split += 1
+    false = len(utterances) - len(used)
+    return found, split, false, float(np.mean(end_errors)) if end_errors else float('nan')
+
+
+def run(path, vad=None):
+    capture = AudioCapture(WavSource(path), vad=vad).start()
+    capture.finished.wait()
+    utterances = []
+    while True:
+        utterance = capture.get(timeout=0)
+        if utterance is None:
+            break
+        utterances.append(utterance)
+    return utterances, capture.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='VAD endpointing benchmark.')
+    parser.add_argument('wavs', nargs='*')
+    parser.add_argument('--keep', help='directory to keep the synthetic fixture in')
+    args = parser.parse_args()
+
+    tmp = None
+    wavs = args.wavs
+    if not wavs:
+        directory = args.keep or tempfile.mkdtemp()
+        tmp = None if args.keep else directory
+        wavs = [os.path.join(directory, 'vad_synthetic.wav')]
+        synthesize(wavs[0])
+
+    configs = [
+        ('adaptive', lambda: None),
+        # the old setup: fixed energy threshold of 500, no adaptation
+        ('fixed 500', lambda: EnergyVAD(start_ratio=1.0, stop_ratio=1.0, min_level=500.0, adapt=0.0)),
+    ]
+    for path in wavs:
+        segments = load_segments(path)
+        print("{}: {} segments".format(os.path.basename(path), len(segments)))
+        print("  {:<10} {:>6} {:>6} {:>6} {:>12} {:>12}".format('vad', 'found', 'split', 'false', 'end err ms', 'endpoint ms'))
+        for name, make_vad in configs:
+            utterances, report = run(path, make_vad())
+            found, split, false, end_error = score(segments, utterances)
+            print("  {:<10} {:>6} {:>6} {:>6} {:>12.0f} {:>12.0f}".format(
+                name, found, split, false, end_error * 1000.0, report['endpoint_ms']))
+
+    if tmp is not None:
+        for name in os.listdir(tmp):
+            os.remove(os.path.join(tmp, name))
+        os.rmdir(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# bench_wake_word.py
+
+# Evaluation harness for wake_word.WakeWordDetector.
+# Scores a WAV test set laid out as
+#   DIR/templates/*.wav   enrollment recordings of the wake word
+#   DIR/positive/*.wav    utterances starting with the wake word
+#   DIR/negative/*.wav    utterances without it
+# and reports false accept / false reject rates at the calibrated
+# threshold and at the equal error rate, what the gate does with them
+# (accepted, left to recognition, dropped), plus CPU cost as a real time
+# factor. Without a directory, a synthetic set is generated: formant
+# synthesized "aura"-like vowel glides (speaker, pitch, speed and noise
+# vary) followed by a command, against other vowel sequences. It exercises
+# the pipeline end to end but says nothing about accuracy on real voices;
+# record a real set with 'python wake_word.py enroll' for that.
+#
+# Usage: python bench_wake_word.py [DIR] [--keep DIR] [--count N]
+
+import argparse
+import glob
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from audio_capture import SAMPLE_RATE, read_wav, write_wav
+from wake_word import WakeWordDetector
+
+# (F1, F2, F3) formant targets in Hz
+VOWELS = {
+    'aw': (570, 840, 2410), 'r': (420, 1300, 1600), 'uh': (500, 1500, 2500),
+    'ee': (270, 2290, 3010), 'oo': (300, 870, 2240), 'ah': (730, 1090, 2440),
+    'eh': (530, 1840, 2480), 'ih': (390, 1990, 2550), 'ae': (660, 1720, 2410),
+}
+WAKE = ('aw', 'r', 'uh')
+
+
+def vowel_glide(sequence, rng, speed=1.0, pitch=None, scale=1.0):
+    """returns samples gliding through the formants of 'sequence'."""
+    seconds = 0.18 * len(sequence) / speed
+    n = int(seconds * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+    knots = np.linspace(0, n, len(sequence))
+    formants = np.array([np.interp(np.arange(n), knots, [VOWELS[v][k] * scale for v in sequence])
+                         for k in range(3)])
+    f0 = (pitch or rng.uniform(100, 220)) * (1 + 0.08 * np.sin(np.pi * t / seconds))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    out = np.zeros(n)
+    for k in range(1, int(4000 / f0.min())):
+        f = k * f0
+        envelope = sum(1.0 / (1.0 + ((f - formants[i]) / 90.0) ** 2) for i in range(3))
+        out += envelope * np.sin(k * phase) / np.sqrt(k)
+    fade = np.minimum(1.0, np.minimum(t, seconds - t) / 0.03)
+    return out * fade
+
+
+def speaker(rng):
+    return {'pitch': rng.uniform(100, 220), 'scale': rng.uniform(0.9, 1.12)}
+
+
+def utterance(rng, wake, voice):
+    """returns one test utterance, starting with the wake word if 'wake'."""
+    parts = [np.zeros(int(rng.uniform(0.1, 0.3) * SAMPLE_RATE))]
+    if wake:
+        parts.append(vowel_glide(WAKE, rng, rng.uniform(0.8, 1.25), **voice))
+    else:
+        first = tuple(rng.choice(list(VOWELS), 3))
+        parts.append(vowel_glide(first, rng, rng.uniform(0.8, 1.25), **voice))
+    parts.append(np.zeros(int(rng.uniform(0.05, 0.2) * SAMPLE_RATE)))
+    for _ in range(rng.integers(1, 4)):
+        parts.append(vowel_glide(tuple(rng.choice(list(VOWELS), 2)), rng, **voice))
+    samples = np.concatenate(parts)
+    level = rng.uniform(2000, 8000) / np.abs(samples).max()
+    noise = rng.normal(0, rng.uniform(20, 300), len(samples))
+    return np.clip(samples * level + noise, -32768, 32767)
+
+
+def synthesize(directory, count=100, seed=0):
+    """writes a synthetic test set in the layout described above."""
+    rng = np.random.default_rng(seed)
+    for name in ('templates', 'positive', 'negative'):
+        os.makedirs(os.path.join(directory, name), exist_ok=True)
+    enrolled = speaker(rng)
+    for i in range(4):
+        template = vowel_glide(WAKE, rng, rng.uniform(0.9, 1.1), **enrolled)
+        write_wav(os.path.join(directory, 'templates', '{}.wav'.format(i)),
+                  template / np.abs(template).max() * 6000 + rng.normal(0, 30, len(template)))
+    for i in range(count):
+        # mostly the enrolled speaker, sometimes someone else
+        voice = enrolled if rng.random() < 0.7 else speaker(rng)
+        write_wav(os.path.join(directory, 'positive', '{}.wav'.format(i)), utterance(rng, True, voice))
+        write_wav(os.path.join(directory, 'negative', '{}.wav'.format(i)), utterance(rng, False, voice))
+
+
+def rates(positive, negative, threshold):
+    """returns (false accept rate, false reject rate) at 'threshold'."""
+    return float(np.mean(negative <= threshold)), float(np.mean(positive > threshold))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Wake word false accept / reject and CPU benchmark.')
+    parser.add_argument('directory', nargs='?')
+    parser.add_argument('--keep', help='directory to keep the synthetic set in')
+    parser.add_argument('--count', type=int, default=100)
+    args = parser.parse_args()
+
+    directory = args.directory
+    tmp = None
+    if directory is None:
+        directory = args.keep or tempfile.mkdtemp()
+        tmp = None if args.keep else directory
+        synthesize(directory, args.count)
+
+    detector = WakeWordDetector.from_directory(os.path.join(directory, 'templates'))
+    scores = {}
+    cpu = audio = 0.0
+    for name in ('positive', 'negative'):
+        values = []
+        for path in sorted(glob.glob(os.path.join(directory, name, '*.wav'))):
+            samples = read_wav(path)
+            start = time.process_time()
+            values.append(detector.score(samples))
+            cpu += time.process_time() - start
+            audio += min(len(samples) / SAMPLE_RATE, detector.window_s)
+        scores[name] = np.array(values)
+
+    positive, negative = scores['positive'], scores['negative']
+    print("{} templates, {} positive, {} negative utterances".format(
+        len(detector.templates), len(positive), len(negative)))
+    far, frr = rates(positive, negative, detector.threshold)
+    print("calibrated threshold {:.3f}: false accept {:.1%}, false reject {:.1%}".format(detector.threshold, far, frr))
+    candidates = np.sort(np.concatenate([positive, negative]))
+    eer = min(candidates, key=lambda t: abs(np.subtract(*rates(positive, negative, t))))
+    far, frr = rates(positive, negative, eer)
+    print("equal error threshold {:.3f}: false accept {:.1%}, false reject {:.1%}".format(eer, far, frr))
+    for name, values in (('wake word', positive), ('other', negative)):
+        print("gate, {:<9}: accepted {:.1%}, left to recognition {:.1%}, dropped {:.1%} (cost > {:.3f})".format(
+            name, np.mean(values <= detector.threshold),
+            np.mean((values > detector.threshold) & (values <= detector.reject_threshold)),
+            np.mean(values > detector.reject_threshold), detector.reject_threshold))
+    print("cpu: {:.1f}ms per utterance, real time factor {:.3f}".format(
+        cpu * 1000.0 / (len(positive) + len(negative)), cpu / audio))
+
+    if tmp is not None:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+# conversation_memory.py
+
+# Token-budgeted conversation memory for Aura's conversational fallback.
+# 'ConversationMemory' keeps the system prompt and the last 'keep_turns'
+# user / assistant turns verbatim and folds older turns into a rolling
+# summary, so each request stays within 'budget' tokens no matter how long
+# the session runs. Turns and summaries go to an append-only JSON lines log
+# which is replayed on start to resume the session, and rewritten as a
+# snapshot once it grows past 'max_log_bytes'.
+
+import json
+import os
+import threading
+import time
+
+SUMMARY_PROMPT = ("Summarize this conversation between a user and an assistant in at most "
+                  "{words} words. Keep names, facts and open requests. Previous summary: {summary}")
+
+
+def estimate_tokens(text):
+    """returns approximate no. of tokens of 'text', ~4 characters per token."""
+    return len(text) // 4 + 1
+
+
+def extractive_summary(summary, turns, max_chars=600):
+    """returns 'summary' extended with the start of each turn, keeping the newest text."""
+    lines = [summary] if summary else []
+    for user, assistant in turns:
+        lines.append("User: {} / Assistant: {}".format(user[:80], assistant[:80]))
+    text = " ".join(lines)
+    return text[-max_chars:]
+
+
+class LLMSummarizer:
+    """
+    Summarizes folded turns with a chat client, falls back to 'extractive_summary'.
+
+    Attributes
+    ----------
+    client : llm_client.ChatClient
+    words : int
+        target summary length.
+    """
+
+    def __init__(self, client, words=60):
+        self.client = client
+        self.words = words
+
+    def __call__(self, summary, turns):
+        transcript = "\n".join("User: {}\nAssistant: {}".format(u, a) for u, a in turns)
+        messages = [{"role": "system", "content": SUMMARY_PROMPT.format(words=self.words, summary=summary or "none")},
+                    {"role": "user", "content": transcript}]
+        try:
+            return self.client.complete(messages)
+        except Exception as e:
+            print("[ConversationMemory] summarization failed:", e)
+            return extractive_summary(summary, turns)
+
+
+class ConversationMemory:
+    """
+    Bounded chat history with a rolling summary and an append-only log.
+
+    Attributes
+    ----------
+    system_prompt : str
+    budget : int
+        max. estimated tokens of a request, including the new user message.
+    keep_turns : int
+        no. of most recent turns always sent verbatim (as long as they fit).
+    fold_batch : int
+        older turns are summarized once this many have piled up, so the
+        summarizer runs every 'fold_batch' turns rather than every turn.
+    summarizer : callable
+        (summary, turns) -> new summary, called off the request path.
+    summary : str
+        rolling summary of all turns no longer kept verbatim.
+    turns : list of tuple
+        recent (user, assistant) pairs.
+    stats : dict
+        'requests', 'request_bytes' / 'request_tokens' of the last request,
+        'max_request_bytes', 'compactions', 'log_bytes' and 'log_errors'.
+    """
+
+    def __init__(self, system_prompt, budget=600, keep_turns=4, fold_batch=4,
+                 summarizer=extractive_summary, log_path=None, max_log_bytes=256 * 1024):
+        self.system_prompt = system_prompt
+        self.budget = budget
+        self.keep_turns = keep_turns
+        self.fold_batch = fold_batch
+        self.summarizer = summarizer
+        self.log_path = log_path
+        self.max_log_bytes = max_log_bytes
+        self.summary = ""
+        self.turns = []
+        self.folding = 0  # no. of turns currently being summarized
+        self.lock = threading.Lock()
+        self.worker = None
+        self.stats = {'requests': 0, 'request_bytes': 0, 'request_tokens': 0,
+                      'max_request_bytes': 0, 'compactions': 0, 'log_bytes': 0,
+                      'log_errors': 0}
+        self.log = None
+        if log_path is not None:
+            self.resume()
+
+    def resume(self):
+        """replays the log at 'log_path' and opens it for appending."""
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.log_path):
+            with open(self.log_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # torn last line after a crash
+                        continue
+                    if record['type'] == 'turn':
+                        self.turns.append((record['user'], record['assistant']))
+                    elif record['type'] == 'summary':
+                        self.summary = record['summary']
+                        del self.turns[:record['folded']]
+        self.log = open(self.log_path, 'a', encoding='utf-8')
+        self.stats['log_bytes'] = self.log.tell()
+
+    def append_log(self, record):
+        if self.log is None:
+            return
+        record['time'] = time.time()
+        line = json.dumps(record) + "\n"
+        try:
+            self.log.write(line)
+            self.log.flush()
+        except OSError as e:
+            # a full disk loses the record, not the conversation
+            self.stats['log_errors'] += 1
+            print("[ConversationMemory] writing the session log failed:", e)
+            return
+        self.stats['log_bytes'] += len(line.encode('utf-8'))
+
+    def messages(self, user_input):
+        """returns the request messages for 'user_input' within 'budget' tokens."""
+        with self.lock:
+            head = [{"role": "system", "content": self.system_prompt}]
+            if self.summary:
+                head.append({"role": "system", "content": "Earlier in this conversation: " + self.summary})
+            user = {"role": "user", "content": user_input}
+            used = sum(estimate_tokens(m["content"]) + 4 for m in head) + estimate_tokens(user_input) + 4
+            recent = []
+            for u, a in reversed(self.turns[-self.keep_turns:]):
+                cost = estimate_tokens(u) + estimate_tokens(a) + 8
+                if used + cost > self.budget:
+                    break
+                used += cost
+                recent[:0] = [{"role": "user", "content": u}, {"role": "assistant", "content": a}]
+        messages = head + recent + [user]
+        size = len(json.dumps(messages).encode('utf-8'))
+        stats = self.stats
+        stats['requests'] += 1
+        stats['request_bytes'] = size
+        stats['request_tokens'] = used
+        stats['max_request_bytes'] = max(stats['max_request_bytes'], size)
+        return messages
+
+    def add_turn(self, user, assistant):
+        """records a completed turn and compacts older turns in the background."""
+        with self.lock:
+            self.turns.append((user, assistant))
+            self.append_log({'type': 'turn', 'user': user, 'assistant': assistant})
+            if len(self.turns) >= self.keep_turns + self.fold_batch and self.worker is None:
+                self.folding = len(self.turns) - self.keep_turns
+                self.worker = threading.Thread(target=self.compact, daemon=True)
+                self.worker.start()
+
+    def compact(self):
+        """folds the oldest turns into 'summary'."""
+        try:
+            with self.lock:
+                summary, folded = self.summary, self.turns[:self.folding]
+            try:
+                new_summary = self.summarizer(summary, folded)
+            except Exception as e:
+                print("[ConversationMemory] summarization failed:", e)
+                new_summary = extractive_summary(summary, folded)
+            with self.lock:
+                self.summary = new_summary
+                del self.turns[:len(folded)]
+                self.stats['compactions'] += 1
+                self.append_log({'type': 'summary', 'summary': new_summary, 'folded': len(folded)})
+                if self.log is not None and self.stats['log_bytes'] > self.max_log_bytes:
+                    self.snapshot()
+        except OSError as e:
+            self.stats['log_errors'] += 1
+            print("[ConversationMemory] writing the session log failed:", e)
+        finally:
+            # a failed compaction must not block the next one
+            with self.lock:
+                self.folding = 0
+                self.worker = None
+
+    def snapshot(self):
+        """rewrites the log as the current summary and turns, so resume stays fast."""
+        tmp = self.log_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'type': 'summary', 'summary': self.summary, 'folded': 0,
+                                'time': time.time()}) + "\n")
+            for user, assistant in self.turns:
+                f.write(json.dumps({'type': 'turn', 'user': user, 'assistant': assistant,
+                                    'time': time.time()}) + "\n")
+        self.log.close()
+        try:
+            os.replace(tmp, self.log_path)
+        finally:
+            self.log = open(self.log_path, 'a', encoding='utf-8')
+            self.stats['log_bytes'] = self.log.tell()
+
+    def wait(self):
+        """blocks until a running compaction has finished."""
+        worker = self.worker
+        if worker is not None:
+            worker.join()
+
+    def report(self):
+        """returns a copy of 'stats' plus the no. of verbatim turns."""
+        return dict(self.stats, turns=len(self.turns))
+
+    def close(self):
+        self.wait()
+        if self.log is not None:
+            self.log.close()
+            self.log = None
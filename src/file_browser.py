@@ -0,0 +1,477 @@
+# file_browser.py
+
+# Voice file explorer backend.
+# 'DirectoryCache' lists directories with os.scandir and keeps the sorted
+# listing per directory, reused as long as the directory's mtime is
+# unchanged, so moving back and forth does not rescan. A 'Listing' is
+# two sorted name lists, directories then files; nothing is stat'ed per
+# entry and 'Entry' objects / search keys are only made when needed.
+# 'FileBrowser' holds the current directory and shows it a page at a time,
+# so a 50k entry directory sends 20 lines to the chat window, not 50k.
+# 'FileIndex' walks the home directory on a background thread and is fed
+# every directory listed, for "open <name>" with fuzzy matching.
+# Only exact names in the current directory are meant to be launched
+# directly; fuzzy matches and files elsewhere become numbered 'candidates'
+# to pick from, so a misheard name never starts an arbitrary program.
+#
+# Usage: python file_browser.py [DIR] [--find NAME] [--page-size N]
+
+import argparse
+import difflib
+import html
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+NON_WORD = re.compile(r"[\W_]+")
+NUMBER_WORDS = {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7,
+                'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'first': 1,
+                'second': 2, 'third': 3, 'to': 2, 'too': 2, 'for': 4}
+# directories not worth indexing
+SKIP_DIRS = {'node_modules', '__pycache__', 'site-packages', 'AppData', 'Library', '$Recycle.Bin'}
+
+
+def default_root():
+    """returns AURA_FILES_ROOT, else the root of the current drive ('C:\\' on Windows)."""
+    return os.environ.get('AURA_FILES_ROOT') or os.path.abspath(os.sep)
+
+
+def search_key(name):
+    """returns 'name' lowercase, with punctuation / separators as single spaces."""
+    return NON_WORD.sub(' ', name.lower()).strip()
+
+
+def spoken_key(query):
+    """returns the 'search_key' of a spoken file name, "dot" read as '.'."""
+    return search_key(query.replace(' dot ', '.'))
+
+
+def launch(path):
+    """opens a file with the default application of the OS."""
+    if sys.platform == 'win32':
+        os.startfile(path)
+    elif sys.platform == 'darwin':
+        subprocess.Popen(['open', path])
+    else:
+        subprocess.Popen(['xdg-open', path])
+
+
+class Entry:
+    """
+    Attributes
+    ----------
+    name : str
+    path : str
+    is_dir : bool
+    """
+
+    __slots__ = ('name', 'path', 'is_dir')
+
+    def __init__(self, name, path, is_dir):
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+
+
+class Listing:
+    """
+    Sorted contents of one directory.
+
+    Attributes
+    ----------
+    path : str
+    names : list of str
+        directories first, then files, each sorted case insensitively.
+    dirs : int
+        no. of directories, 'names[:dirs]'.
+    """
+
+    __slots__ = ('path', 'names', 'dirs', '_keys', '_words')
+
+    def __init__(self, path, names, dirs):
+        self.path = path
+        self.names = names
+        self.dirs = dirs
+        self._keys = None
+        self._words = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def entry(self, i):
+        """returns the 'Entry' at 0-based position 'i'."""
+        return Entry(self.names[i], os.path.join(self.path, self.names[i]), i < self.dirs)
+
+    @property
+    def keys(self):
+        """'search_key' of every name, computed on first use."""
+        if self._keys is None:
+            self._keys = [search_key(name) for name in self.names]
+        return self._keys
+
+    @property
+    def words(self):
+        """set of the words in 'keys', numbers left out."""
+        if self._words is None:
+            self._words = {w for key in self.keys for w in key.split() if not w.isdigit()}
+        return self._words
+
+
+def scan(path):
+    """returns the 'Listing' of directory 'path'."""
+    dirs, files = [], []
+    with os.scandir(path) as it:
+        for e in it:
+            try:
+                is_dir = e.is_dir()
+            except OSError:
+                is_dir = False
+            (dirs if is_dir else files).append(e.name)
+    dirs.sort(key=str.casefold)
+    files.sort(key=str.casefold)
+    return Listing(path, dirs + files, len(dirs))
+
+
+class DirectoryCache:
+    """
+    Sorted directory listings, invalidated by the directory's mtime.
+
+    Attributes
+    ----------
+    capacity : int
+        max. no. of directories kept, least recently used are dropped.
+    listings : OrderedDict
+        path -> (mtime_ns, Listing).
+    on_scan : callable or None
+        called with (path, listing) after every scan, e.g. 'FileIndex.add'.
+    stats : dict
+        'hits', 'scans', 'invalidated' (rescans after a change), 'evictions'
+        and mean 'scan_ms'.
+    """
+
+    def __init__(self, capacity=64, on_scan=None):
+        self.capacity = capacity
+        self.listings = OrderedDict()
+        self.on_scan = on_scan
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'scans': 0, 'invalidated': 0, 'evictions': 0, 'scan_ms': 0.0}
+
+    def listing(self, path):
+        """returns the 'Listing' of 'path', rescanned only if it changed (OSError if unreadable)."""
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime_ns
+        stats = self.stats
+        with self.lock:
+            cached = self.listings.get(path)
+            if cached is not None and cached[0] == mtime:
+                self.listings.move_to_end(path)
+                stats['hits'] += 1
+                return cached[1]
+        start = time.perf_counter()
+        listing = scan(path)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        with self.lock:
+            stats['invalidated'] += cached is not None
+            stats['scans'] += 1
+            stats['scan_ms'] += (elapsed - stats['scan_ms']) / stats['scans']
+            self.listings[path] = (mtime, listing)
+            self.listings.move_to_end(path)
+            while len(self.listings) > self.capacity:
+                self.listings.popitem(last=False)
+                stats['evictions'] += 1
+        if self.on_scan is not None:
+            self.on_scan(path, listing)
+        return listing
+
+    def report(self):
+        """returns a copy of 'stats'."""
+        with self.lock:
+            return dict(self.stats, directories=len(self.listings))
+
+
+class FileIndex:
+    """
+    Filename index for fuzzy "open <name>", built in the background.
+
+    Attributes
+    ----------
+    root : str or None
+        directory walked by 'start', None to index listed directories only.
+    max_entries : int
+        the walk stops after this many entries.
+    max_depth : int
+        directory levels below 'root' walked.
+    directories : dict
+        directory path -> its Listing.
+    ready : threading.Event
+        set when the walk is done.
+    stats : dict
+        'entries', 'directories', 'build_ms', 'finds' and mean 'find_ms'.
+    """
+
+    def __init__(self, root=None, max_entries=200000, max_depth=6):
+        self.root = root
+        self.max_entries = max_entries
+        self.max_depth = max_depth
+        self.directories = {}
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.stats = {'entries': 0, 'directories': 0, 'build_ms': 0.0, 'finds': 0, 'find_ms': 0.0}
+
+    def start(self):
+        """walks 'root' on a daemon thread, returns self."""
+        if self.root is None:
+            self.ready.set()
+        else:
+            threading.Thread(target=self.build, name='file-index', daemon=True).start()
+        return self
+
+    def build(self):
+        start = time.perf_counter()
+        pending = [(os.path.abspath(self.root), 0)]
+        try:
+            while pending and self.stats['entries'] < self.max_entries:
+                path, depth = pending.pop()
+                try:
+                    listing = scan(path)
+                except OSError:
+                    continue
+                self.add(path, listing)
+                if depth < self.max_depth:
+                    pending.extend((os.path.join(path, name), depth + 1) for name in listing.names[:listing.dirs]
+                                   if not name.startswith('.') and name not in SKIP_DIRS)
+        finally:
+            self.stats['build_ms'] = (time.perf_counter() - start) * 1000.0
+            self.ready.set()
+
+    def add(self, path, listing):
+        """sets the 'Listing' of directory 'path', replacing an older one."""
+        with self.lock:
+            old = self.directories.get(path)
+            self.directories[path] = listing
+            self.stats['entries'] += len(listing) - (len(old) if old else 0)
+            self.stats['directories'] = len(self.directories)
+
+    def find(self, query, limit=5, prefer=None):
+        """
+        returns up to 'limit' entries matching the spoken 'query', best first.
+
+        Exact names win over prefixes, prefixes over substrings, the file
+        extension may be left out. Without any of those, the query words
+        are corrected to close words ('difflib') of the indexed names and
+        the names containing the closest of them are returned. Ties prefer entries
+        in directory 'prefer', then shorter names.
+        """
+        start = time.perf_counter()
+        key = spoken_key(query)
+        with self.lock:
+            listings = list(self.directories.values())
+        found = []
+        for listing in listings:
+            elsewhere = listing.path != prefer
+            for i, name in enumerate(listing.keys):
+                if key not in name:
+                    continue
+                if name == key or search_key(os.path.splitext(listing.names[i])[0]) == key:
+                    rank = 0
+                elif name.startswith(key):
+                    rank = 1
+                else:
+                    rank = 2
+                found.append((rank, elsewhere, len(name), listing, i))
+        if not found and key:
+            vocabulary = set().union(*(listing.words for listing in listings))
+            # close words of every query word, with their similarity
+            corrected = []
+            for word in key.split():
+                close = {w: difflib.SequenceMatcher(None, word, w).ratio()
+                         for w in difflib.get_close_matches(word, vocabulary, 3, 0.6)}
+                if close:
+                    corrected.append(close)
+            candidates = set().union(*corrected)
+            for listing in listings:
+                elsewhere = listing.path != prefer
+                for i, name in enumerate(listing.keys):
+                    words = name.split()
+                    if candidates.isdisjoint(words):
+                        continue
+                    score = sum(max(close.get(w, 0.0) for w in words) for close in corrected)
+                    found.append((-score, elsewhere, len(name), listing, i))
+        found.sort(key=lambda item: item[:3])
+        stats = self.stats
+        stats['finds'] += 1
+        stats['find_ms'] += ((time.perf_counter() - start) * 1000.0 - stats['find_ms']) / stats['finds']
+        return [listing.entry(i) for _, _, _, listing, i in found[:limit]]
+
+    def report(self):
+        """returns a copy of 'stats'."""
+        return dict(self.stats, ready=self.ready.is_set())
+
+
+class FileBrowser:
+    """
+    Current directory of the voice file explorer, shown a page at a time.
+
+    Attributes
+    ----------
+    root : str
+        top directory, 'back' stops here.
+    page_size : int
+        entries per page.
+    cache : DirectoryCache
+    index : FileIndex
+    cwd : str or None
+        current directory.
+    listing : Listing
+        contents of 'cwd'.
+    page : int
+        current page, from 0.
+    max_candidates : int
+        matches offered when "open <name>" is not exact.
+    candidates : list of Entry
+        matches offered by the last inexact "open <name>", picked by number
+        with the next "open".
+    """
+
+    def __init__(self, root=None, page_size=20, cache=None, index=None, max_candidates=5):
+        self.root = os.path.abspath(root or default_root())
+        self.page_size = page_size
+        self.index = index or FileIndex()
+        self.cache = cache or DirectoryCache(on_scan=self.index.add)
+        self.cwd = None
+        self.listing = Listing(None, [], 0)
+        self.page = 0
+        self.max_candidates = max_candidates
+        self.candidates = []
+
+    def open(self, path=None):
+        """lists directory 'path' (default 'root') from its first page, returns self."""
+        path = os.path.abspath(path or self.root)
+        self.listing = self.cache.listing(path)
+        self.cwd = path
+        self.page = 0
+        self.candidates = []
+        return self
+
+    @property
+    def pages(self):
+        return max(1, -(-len(self.listing) // self.page_size))
+
+    def page_range(self):
+        """returns range of the 0-based positions on the current page."""
+        first = self.page * self.page_size
+        return range(first, min(first + self.page_size, len(self.listing)))
+
+    def next_page(self):
+        """returns False on the last page."""
+        if self.page + 1 >= self.pages:
+            return False
+        self.page += 1
+        return True
+
+    def previous_page(self):
+        """returns False on the first page."""
+        if self.page == 0:
+            return False
+        self.page -= 1
+        return True
+
+    def back(self):
+        """moves to the parent directory, returns False at 'root'."""
+        parent = os.path.dirname(self.cwd)
+        if os.path.normcase(self.cwd) == os.path.normcase(self.root) or parent == self.cwd:
+            return False
+        self.open(parent)
+        return True
+
+    def select(self, number):
+        """returns the entry with 1-based 'number' in the listing, None if out of range."""
+        if 1 <= number <= len(self.listing):
+            return self.listing.entry(number - 1)
+        return None
+
+    def find(self, name):
+        """returns the best match of 'name', in 'cwd' first, then in the index; None if none."""
+        matches = self.index.find(name, limit=1, prefer=self.cwd)
+        return matches[0] if matches else None
+
+    def is_exact(self, entry, name):
+        """returns True if 'entry' is in 'cwd' and named 'name', with or without its extension."""
+        if self.cwd is None or os.path.normcase(os.path.dirname(entry.path)) != os.path.normcase(self.cwd):
+            return False
+        key = spoken_key(name)
+        return key in (search_key(entry.name), search_key(os.path.splitext(entry.name)[0]))
+
+    def resolve(self, arg):
+        """
+        returns (entry, exact) meant by "open <arg>", (None, False) if nothing matches.
+
+        A number picks from the last 'candidates' if there are any, else from
+        the listing on screen, and is exact. A name is exact if 'is_exact';
+        otherwise its best matches become the new 'candidates'.
+        """
+        candidates, self.candidates = self.candidates, []
+        words = arg.lower().split()
+        if not words:
+            return None, False
+        last = words[-1]
+        number = int(last) if last.isdigit() else NUMBER_WORDS.get(last) if len(words) == 1 else None
+        if number is not None:
+            if candidates:
+                return (candidates[number - 1], True) if 1 <= number <= len(candidates) else (None, False)
+            entry = self.select(number)
+            return entry, entry is not None
+        matches = self.index.find(arg, limit=self.max_candidates, prefer=self.cwd)
+        if not matches:
+            return None, False
+        if self.is_exact(matches[0], arg):
+            return matches[0], True
+        self.candidates = matches
+        return matches[0], False
+
+    def render_candidates(self):
+        """returns 'candidates' as numbered HTML lines with their directory."""
+        return "<br>".join("{}:  {}  <i>{}</i>".format(
+            i, html.escape(entry.name), html.escape(os.path.dirname(entry.path)))
+            for i, entry in enumerate(self.candidates, 1))
+
+    def render(self):
+        """returns the current page as HTML lines for the chat window."""
+        listing = self.listing
+        lines = ["{}:  {}{}".format(i + 1, html.escape(listing.names[i]), os.sep if i < listing.dirs else '')
+                 for i in self.page_range()]
+        if self.pages > 1:
+            lines.append("<i>page {} of {} ({} items), say 'next' or 'previous'</i>".format(
+                self.page + 1, self.pages, len(listing)))
+        elif not lines:
+            lines.append("<i>empty</i>")
+        return "<br>".join(lines)
+
+    def report(self):
+        """returns directory cache and index stats."""
+        return {'cache': self.cache.report(), 'index': self.index.report()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Browse a directory the way the voice file explorer does.')
+    parser.add_argument('directory', nargs='?', default=os.getcwd())
+    parser.add_argument('--find', help='fuzzy match a name in the directory tree')
+    parser.add_argument('--page-size', type=int, default=20)
+    args = parser.parse_args()
+
+    index = FileIndex(args.directory).start()
+    browser = FileBrowser(args.directory, page_size=args.page_size, index=index).open()
+    print(browser.render().replace('<br>', '\n'))
+    if args.find:
+        index.ready.wait()
+        for entry in index.find(args.find, prefer=browser.cwd):
+            print("match:", entry.path)
+    print(browser.report())
+
+
+if __name__ == '__main__':
+    main()
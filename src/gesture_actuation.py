@@ -0,0 +1,579 @@
+# gesture_actuation.py
+
+# Pointer actuation for Controller.
+# 'Actuator' exposes the pyautogui calls used by Controller, but only queues
+# the events. 'Actuator.flush' merges the events of one frame and injects them
+# through an injector in a single call: one SendInput on Windows, one XTest
+# batch + sync on X11. Screen geometry is cached instead of being queried
+# twice per frame.
+# 'LevelActuator' applies system volume / brightness changes on a background
+# thread with pluggable backends, so gestures never wait on them.
+
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+
+Size = namedtuple('Size', 'width height')
+
+# Event kinds queued by Actuator
+MOVE = 'move'          # (MOVE, x, y) absolute position
+MOVE_REL = 'move_rel'  # (MOVE_REL, dx, dy)
+DOWN = 'down'          # (DOWN, button)
+UP = 'up'              # (UP, button)
+SCROLL = 'scroll'      # (SCROLL, amount) vertical wheel, 120 per notch
+HSCROLL = 'hscroll'    # (HSCROLL, amount) horizontal wheel, 120 per notch
+
+
+class Actuator:
+    """
+    Batches pointer events of one frame and injects them at once.
+
+    Attributes
+    ----------
+    injector : Object
+        platform injector with 'screen_size()' and 'inject(events)'.
+    refresh_interval : float
+        seconds after which the cached screen geometry is revalidated.
+    events : list
+        events queued for the current frame.
+    stats : Counter
+        'queued' (events before merging), 'events' (after merging),
+        'injections' and 'geometry_refreshes'.
+    """
+
+    def __init__(self, injector, refresh_interval=2.0):
+        self.injector = injector
+        self.refresh_interval = refresh_interval
+        self.events = []
+        self.geometry = None
+        self.checked = 0.0
+        self.stats = Counter()
+
+    def invalidate(self):
+        """forces the screen geometry to be refreshed on next use."""
+        self.geometry = None
+
+    def size(self):
+        """returns cached screen size, refreshed if the display configuration changed."""
+        now = time.monotonic()
+        if self.geometry is None or now - self.checked > self.refresh_interval:
+            self.geometry = Size(*self.injector.screen_size())
+            self.checked = now
+            self.stats['geometry_refreshes'] += 1
+        return self.geometry
+
+    def queue(self, event):
+        """queues 'event', merging it with the previous one where possible."""
+        self.stats['queued'] += 1
+        if self.events:
+            last = self.events[-1]
+            kind = event[0]
+            if kind == MOVE and last[0] in (MOVE, MOVE_REL):
+                self.events[-1] = event
+                return
+            if kind == MOVE_REL and last[0] in (MOVE, MOVE_REL):
+                self.events[-1] = (last[0], last[1] + event[1], last[2] + event[2])
+                return
+            if kind in (SCROLL, HSCROLL) and last[0] == kind:
+                amount = last[1] + event[1]
+                if amount:
+                    self.events[-1] = (kind, amount)
+                else:
+                    # opposite scrolls cancel out, a zero amount must not be injected
+                    self.events.pop()
+                return
+        self.events.append(event)
+
+    def flush(self):
+        """injects all queued events of this frame in one call."""
+        if not self.events:
+            return
+        events, self.events = self.events, []
+        self.stats['events'] += len(events)
+        self.stats['injections'] += 1
+        self.injector.inject(events)
+
+    # pyautogui compatible calls used by Controller
+
+    def moveTo(self, x, y, *args, **kwargs):
+        self.queue((MOVE, int(x), int(y)))
+
+    def moveRel(self, dx, dy, *args, **kwargs):
+        self.queue((MOVE_REL, int(dx), int(dy)))
+
+    def dragTo(self, x, y, *args, button='left', **kwargs):
+        self.queue((DOWN, button))
+        self.queue((MOVE, int(x), int(y)))
+        self.queue((UP, button))
+
+    def mouseDown(self, *args, button='left', **kwargs):
+        self.queue((DOWN, button))
+
+    def mouseUp(self, *args, button='left', **kwargs):
+        self.queue((UP, button))
+
+    def click(self, *args, button='left', **kwargs):
+        self.queue((DOWN, button))
+        self.queue((UP, button))
+
+    def scroll(self, clicks, *args, **kwargs):
+        if int(clicks):
+            self.queue((SCROLL, int(clicks)))
+
+    def hscroll(self, clicks, *args, **kwargs):
+        if int(clicks):
+            self.queue((HSCROLL, int(clicks)))
+
+
+class StubInjector:
+    """
+    Injector that only records what would be injected, used for replay
+    and benchmarks without a display.
+    """
+
+    def __init__(self, width=1920, height=1080):
+        self.screen = Size(width, height)
+        self.position = (0, 0)
+        self.pressed = set()
+        self.calls = Counter()
+
+    def screen_size(self):
+        self.calls['screen_size'] += 1
+        return self.screen
+
+    def inject(self, events):
+        self.calls['inject'] += 1
+        for event in events:
+            self.calls[event[0]] += 1
+            if event[0] == MOVE:
+                self.position = (event[1], event[2])
+            elif event[0] == MOVE_REL:
+                self.position = (self.position[0] + event[1], self.position[1] + event[2])
+            elif event[0] == DOWN:
+                self.pressed.add(event[1])
+            elif event[0] == UP:
+                self.pressed.discard(event[1])
+
+
+class PyAutoGUIInjector:
+    """
+    Fallback injector replaying events through pyautogui, one call per
+    merged event. pyautogui's per call PAUSE is skipped.
+    """
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+
+    def screen_size(self):
+        return self.pyautogui.size()
+
+    def inject(self, events):
+        gui = self.pyautogui
+        for event in events:
+            kind = event[0]
+            if kind == MOVE:
+                gui.moveTo(event[1], event[2], _pause=False)
+            elif kind == MOVE_REL:
+                gui.moveRel(event[1], event[2], _pause=False)
+            elif kind == DOWN:
+                gui.mouseDown(button=event[1], _pause=False)
+            elif kind == UP:
+                gui.mouseUp(button=event[1], _pause=False)
+            elif kind == SCROLL:
+                gui.scroll(event[1], _pause=False)
+            elif kind == HSCROLL:
+                gui.hscroll(event[1], _pause=False)
+
+
+class SendInputInjector:
+    """
+    Windows injector, all events of a frame go out in one SendInput call.
+    """
+
+    MOUSEEVENTF_MOVE = 0x0001
+    MOUSEEVENTF_ABSOLUTE = 0x8000
+    MOUSEEVENTF_WHEEL = 0x0800
+    MOUSEEVENTF_HWHEEL = 0x1000
+    BUTTON_FLAGS = {
+        'left': (0x0002, 0x0004),
+        'right': (0x0008, 0x0010),
+        'middle': (0x0020, 0x0040),
+    }
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG),
+                        ('mouseData', wintypes.DWORD), ('dwFlags', wintypes.DWORD),
+                        ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+        class INPUT(ctypes.Structure):
+            # MOUSEINPUT is the largest member of the INPUT union
+            _fields_ = [('type', wintypes.DWORD), ('mi', MOUSEINPUT)]
+
+        self.ctypes = ctypes
+        self.INPUT = INPUT
+        self.user32 = ctypes.windll.user32
+        self.point = wintypes.POINT()
+
+    def screen_size(self):
+        return Size(self.user32.GetSystemMetrics(0), self.user32.GetSystemMetrics(1))
+
+    def inject(self, events):
+        width, height = self.screen_size()
+        inputs = (self.INPUT * len(events))()
+        cursor = None
+        for item, event in zip(inputs, events):
+            kind = event[0]
+            item.type = 0  # INPUT_MOUSE
+            mi = item.mi
+            if kind in (MOVE, MOVE_REL):
+                if kind == MOVE_REL:
+                    # relative SendInput moves are subject to pointer acceleration
+                    if cursor is None:
+                        self.user32.GetCursorPos(self.ctypes.byref(self.point))
+                        cursor = (self.point.x, self.point.y)
+                    x, y = cursor[0] + event[1], cursor[1] + event[2]
+                else:
+                    x, y = event[1], event[2]
+                cursor = (x, y)
+                mi.dx = x * 65535 // max(width - 1, 1)
+                mi.dy = y * 65535 // max(height - 1, 1)
+                mi.dwFlags = self.MOUSEEVENTF_MOVE | self.MOUSEEVENTF_ABSOLUTE
+            elif kind in (DOWN, UP):
+                down, up = self.BUTTON_FLAGS[event[1]]
+                mi.dwFlags = down if kind == DOWN else up
+            elif kind in (SCROLL, HSCROLL):
+                mi.mouseData = event[1] & 0xFFFFFFFF
+                mi.dwFlags = self.MOUSEEVENTF_WHEEL if kind == SCROLL else self.MOUSEEVENTF_HWHEEL
+        self.user32.SendInput(len(events), inputs, self.ctypes.sizeof(self.INPUT))
+
+
+class XTestInjector:
+    """
+    X11 injector, events are queued with XTest and sent with one sync,
+    i.e. one round trip to the X server per frame.
+    """
+
+    BUTTONS = {'left': 1, 'middle': 2, 'right': 3}
+    WHEEL = {SCROLL: (4, 5), HSCROLL: (7, 6)}
+
+    def __init__(self):
+        from Xlib import X, display
+        from Xlib.ext import xtest
+        self.X = X
+        self.xtest = xtest
+        self.display = display.Display()
+
+    def screen_size(self):
+        screen = self.display.screen()
+        return Size(screen.width_in_pixels, screen.height_in_pixels)
+
+    def inject(self, events):
+        X, fake = self.X, self.xtest.fake_input
+        for event in events:
+            kind = event[0]
+            if kind == MOVE:
+                fake(self.display, X.MotionNotify, x=event[1], y=event[2])
+            elif kind == MOVE_REL:
+                fake(self.display, X.MotionNotify, detail=True, x=event[1], y=event[2])
+            elif kind == DOWN:
+                fake(self.display, X.ButtonPress, self.BUTTONS[event[1]])
+            elif kind == UP:
+                fake(self.display, X.ButtonRelease, self.BUTTONS[event[1]])
+            elif kind in (SCROLL, HSCROLL) and event[1]:
+                # amount is in wheel units, 120 per notch
+                positive, negative = self.WHEEL[kind]
+                button = positive if event[1] > 0 else negative
+                for _ in range(max(1, abs(event[1]) // 120)):
+                    fake(self.display, X.ButtonPress, button)
+                    fake(self.display, X.ButtonRelease, button)
+        self.display.sync()
+
+
+def default_injector():
+    """returns the batched injector for this platform, pyautogui as fallback."""
+    try:
+        if sys.platform == 'win32':
+            return SendInputInjector()
+        if 'DISPLAY' in os.environ:
+            return XTestInjector()
+    except Exception as e:
+        print("[gesture_actuation] falling back to pyautogui:", e)
+    return PyAutoGUIInjector()
+
+
+# System level actuation (volume / brightness)
+
+class LevelActuator:
+    """
+    Applies a system level (volume, brightness) on a background thread.
+
+    Callers never block: 'set_level' / 'change_level' only record the
+    request. The worker coalesces bursts into the latest setpoint, applies
+    at most one setpoint per 'min_interval' and fades in steps of at most
+    'fade_step', aborting a fade as soon as a newer setpoint arrives.
+
+    Attributes
+    ----------
+    backend : Object
+        level backend with 'open()', 'get()' and 'set(level)', levels 0..1.
+    level : float
+        last level applied, None until the backend has been read.
+    target : float
+        last resolved setpoint, the base of relative requests; the level
+        a fade is heading to.
+    stats : Counter
+        'requests', 'coalesced', 'applied' (setpoints) and 'writes'
+        (backend calls including fade steps).
+    """
+
+    def __init__(self, backend, min_interval=0.05, fade_step=None, fade_interval=0.01):
+        self.backend = backend
+        self.min_interval = min_interval
+        self.fade_step = fade_step
+        self.fade_interval = fade_interval
+        self.level = None
+        self.target = None
+        self.pending = None  # (absolute, value)
+        self.closed = False
+        self.thread = None
+        self.cond = threading.Condition()
+        self.stats = Counter()
+
+    def set_level(self, level):
+        """requests absolute 'level' (0..1)."""
+        self.request(True, level)
+
+    def change_level(self, delta):
+        """requests a change of the level by 'delta', relative to the latest request."""
+        self.request(False, delta)
+
+    def request(self, absolute, value):
+        with self.cond:
+            self.stats['requests'] += 1
+            if self.pending is None:
+                self.pending = (absolute, value)
+            else:
+                self.stats['coalesced'] += 1
+                if absolute:
+                    self.pending = (True, value)
+                else:
+                    self.pending = (self.pending[0], self.pending[1] + value)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def take(self):
+        """returns the resolved pending target and clears it, None if there is none."""
+        if self.pending is None:
+            return None
+        absolute, value = self.pending
+        self.pending = None
+        # relative to the previous setpoint, not to where an interrupted fade got to
+        target = value if absolute else self.target + value
+        self.target = min(1.0, max(0.0, target))
+        return self.target
+
+    def run(self):
+        try:
+            self.backend.open()
+            self.level = self.target = float(self.backend.get())
+        except Exception as e:
+            print("[LevelActuator] backend unavailable:", e)
+            with self.cond:
+                self.closed = True
+            return
+
+        last_apply = 0.0
+        while True:
+            with self.cond:
+                while self.pending is None and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+            # rate limit, requests arriving meanwhile are coalesced
+            wait = last_apply + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            with self.cond:
+                target = self.take()
+            if target is None:
+                continue
+            self.apply(target)
+            last_apply = time.monotonic()
+
+    def apply(self, target):
+        level = self.level
+        step = self.fade_step or abs(target - level) or 1.0
+        while True:
+            if abs(target - level) <= step:
+                level = target
+            else:
+                level += step if target > level else -step
+            self.backend.set(level)
+            self.level = level
+            self.stats['writes'] += 1
+            if level == target:
+                self.stats['applied'] += 1
+                return
+            time.sleep(self.fade_interval)
+            if self.pending is not None:
+                # a newer setpoint replaces the rest of this fade
+                return
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+
+class MemoryLevel:
+    """
+    In-memory level backend, a stand-in for tests and replay. 'delay'
+    emulates a slow backend call.
+    """
+
+    def __init__(self, level=0.5, delay=0.0):
+        self.value = level
+        self.delay = delay
+        self.history = []
+
+    def open(self):
+        pass
+
+    def get(self):
+        return self.value
+
+    def set(self, level):
+        if self.delay:
+            time.sleep(self.delay)
+        self.value = level
+        self.history.append(level)
+
+
+class PycawVolume:
+    """Windows master volume, keeps one IAudioEndpointVolume for the thread's lifetime."""
+
+    def open(self):
+        from ctypes import cast, POINTER
+        import comtypes
+        from comtypes import CLSCTX_ALL
+        from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+        # COM has to be initialized on the worker thread using the interface
+        comtypes.CoInitialize()
+        devices = AudioUtilities.GetSpeakers()
+        interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+        self.volume = cast(interface, POINTER(IAudioEndpointVolume))
+
+    def get(self):
+        return self.volume.GetMasterVolumeLevelScalar()
+
+    def set(self, level):
+        self.volume.SetMasterVolumeLevelScalar(level, None)
+
+
+class AlsaVolume:
+    """Linux master volume through pyalsaaudio, or the amixer command if it is not installed."""
+
+    def __init__(self, control='Master'):
+        self.control = control
+        self.mixer = None
+
+    def open(self):
+        try:
+            import alsaaudio
+            self.mixer = alsaaudio.Mixer(self.control)
+        except ImportError:
+            self.mixer = None
+
+    def get(self):
+        if self.mixer is not None:
+            return self.mixer.getvolume()[0] / 100.0
+        out = subprocess.run(['amixer', '-M', 'get', self.control],
+                             capture_output=True, text=True, check=True).stdout
+        return int(re.search(r'\[(\d+)%\]', out).group(1)) / 100.0
+
+    def set(self, level):
+        percent = int(round(level * 100))
+        if self.mixer is not None:
+            self.mixer.setvolume(percent)
+        else:
+            subprocess.run(['amixer', '-q', '-M', 'set', self.control, '{}%'.format(percent)], check=True)
+
+
+class SbcBrightness:
+    """Display brightness through screen_brightness_control."""
+
+    def __init__(self, display=0):
+        self.display = display
+
+    def open(self):
+        import screen_brightness_control
+        self.sbc = screen_brightness_control
+
+    def get(self):
+        value = self.sbc.get_brightness(display=self.display)
+        if isinstance(value, list):
+            value = value[0]
+        return value / 100.0
+
+    def set(self, level):
+        self.sbc.set_brightness(int(round(level * 100)), display=self.display)
+
+
+class SysfsBrightness:
+    """Linux backlight brightness through /sys/class/backlight."""
+
+    ROOT = '/sys/class/backlight'
+
+    def __init__(self, device=None):
+        self.device = device
+
+    @staticmethod
+    def available():
+        root = SysfsBrightness.ROOT
+        return os.path.isdir(root) and any(
+            os.access(os.path.join(root, d, 'brightness'), os.W_OK) for d in os.listdir(root))
+
+    def open(self):
+        root = SysfsBrightness.ROOT
+        device = self.device or sorted(os.listdir(root))[0]
+        self.path = os.path.join(root, device, 'brightness')
+        with open(os.path.join(root, device, 'max_brightness')) as f:
+            self.max = int(f.read())
+
+    def get(self):
+        with open(self.path) as f:
+            return int(f.read()) / self.max
+
+    def set(self, level):
+        with open(self.path, 'w') as f:
+            f.write(str(int(round(level * self.max))))
+
+
+def default_volume_backend():
+    """returns the volume backend for this platform, in-memory if there is none."""
+    if sys.platform == 'win32':
+        return PycawVolume()
+    if sys.platform.startswith('linux') and shutil.which('amixer'):
+        return AlsaVolume()
+    return MemoryLevel()
+
+
+def default_brightness_backend():
+    """returns the brightness backend for this platform, in-memory if there is none."""
+    if sys.platform.startswith('linux') and SysfsBrightness.available():
+        return SysfsBrightness()
+    if sys.platform == 'win32':
+        return SbcBrightness()
+    return MemoryLevel()
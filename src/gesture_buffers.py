@@ -0,0 +1,135 @@
+# gesture_buffers.py
+
+# Preallocated frame buffers for the capture -> inference hand-off.
+# 'FrameRing' owns a fixed number of 'FrameSlot's. Capture fills a borrowed
+# slot in place ('cap.retrieve(slot.frame)'), inference converts it in place
+# to the mirrored RGB image mediapipe needs and gives the slot back, so the
+# steady state allocates no frame arrays. 'GcMonitor' measures what is left:
+# garbage collections and their pauses.
+
+import gc
+import queue
+import sys
+import time
+
+import cv2
+import numpy as np
+
+
+class FrameSlot:
+    """
+    One reusable frame buffer.
+
+    Attributes
+    ----------
+    frame : ndarray
+        camera BGR frame, converted to RGB in place by 'FrameRing.to_rgb'.
+    image : ndarray
+        mirrored RGB image handed to mediapipe.
+    """
+
+    __slots__ = ('frame', 'image')
+
+    def __init__(self):
+        self.frame = None
+        self.image = None
+
+
+class FrameRing:
+    """
+    Fixed pool of frame slots shared by capture and inference.
+
+    Attributes
+    ----------
+    stats : dict
+        'allocations' (frame arrays allocated, only when a slot is first
+        used or the resolution changes), 'acquired', 'released' and
+        'exhausted' (capture found no free slot).
+    """
+
+    def __init__(self, size=4):
+        self.free = queue.Queue()
+        for _ in range(size):
+            self.free.put(FrameSlot())
+        self.stats = {'allocations': 0, 'acquired': 0, 'released': 0, 'exhausted': 0}
+
+    def acquire(self, timeout=0.5):
+        """returns a free slot, None if none became free within 'timeout'."""
+        try:
+            slot = self.free.get(timeout=timeout)
+        except queue.Empty:
+            self.stats['exhausted'] += 1
+            return None
+        self.stats['acquired'] += 1
+        return slot
+
+    def release(self, slot):
+        """gives 'slot' back to the ring."""
+        self.stats['released'] += 1
+        self.free.put(slot)
+
+    def retrieve(self, cap, slot):
+        """decodes the last grabbed frame of 'cap' into 'slot.frame', returns success."""
+        if slot.frame is not None:
+            slot.frame.flags.writeable = True
+        ret, frame = cap.retrieve(slot.frame)
+        if ret and frame is not slot.frame:
+            # first use of the slot, or the capture resolution changed
+            slot.frame = frame
+            self.stats['allocations'] += 1
+        return ret
+
+    def to_rgb(self, slot):
+        """converts 'slot.frame' in place and mirrors it into 'slot.image', returns the image."""
+        frame = slot.frame
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+        image = slot.image
+        if image is None or image.shape != frame.shape:
+            image = slot.image = np.empty_like(frame)
+            self.stats['allocations'] += 1
+        image.flags.writeable = True
+        cv2.flip(frame, 1, dst=image)
+        # lets mediapipe use the buffer without copying it
+        image.flags.writeable = False
+        return image
+
+    def report(self):
+        """returns a copy of 'stats'."""
+        return dict(self.stats)
+
+
+class GcMonitor:
+    """
+    Counts garbage collections and measures their pauses through 'gc.callbacks'.
+
+    Attributes
+    ----------
+    stats : dict
+        'collections' per generation, 'pause_total_ms', 'pause_max_ms'.
+    """
+
+    def __init__(self):
+        self.started = None
+        self.stats = {'collections': [0, 0, 0], 'pause_total_ms': 0.0, 'pause_max_ms': 0.0}
+        self.blocks = sys.getallocatedblocks()
+        gc.callbacks.append(self.callback)
+
+    def callback(self, phase, info):
+        if phase == 'start':
+            self.started = time.perf_counter()
+        elif self.started is not None:
+            pause = (time.perf_counter() - self.started) * 1000.0
+            self.started = None
+            self.stats['collections'][info['generation']] += 1
+            self.stats['pause_total_ms'] += pause
+            self.stats['pause_max_ms'] = max(self.stats['pause_max_ms'], pause)
+
+    def report(self):
+        """returns a copy of 'stats' plus the growth of live python blocks since start."""
+        report = dict(self.stats, collections=list(self.stats['collections']))
+        report['block_growth'] = sys.getallocatedblocks() - self.blocks
+        return report
+
+    def close(self):
+        if self.callback in gc.callbacks:
+            gc.callbacks.remove(self.callback)
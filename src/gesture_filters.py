@@ -0,0 +1,173 @@
+# gesture_filters.py
+
+# Cursor smoothing between hand landmarks and pointer actuation.
+# 'CursorFilter' smooths the normalized index finger tip position per hand
+# with one of 'MODES' and can extrapolate a short horizon ahead to hide
+# pipeline latency; the horizon shrinks with the hand speed so that noise
+# is not extrapolated while the hand is still. All state lives in arrays
+# preallocated per hand slot.
+
+import math
+
+import numpy as np
+
+MODES = ('none', 'exponential', 'one_euro', 'kalman')
+
+
+class CursorFilter:
+    """
+    Smooths cursor positions with per hand state.
+
+    Attributes
+    ----------
+    mode : str
+        one of 'MODES'.
+    prediction : float
+        seconds to extrapolate ahead using the estimated velocity, 0 to disable,
+        about the capture to cursor latency.
+    prediction_speed : float
+        hand speed (normalized units per second) at which half the 'prediction'
+        horizon is used, slower hands are extrapolated less.
+    max_gap : float
+        seconds without samples after which a hand's state is reset.
+    alpha : float
+        smoothing factor of 'exponential' mode.
+    min_cutoff, beta, d_cutoff : float
+        One-Euro parameters, cutoffs in Hz, positions in normalized units.
+    process_noise, measurement_noise : float
+        constant velocity Kalman parameters.
+    """
+
+    def __init__(self, mode='one_euro', prediction=0.0, prediction_speed=0.8, max_hands=2,
+                 max_gap=0.5, alpha=0.5, min_cutoff=0.5, beta=40.0, d_cutoff=5.0,
+                 process_noise=0.5, measurement_noise=1e-5):
+        if mode not in MODES:
+            raise ValueError("unknown filter mode {!r}, expected one of {}".format(mode, MODES))
+        self.mode = mode
+        self.prediction = prediction
+        self.prediction_speed = prediction_speed
+        self.max_gap = max_gap
+        self.alpha = alpha
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+
+        self.value = np.zeros((max_hands, 2))         # filtered position
+        self.velocity = np.zeros((max_hands, 2))      # filtered velocity
+        self.cov = np.zeros((max_hands, 2, 2))        # Kalman covariance, shared by x / y
+        self.last_t = np.zeros(max_hands)
+        self.started = np.zeros(max_hands, dtype=bool)
+        self.sample = np.zeros(2)
+        self.out = np.zeros(2)
+
+    def reset(self, hand=None):
+        """forgets the state of 'hand' (all hands if None)."""
+        if hand is None:
+            self.started[:] = False
+        else:
+            self.started[hand] = False
+
+    @staticmethod
+    def smoothing(dt, cutoff):
+        """returns exponential smoothing factor for a low pass filter at 'cutoff' Hz."""
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def filter(self, hand, t, x, y):
+        """
+        returns filtered (x, y) of 'hand' for a sample at time 't'.
+
+        Parameters
+        ----------
+        hand : int
+            hand slot, e.g. 'HLabel' of the hand.
+        t : float
+            sample time in seconds.
+        x, y : float
+            raw normalized position.
+
+        Returns
+        -------
+        tuple of float
+        """
+        if self.mode == 'none':
+            return x, y
+
+        sample = self.sample
+        sample[0] = x
+        sample[1] = y
+        dt = t - self.last_t[hand]
+        self.last_t[hand] = t
+        if not self.started[hand] or dt <= 0 or dt > self.max_gap:
+            self.started[hand] = True
+            self.value[hand] = sample
+            self.velocity[hand] = 0.0
+            self.cov[hand] = ((self.measurement_noise, 0.0), (0.0, 1.0))
+            return x, y
+
+        if self.mode == 'exponential':
+            self.exponential(hand, dt, sample)
+        elif self.mode == 'one_euro':
+            self.one_euro(hand, dt, sample)
+        else:
+            self.kalman(hand, dt, sample)
+
+        value = self.value[hand]
+        if not self.prediction:
+            return float(value[0]), float(value[1])
+        velocity = self.velocity[hand]
+        speed2 = velocity[0] * velocity[0] + velocity[1] * velocity[1]
+        if speed2 == 0.0:
+            return float(value[0]), float(value[1])
+        # full horizon while moving, fading out towards rest where the velocity is mostly noise
+        horizon = self.prediction * speed2 / (speed2 + self.prediction_speed ** 2)
+        out = self.out
+        np.multiply(velocity, horizon, out=out)
+        out += value
+        return float(out[0]), float(out[1])
+
+    def exponential(self, hand, dt, sample):
+        value = self.value[hand]
+        previous = self.out
+        previous[:] = value
+        value *= 1.0 - self.alpha
+        value += self.alpha * sample
+        # velocity of the smoothed signal, used for prediction only
+        velocity = self.velocity[hand]
+        velocity *= 1.0 - self.alpha
+        velocity += self.alpha * (value - previous) / dt
+
+    def one_euro(self, hand, dt, sample):
+        value = self.value[hand]
+        velocity = self.velocity[hand]
+        a_d = self.smoothing(dt, self.d_cutoff)
+        velocity *= 1.0 - a_d
+        velocity += a_d * (sample - value) / dt
+        speed = math.hypot(velocity[0], velocity[1])
+        a = self.smoothing(dt, self.min_cutoff + self.beta * speed)
+        value *= 1.0 - a
+        value += a * sample
+
+    def kalman(self, hand, dt, sample):
+        # constant velocity model, x and y are independent with equal noise
+        value = self.value[hand]
+        velocity = self.velocity[hand]
+        p = self.cov[hand]
+        q = self.process_noise
+
+        value += velocity * dt
+        p00 = p[0, 0] + dt * (p[1, 0] + p[0, 1]) + dt * dt * p[1, 1] + q * dt ** 3 / 3
+        p01 = p[0, 1] + dt * p[1, 1] + q * dt ** 2 / 2
+        p11 = p[1, 1] + q * dt
+
+        gain_pos = p00 / (p00 + self.measurement_noise)
+        gain_vel = p01 / (p00 + self.measurement_noise)
+        residual = sample - value
+        value += gain_pos * residual
+        velocity += gain_vel * residual
+
+        p[0, 0] = (1 - gain_pos) * p00
+        p[0, 1] = p[1, 0] = (1 - gain_pos) * p01
+        p[1, 1] = p11 - gain_vel * p01
@@ -0,0 +1,103 @@
+# gesture_governor.py
+
+# Adaptive frame rate / resolution for the gesture loop.
+# 'FrameGovernor' drops to a low rate, low resolution idle profile when no
+# hand has been seen for a while and returns to the full profile as soon as
+# a hand is detected. While active, the frame interval follows the measured
+# inference time, so capture never produces frames inference cannot use.
+
+import time
+
+ACTIVE = 'active'
+IDLE = 'idle'
+
+
+class FrameGovernor:
+    """
+    Decides capture rate and resolution from hand presence and inference time.
+
+    Attributes
+    ----------
+    mode : str
+        'ACTIVE' or 'IDLE'.
+    active_fps, idle_fps : float
+        frame rate of each mode, 'active_fps' is an upper bound.
+    active_size, idle_size : tuple
+        capture (width, height) of each mode.
+    idle_after : float
+        seconds without hands before switching to idle.
+    headroom : float
+        the active frame interval is at least 'headroom' x mean inference time.
+    inference_time : float
+        moving average of inference time in seconds.
+    stats : dict
+        'active_frames', 'idle_frames', 'idle_seconds' and 'switches'.
+    """
+
+    def __init__(self, active_fps=30.0, idle_fps=5.0, active_size=(640, 480),
+                 idle_size=(320, 240), idle_after=2.0, headroom=1.2, smoothing=0.1):
+        self.active_fps = active_fps
+        self.idle_fps = idle_fps
+        self.active_size = active_size
+        self.idle_size = idle_size
+        self.idle_after = idle_after
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.mode = ACTIVE
+        self.inference_time = 0.0
+        self.last_hand = time.monotonic()
+        self.mode_since = self.last_hand
+        self.stats = {'active_frames': 0, 'idle_frames': 0, 'idle_seconds': 0.0, 'switches': 0}
+
+    @property
+    def size(self):
+        """returns capture (width, height) for the current mode."""
+        return self.active_size if self.mode == ACTIVE else self.idle_size
+
+    @property
+    def fps(self):
+        """returns the nominal camera frame rate for the current mode."""
+        return self.active_fps if self.mode == ACTIVE else self.idle_fps
+
+    def frame_interval(self):
+        """returns seconds between frames handed to inference."""
+        if self.mode == IDLE:
+            return 1.0 / self.idle_fps
+        return max(1.0 / self.active_fps, self.inference_time * self.headroom)
+
+    def update(self, hands_found, inference_time, now=None):
+        """
+        records the outcome of one inference and switches mode if needed.
+
+        Parameters
+        ----------
+        hands_found : bool
+            True if at least one hand was detected in the frame.
+        inference_time : float
+            seconds spent on landmark detection for the frame.
+        """
+        now = time.monotonic() if now is None else now
+        self.inference_time += self.smoothing * (inference_time - self.inference_time)
+        self.stats[self.mode + '_frames'] += 1
+        if hands_found:
+            self.last_hand = now
+            if self.mode == IDLE:
+                self.switch(ACTIVE, now)
+        elif self.mode == ACTIVE and now - self.last_hand > self.idle_after:
+            self.switch(IDLE, now)
+
+    def switch(self, mode, now):
+        if self.mode == IDLE:
+            self.stats['idle_seconds'] += now - self.mode_since
+        self.mode = mode
+        self.mode_since = now
+        self.stats['switches'] += 1
+
+    def report(self):
+        """returns a copy of 'stats' plus the current mode and frame interval."""
+        report = dict(self.stats)
+        if self.mode == IDLE:
+            report['idle_seconds'] += time.monotonic() - self.mode_since
+        report['mode'] = self.mode
+        report['interval_ms'] = self.frame_interval() * 1000.0
+        return report
@@ -0,0 +1,307 @@
+# gesture_replay.py
+
+# Record mediapipe hand landmarks to a memory-mappable binary file and replay
+# them through HandRecog / Controller without a webcam or a display.
+#
+# File layout: a 64 byte header (magic, version, max_hands) followed by
+# fixed size frame records, see 'frame_dtype'. The records can be mapped
+# straight into a numpy structured array with 'load_recording'.
+#
+# Usage:
+#   python gesture_replay.py record out.lmk          (needs webcam + display)
+#   python gesture_replay.py label out.lmk START STOP GESTURE
+#   python gesture_replay.py replay out.lmk [--realtime]
+
+import argparse
+import struct
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from Gesture_Controller import Gest, HLabel, HandRecog, Controller, select_action
+from gesture_actuation import Actuator, StubInjector, LevelActuator, MemoryLevel
+
+MAGIC = b'AIRLMK'
+VERSION = 1
+HEADER_SIZE = 64
+HEADER = struct.Struct('<6sHI')
+
+# handedness codes
+NO_HAND = -1
+LEFT = 0
+RIGHT = 1
+
+# label of frames without an expected gesture decision
+NO_LABEL = -1
+# label of frames where no action is expected (no hand visible)
+NO_ACTION = -2
+
+Landmark = namedtuple('Landmark', 'x y z')
+
+
+def frame_dtype(max_hands):
+    """returns numpy dtype of one frame record holding up to 'max_hands' hands."""
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('n_hands', 'u1'),
+        ('label', 'i1'),
+        ('handedness', 'i1', (max_hands,)),
+        ('landmarks', '<f4', (max_hands, 21, 3)),
+    ])
+
+
+class LandmarkRecorder:
+    """
+    Appends per frame landmarks, handedness and timestamps to a recording.
+
+    Attributes
+    ----------
+    max_hands : int
+        no. of hand slots per frame, extra hands are dropped.
+    frames : int
+        no. of frames written so far.
+    """
+
+    def __init__(self, path, max_hands=2):
+        self.max_hands = max_hands
+        self.frames = 0
+        self.record = np.zeros(1, dtype=frame_dtype(max_hands))
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, max_hands).ljust(HEADER_SIZE, b'\0'))
+
+    def write(self, timestamp, landmarks, handedness, label=NO_LABEL):
+        """
+        appends one frame.
+
+        Parameters
+        ----------
+        timestamp : float
+            capture time in seconds.
+        landmarks : ndarray
+            (n,21,3) landmarks of the visible hands.
+        handedness : list of int
+            'LEFT' / 'RIGHT' for every hand in 'landmarks'.
+        label : int
+            expected gesture decision for this frame, 'NO_LABEL' if unknown.
+        """
+        n = min(len(handedness), self.max_hands)
+        rec = self.record[0]
+        rec['timestamp'] = timestamp
+        rec['n_hands'] = n
+        rec['label'] = label
+        rec['handedness'] = NO_HAND
+        rec['handedness'][:n] = handedness[:n]
+        rec['landmarks'] = 0
+        if n:
+            rec['landmarks'][:n] = landmarks[:n]
+        self.file.write(self.record.tobytes())
+        self.frames += 1
+
+    def write_results(self, timestamp, results, label=NO_LABEL):
+        """appends one frame from the output of 'mp.solutions.hands.Hands.process'."""
+        landmarks = []
+        handedness = []
+        if results.multi_hand_landmarks:
+            for hand, hand_class in zip(results.multi_hand_landmarks, results.multi_handedness):
+                landmarks.append(HandRecog.landmarks_to_array(hand))
+                handedness.append(RIGHT if hand_class.classification[0].label == 'Right' else LEFT)
+        self.write(timestamp, np.array(landmarks, dtype=np.float32).reshape(-1, 21, 3),
+                   handedness, label)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_recording(path, mode='r'):
+    """
+    returns memory-mapped frame records of a recording.
+
+    Parameters
+    ----------
+    path : str
+    mode : str
+        'r' for read only, 'r+' to edit labels in place.
+
+    Returns
+    -------
+    numpy.memmap
+        structured array with fields of 'frame_dtype'.
+    """
+    with open(path, 'rb') as f:
+        magic, version, max_hands = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("{} is not a landmark recording".format(path))
+    return np.memmap(path, dtype=frame_dtype(max_hands), mode=mode, offset=HEADER_SIZE)
+
+
+def label_frames(path, start, stop, gesture):
+    """sets expected gesture decision of frames [start, stop) of a recording."""
+    frames = load_recording(path, 'r+')
+    frames['label'][start:stop] = gesture
+    frames.flush()
+
+
+class ArrayHand:
+    """
+    Wraps a (21,3) landmark array so it can be used wherever mediapipe
+    landmarks ('hand_result.landmark[i].x') are expected.
+    """
+
+    __slots__ = ('landmark',)
+
+    def __init__(self, landmarks):
+        self.landmark = [Landmark(*point) for point in landmarks.tolist()]
+
+
+class ReplayDriver:
+    """
+    Feeds a recording through HandRecog and Controller, the same way
+    'GestureController.inference_loop' / 'actuation_loop' do.
+
+    Attributes
+    ----------
+    frames : numpy.memmap
+        frame records from 'load_recording'.
+    cursor_filter : gesture_filters.CursorFilter
+        installed as 'Controller.cursor_filter' during replay, None for raw.
+    backend : Object
+        actuation backend installed as 'Controller.backend' during replay,
+        by default an 'Actuator' with a 'StubInjector'. Volume and
+        brightness go to in-memory 'LevelActuator's.
+    realtime : bool
+        True to replay at recorded speed, False to run as fast as possible.
+    dom_hand : bool
+        True if the right hand is the major hand.
+    """
+
+    def __init__(self, frames, backend=None, realtime=False, dom_hand=True, cursor_filter=None):
+        self.frames = frames
+        self.cursor_filter = cursor_filter
+        self.backend = backend if backend is not None else Actuator(StubInjector())
+        self.realtime = realtime
+        self.dom_hand = dom_hand
+
+    def split_hands(self, frame):
+        """returns (hr_major, hr_minor) for one frame record."""
+        left, right = None, None
+        for slot in range(frame['n_hands']):
+            hand = ArrayHand(frame['landmarks'][slot])
+            if frame['handedness'][slot] == RIGHT:
+                right = hand
+            else:
+                left = hand
+        if self.dom_hand:
+            return right, left
+        return left, right
+
+    def run(self, on_frame=None):
+        """
+        replays all frames and returns a dict report.
+
+        Parameters
+        ----------
+        on_frame : callable, optional
+            called as on_frame(index, action) after every frame.
+
+        Returns
+        -------
+        dict
+            'frames', 'elapsed', 'fps', 'p50_us' / 'p99_us' classification
+            latency, 'labelled', 'accuracy' and actuation 'calls'.
+        """
+        handmajor = HandRecog(HLabel.MAJOR)
+        handminor = HandRecog(HLabel.MINOR)
+        latency = np.zeros(len(self.frames), dtype=np.float64)
+        labelled = correct = 0
+
+        saved = Controller.backend, Controller.volume, Controller.brightness, Controller.cursor_filter
+        Controller.backend = self.backend
+        Controller.cursor_filter = self.cursor_filter
+        Controller.volume = LevelActuator(MemoryLevel())
+        Controller.brightness = LevelActuator(MemoryLevel())
+        Controller.reset()
+        try:
+            start = time.perf_counter()
+            t0 = float(self.frames['timestamp'][0]) if len(self.frames) else 0.0
+            for index, frame in enumerate(self.frames):
+                if self.realtime:
+                    delay = (float(frame['timestamp']) - t0) - (time.perf_counter() - start)
+                    if delay > 0:
+                        time.sleep(delay)
+
+                hr_major, hr_minor = self.split_hands(frame)
+                begin = time.perf_counter()
+                action = None
+                if frame['n_hands']:
+                    action = select_action(handmajor, handminor, hr_major, hr_minor)
+                latency[index] = time.perf_counter() - begin
+
+                if action is None:
+                    Controller.prev_hand = None
+                else:
+                    Controller.process(*action, timestamp=float(frame['timestamp']))
+
+                label = int(frame['label'])
+                if label != NO_LABEL:
+                    labelled += 1
+                    decided = NO_ACTION if action is None else int(action[2])
+                    correct += decided == label
+                if on_frame is not None:
+                    on_frame(index, action)
+            elapsed = time.perf_counter() - start
+        finally:
+            Controller.volume.close()
+            Controller.brightness.close()
+            (Controller.backend, Controller.volume, Controller.brightness,
+             Controller.cursor_filter) = saved
+
+        count = len(self.frames)
+        return {
+            'frames': count,
+            'elapsed': elapsed,
+            'fps': count / elapsed if elapsed else float('inf'),
+            'p50_us': float(np.percentile(latency, 50)) * 1e6 if count else 0.0,
+            'p99_us': float(np.percentile(latency, 99)) * 1e6 if count else 0.0,
+            'labelled': labelled,
+            'accuracy': correct / labelled if labelled else None,
+            'calls': dict(getattr(self.backend, 'stats', {})),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record / label / replay hand landmark recordings.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', help='record landmarks from the webcam')
+    record.add_argument('path')
+    record.add_argument('--max-hands', type=int, default=2)
+    label = commands.add_parser('label', help='set expected gesture of a frame range')
+    label.add_argument('path')
+    label.add_argument('start', type=int)
+    label.add_argument('stop', type=int)
+    label.add_argument('gesture', help="Gest name, or NONE for no action")
+    replay = commands.add_parser('replay', help='replay a recording headless')
+    replay.add_argument('path')
+    replay.add_argument('--realtime', action='store_true')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        from Gesture_Controller import GestureController
+        GestureController(recorder=LandmarkRecorder(args.path, args.max_hands)).start()
+    elif args.command == 'label':
+        gesture = NO_ACTION if args.gesture.upper() == 'NONE' else Gest[args.gesture.upper()]
+        label_frames(args.path, args.start, args.stop, gesture)
+    else:
+        report = ReplayDriver(load_recording(args.path), realtime=args.realtime).run()
+        for key, value in report.items():
+            print("{:<10}: {}".format(key, value))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,412 @@
+# gesture_stream.py
+
+# Local publish / subscribe stream of gesture events for other apps.
+# 'GestureStream' listens on a Unix socket (loopback TCP where there are
+# none, e.g. Windows) and sends every subscriber the events published by
+# 'Controller' on the gesture thread:
+#   GESTURE  the gesture of a hand changed, 'value' is the Gest code
+#   LOST     no hand in view any more
+#   CURSOR   filtered index finger tip, x / y in 0-1 of the frame
+#   PINCH    pinch level in 'x' while pinching, 'value' is the axis (0 x, 1 y)
+# A connection starts with HEADER (magic, record size), followed by fixed
+# size little endian records (EVENT): sequence no., wall clock timestamp,
+# kind, hand, value, x, y. No length prefixes, no parsing beyond
+# 'struct.unpack'; a gap in the sequence numbers shows lost events. Live
+# records count from 1 (wrapping to 1 after 2**32 - 1); on connect, the
+# current gesture of every hand is sent first with seq 0, which is outside
+# the sequence and must not be checked for gaps.
+# Publishing only packs the record and queues it, one I/O thread fans the
+# records out with non-blocking sends. The gesture thread never waits for
+# a subscriber: each one has a bounded buffer, a slow subscriber loses its
+# oldest records and one that stays behind for 'max_lag' is disconnected.
+#
+# Usage: python gesture_stream.py listen [ADDRESS]   (prints the events)
+#        python gesture_stream.py demo [ADDRESS] [--rate HZ]   (publishes a moving cursor)
+
+import argparse
+import errno
+import math
+import os
+import selectors
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+HEADER = struct.Struct('<4sH')
+MAGIC = b'AGS1'
+# seq, timestamp (s since epoch), kind, hand, value, x, y
+EVENT = struct.Struct('<IdBBhff')
+
+GESTURE, LOST, CURSOR, PINCH = 1, 2, 3, 4
+KINDS = {GESTURE: 'gesture', LOST: 'lost', CURSOR: 'cursor', PINCH: 'pinch'}
+DEFAULT_PORT = 27007
+
+
+def default_address():
+    """
+    returns AURA_GESTURE_STREAM (a socket path or host:port), else a Unix
+    socket in the temp directory, 127.0.0.1:27007 without Unix sockets;
+    None if it is 'off'.
+    """
+    address = os.environ.get('AURA_GESTURE_STREAM')
+    if address:
+        return None if address.lower() in ('0', 'off') else parse_address(address)
+    if hasattr(socket, 'AF_UNIX') and sys.platform != 'win32':
+        return os.path.join(tempfile.gettempdir(), 'aura-gestures.sock')
+    return ('127.0.0.1', DEFAULT_PORT)
+
+
+def parse_address(address):
+    """returns (host, port) for 'host:port', else 'address' as a socket path."""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and os.sep not in address:
+        return (host or '127.0.0.1', int(port))
+    return address
+
+
+def family(address):
+    return socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+
+
+class Subscriber:
+    """
+    One connected consumer, owned by the I/O thread.
+
+    Attributes
+    ----------
+    buffer : bytearray
+        HEADER and records not sent yet; the first one may be partly sent.
+    sent : int
+        bytes sent so far.
+    behind : float
+        'time.monotonic' since the buffer has been full, None if it is not.
+    """
+
+    __slots__ = ('sock', 'buffer', 'sent', 'behind', 'dropped')
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = bytearray()
+        self.sent = 0
+        self.behind = None
+        self.dropped = 0
+
+
+class GestureStream:
+    """
+    Publisher side of the gesture event stream.
+
+    Publish from one thread (the gesture thread); sequence numbers and
+    gesture state are not locked.
+
+    Attributes
+    ----------
+    address : str or tuple
+        Unix socket path or (host, port).
+    max_buffer : int
+        records buffered per subscriber before its oldest are dropped.
+    max_lag : float
+        seconds a subscriber may stay with a full buffer before it is
+        disconnected.
+    stats : dict
+        'published', 'subscribed', 'disconnected' (slow subscribers),
+        'dropped' (records lost by slow subscribers) and 'batches'.
+    """
+
+    def __init__(self, address=None, max_buffer=4096, max_lag=2.0):
+        self.address = address or default_address()
+        self.max_bytes = max_buffer * EVENT.size
+        self.max_lag = max_lag
+        self.seq = 0
+        self.pending = deque()
+        self.woken = False
+        self.gestures = {}
+        self.subscribers = {}
+        # capture times are 'time.perf_counter', events carry wall clock time
+        self.clock_offset = time.time() - time.perf_counter()
+        self.selector = selectors.DefaultSelector()
+        self.wake_r, self.wake_w = socket.socketpair()
+        self.wake_r.setblocking(False)
+        self.wake_w.setblocking(False)
+        self.server = None
+        self.thread = None
+        self.running = False
+        self.stats = {'published': 0, 'subscribed': 0, 'disconnected': 0, 'dropped': 0, 'batches': 0}
+
+    def start(self):
+        """binds the socket and starts the I/O thread, returns self."""
+        address = self.address
+        server = socket.socket(family(address), socket.SOCK_STREAM)
+        if isinstance(address, tuple):
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        elif os.path.exists(address):
+            # remove the socket of a previous run, but don't take over a live one
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(address)
+            except ConnectionRefusedError:
+                os.unlink(address)
+            except OSError:
+                pass  # not a socket or not ours, 'bind' reports it
+            else:
+                server.close()
+                raise OSError(errno.EADDRINUSE, 'gesture stream already running', address)
+            finally:
+                probe.close()
+        server.bind(address)
+        if not isinstance(address, tuple):
+            os.chmod(address, 0o600)
+        server.listen(8)
+        server.setblocking(False)
+        self.server = server
+        self.selector.register(server, selectors.EVENT_READ, 'accept')
+        self.selector.register(self.wake_r, selectors.EVENT_READ, 'wake')
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='gesture-stream', daemon=True)
+        self.thread.start()
+        return self
+
+    # Publishing, on the gesture thread
+
+    def publish(self, kind, hand, value, x, y, timestamp=None):
+        """queues one event, 'timestamp' is a 'time.perf_counter' value (default now)."""
+        if not self.subscribers:
+            return
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        self.seq = self.seq % 0xFFFFFFFF + 1  # 0 is reserved for the state sent on connect
+        self.pending.append(EVENT.pack(self.seq, timestamp + self.clock_offset, kind, hand, value, x, y))
+        if not self.woken:
+            self.woken = True
+            try:
+                self.wake_w.send(b'\x00')
+            except BlockingIOError:
+                pass  # a wake-up is pending anyway
+
+    def gesture(self, hand, gesture, x, y, timestamp=None):
+        """publishes GESTURE when the gesture of 'hand' changed."""
+        if self.gestures.get(hand) != gesture:
+            self.gestures[hand] = gesture
+            self.publish(GESTURE, hand, gesture, x, y, timestamp)
+
+    def lost(self, timestamp=None):
+        """publishes LOST once when the hands left the view."""
+        if self.gestures:
+            self.gestures.clear()
+            self.publish(LOST, 0, -1, 0.0, 0.0, timestamp)
+
+    def cursor(self, hand, x, y, timestamp=None):
+        self.publish(CURSOR, hand, 0, x, y, timestamp)
+
+    def pinch(self, hand, axis, level, timestamp=None):
+        self.publish(PINCH, hand, axis, level, 0.0, timestamp)
+
+    # I/O thread
+
+    def run(self):
+        while self.running:
+            for key, mask in self.selector.select(timeout=1.0):
+                if key.data == 'accept':
+                    self.accept()
+                elif key.data == 'wake':
+                    try:
+                        while self.wake_r.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    self.woken = False
+                else:
+                    subscriber = key.data
+                    if mask & selectors.EVENT_READ and not self.receive(subscriber):
+                        continue
+                    if mask & selectors.EVENT_WRITE:
+                        self.send(subscriber)
+            self.fan_out()
+
+    def accept(self):
+        try:
+            sock, _ = self.server.accept()
+        except (BlockingIOError, OSError):
+            return
+        sock.setblocking(False)
+        if family(self.address) == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        subscriber = Subscriber(sock)
+        subscriber.buffer += HEADER.pack(MAGIC, EVENT.size)
+        now = time.time()
+        for hand, gesture in dict(self.gestures).items():
+            subscriber.buffer += EVENT.pack(0, now, GESTURE, hand, gesture, 0.0, 0.0)
+        self.subscribers[sock] = subscriber
+        self.stats['subscribed'] += 1
+        self.selector.register(sock, selectors.EVENT_READ, subscriber)
+        self.send(subscriber)
+
+    def receive(self, subscriber):
+        """consumers send nothing, readable means closed; returns False if it was."""
+        try:
+            if subscriber.sock.recv(256):
+                return True
+        except BlockingIOError:
+            return True
+        except OSError:
+            pass
+        self.remove(subscriber)
+        return False
+
+    def remove(self, subscriber):
+        self.subscribers.pop(subscriber.sock, None)
+        try:
+            self.selector.unregister(subscriber.sock)
+        except (KeyError, ValueError):
+            pass
+        subscriber.sock.close()
+
+    def fan_out(self):
+        """moves the queued records into every subscriber's buffer and sends them."""
+        if not self.pending:
+            return
+        records = []
+        pending = self.pending
+        while pending:
+            records.append(pending.popleft())
+        batch = b''.join(records)
+        self.stats['published'] += len(records)
+        self.stats['batches'] += 1
+        now = time.monotonic()
+        for subscriber in list(self.subscribers.values()):
+            subscriber.buffer += batch
+            excess = len(subscriber.buffer) - self.max_bytes
+            if excess > 0:
+                self.trim(subscriber, excess, now)
+                if subscriber.behind is not None and now - subscriber.behind > self.max_lag:
+                    self.stats['disconnected'] += 1
+                    self.remove(subscriber)
+                    continue
+            self.send(subscriber)
+
+    def trim(self, subscriber, excess, now):
+        """drops at least 'excess' bytes of the oldest whole records, never a partly sent one."""
+        if subscriber.sent < HEADER.size:
+            head = HEADER.size - subscriber.sent
+        else:
+            head = -(subscriber.sent - HEADER.size) % EVENT.size
+        records = -(-excess // EVENT.size)
+        del subscriber.buffer[head:head + records * EVENT.size]
+        subscriber.dropped += records
+        self.stats['dropped'] += records
+        if subscriber.behind is None:
+            subscriber.behind = now
+
+    def send(self, subscriber):
+        buffer = subscriber.buffer
+        try:
+            n = subscriber.sock.send(buffer)
+        except BlockingIOError:
+            n = 0
+        except OSError:
+            self.remove(subscriber)
+            return
+        if n:
+            del buffer[:n]
+            subscriber.sent += n
+        if buffer:
+            self.selector.modify(subscriber.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, subscriber)
+        else:
+            subscriber.behind = None
+            self.selector.modify(subscriber.sock, selectors.EVENT_READ, subscriber)
+
+    def report(self):
+        """returns a copy of 'stats' plus the no. of connected subscribers."""
+        return dict(self.stats, subscribers=len(self.subscribers))
+
+    def close(self):
+        self.running = False
+        try:
+            self.wake_w.send(b'\x00')
+        except OSError:
+            pass
+        if self.thread is not None:
+            self.thread.join(2.0)
+        for subscriber in list(self.subscribers.values()):
+            self.remove(subscriber)
+        if self.server is not None:
+            self.selector.unregister(self.server)
+            self.server.close()
+            if not isinstance(self.address, tuple) and os.path.exists(self.address):
+                os.unlink(self.address)
+        self.wake_r.close()
+        self.wake_w.close()
+        self.selector.close()
+
+
+def subscribe(address=None, timeout=None):
+    """
+    connects to a stream, yields (seq, timestamp, kind, hand, value, x, y)
+    tuples, first the current gestures with seq 0; returns when the
+    publisher closes the connection.
+    """
+    address = address or default_address()
+    sock = socket.socket(family(address), socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    sock.connect(address)
+    stream = sock.makefile('rb')
+    try:
+        magic, size = HEADER.unpack(stream.read(HEADER.size))
+        if magic != MAGIC or size != EVENT.size:
+            raise ValueError('not a gesture stream: {!r} {}'.format(magic, size))
+        rest = b''
+        while True:
+            data = stream.read1(EVENT.size * 256)
+            if not data:
+                return
+            data = rest + data if rest else data
+            end = len(data) - len(data) % EVENT.size
+            rest = data[end:]
+            yield from EVENT.iter_unpack(data[:end])
+    finally:
+        stream.close()
+        sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gesture event stream subscriber / demo publisher.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    listen = sub.add_parser('listen', help='print the events of a running stream')
+    listen.add_argument('address', nargs='?')
+    demo = sub.add_parser('demo', help='publish a cursor moving in a circle and a gesture change per second')
+    demo.add_argument('address', nargs='?')
+    demo.add_argument('--rate', type=float, default=60.0)
+    args = parser.parse_args()
+    address = parse_address(args.address) if args.address else default_address()
+
+    if args.command == 'listen':
+        last = None
+        for seq, stamp, kind, hand, value, x, y in subscribe(address):
+            if seq:
+                if last is not None and seq != last % 0xFFFFFFFF + 1:
+                    print("[gesture_stream] lost {} events".format((seq - last - 1) % 0xFFFFFFFF))
+                last = seq
+            print("{:>8} {:8.1f}ms {:<8} hand {} value {:>3} x {:.3f} y {:.3f}".format(
+                seq, (time.time() - stamp) * 1000.0, KINDS.get(kind, kind), hand, value, x, y))
+    else:
+        stream = GestureStream(address).start()
+        print("[gesture_stream] publishing on {}".format(stream.address))
+        start = time.perf_counter()
+        try:
+            while True:
+                t = time.perf_counter() - start
+                stream.gesture(1, int(t) % 2 * 8, 0.5, 0.5)
+                stream.cursor(1, 0.5 + 0.3 * math.cos(t), 0.5 + 0.3 * math.sin(t))
+                time.sleep(1.0 / args.rate)
+        except KeyboardInterrupt:
+            pass
+        print(stream.report())
+        stream.close()
+
+
+if __name__ == '__main__':
+    main()
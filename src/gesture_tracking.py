@@ -0,0 +1,164 @@
+# gesture_tracking.py
+
+# Region-of-interest hand tracking.
+# Instead of handing every full resolution frame to mediapipe, 'RoiTracker'
+# crops around the hands found in the previous frame, downsamples the crop
+# and runs landmark detection on it. Full frame detection is only used when
+# no hand is tracked, a hand is lost or leaves its crop, the handedness
+# confidence drops, or every 'redetect_interval' frames to pick up hands
+# entering the view.
+# Crops are resized / copied into one preallocated buffer, so tracking does
+# not allocate image arrays per frame.
+
+import time
+
+import cv2
+import numpy as np
+
+
+class RoiTracker:
+    """
+    Crops and downsamples around tracked hands before landmark detection.
+
+    Attributes
+    ----------
+    hands : mp.solutions.hands.Hands
+        instance used for full frame detection.
+    roi_hands : mp.solutions.hands.Hands
+        instance used on crops, kept separate so that neither loses its
+        internal tracking when switching between full frames and crops.
+    margin : float
+        crop padding, as a fraction of the hands' bounding box size.
+    track_size : int
+        crops are downsampled so that their longest side is at most this.
+    min_size : int
+        minimum crop side in pixels.
+    min_score : float
+        minimum handedness score to keep tracking.
+    redetect_interval : int
+        force a full frame detection after this many tracked frames.
+    stats : dict
+        'detection_frames', 'tracking_frames', 'fallbacks', mean
+        'detection_ms' / 'tracking_ms' and estimated 'saved_ms'.
+    """
+
+    BORDER = 0.02
+
+    def __init__(self, hands, roi_hands, margin=0.3, track_size=256, min_size=96,
+                 min_score=0.8, redetect_interval=30):
+        self.hands = hands
+        self.roi_hands = roi_hands
+        self.margin = margin
+        self.track_size = track_size
+        self.min_size = min_size
+        self.min_score = min_score
+        self.redetect_interval = redetect_interval
+        self.roi = None  # (x0, y0, x1, y1) normalized
+        self.n_hands = 0
+        self.tracked = 0
+        # contiguous crop images are carved out of this buffer
+        self.crop_buffer = np.empty(max(track_size, min_size) ** 2 * 3, dtype=np.uint8)
+        self.stats = {'detection_frames': 0, 'tracking_frames': 0, 'fallbacks': 0,
+                      'detection_ms': 0.0, 'tracking_ms': 0.0, 'saved_ms': 0.0}
+
+    def process(self, image):
+        """
+        returns mediapipe results for the mirrored RGB 'image', with
+        landmarks normalized to the full image like 'Hands.process'.
+        """
+        start = time.perf_counter()
+        if self.roi is not None and self.tracked < self.redetect_interval:
+            results = self.track(image)
+            if results is not None:
+                self.tracked += 1
+                self.account('tracking', start)
+                return results
+            self.stats['fallbacks'] += 1
+
+        results = self.hands.process(image)
+        self.tracked = 0
+        self.update_roi(results, image.shape)
+        self.account('detection', start)
+        return results
+
+    def crop(self, image, left, top, right, bottom):
+        """returns contiguous, downsampled copy of the region in 'crop_buffer'."""
+        region = image[top:bottom, left:right]
+        height, width = region.shape[:2]
+        scale = self.track_size / max(height, width)
+        if scale < 1.0:
+            width, height = max(1, int(width * scale)), max(1, int(height * scale))
+        if height * width * 3 > self.crop_buffer.size:
+            self.crop_buffer = np.empty(height * width * 3, dtype=np.uint8)
+        out = self.crop_buffer[:height * width * 3].reshape(height, width, 3)
+        out.flags.writeable = True
+        if scale < 1.0:
+            cv2.resize(region, (width, height), dst=out, interpolation=cv2.INTER_AREA)
+        else:
+            np.copyto(out, region)
+        out.flags.writeable = False
+        return out
+
+    def track(self, image):
+        """returns results from the crop around 'roi', None if tracking is lost."""
+        height, width = image.shape[:2]
+        x0, y0, x1, y1 = self.roi
+        left, right = int(x0 * width), int(x1 * width)
+        top, bottom = int(y0 * height), int(y1 * height)
+        if right <= left or bottom <= top:
+            return None
+        results = self.roi_hands.process(self.crop(image, left, top, right, bottom))
+
+        if not results.multi_hand_landmarks or len(results.multi_hand_landmarks) < self.n_hands:
+            return None
+        if min(h.classification[0].score for h in results.multi_handedness) < self.min_score:
+            return None
+
+        # back to full image coordinates; the crop spans the real pixel bounds
+        cx0, cy0 = left / width, top / height
+        cw, ch = (right - left) / width, (bottom - top) / height
+        leaving = False
+        for hand in results.multi_hand_landmarks:
+            for lm in hand.landmark:
+                if not (self.BORDER < lm.x < 1 - self.BORDER and self.BORDER < lm.y < 1 - self.BORDER):
+                    leaving = True
+                lm.x = cx0 + lm.x * cw
+                lm.y = cy0 + lm.y * ch
+                lm.z = lm.z * cw
+        if leaving:
+            # still usable for this frame, but re-detect on the next one
+            self.roi = None
+        else:
+            self.update_roi(results, image.shape)
+        return results
+
+    def update_roi(self, results, shape):
+        """sets 'roi' to the padded, squared bounding box of all detected hands."""
+        if not results.multi_hand_landmarks:
+            self.roi = None
+            self.n_hands = 0
+            return
+        self.n_hands = len(results.multi_hand_landmarks)
+        xs = [lm.x for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        height, width = shape[:2]
+        # square in pixels, hands rotate
+        cx, cy = (min(xs) + max(xs)) / 2 * width, (min(ys) + max(ys)) / 2 * height
+        size = max((max(xs) - min(xs)) * width, (max(ys) - min(ys)) * height) * (1 + 2 * self.margin)
+        size = max(size, self.min_size)
+        half = size / 2
+        self.roi = (max(0.0, (cx - half) / width), max(0.0, (cy - half) / height),
+                    min(1.0, (cx + half) / width), min(1.0, (cy + half) / height))
+
+    def account(self, kind, start):
+        elapsed = (time.perf_counter() - start) * 1000.0
+        stats = self.stats
+        stats[kind + '_frames'] += 1
+        # running means of both paths
+        stats[kind + '_ms'] += (elapsed - stats[kind + '_ms']) / stats[kind + '_frames']
+        if kind == 'tracking' and stats['detection_frames']:
+            stats['saved_ms'] += stats['detection_ms'] - elapsed
+
+    def report(self):
+        """returns a copy of 'stats'."""
+        return dict(self.stats)
@@ -0,0 +1,213 @@
+# intent_router.py
+
+# Declarative intent routing for Aura's voice commands.
+# Intents are registered with trigger phrases, a priority and an optional
+# context in which they are active, then compiled into one Aho-Corasick
+# automaton over words. 'route' tokenizes the transcript once and finds
+# every phrase occurrence in a single pass; the best match wins by
+# priority, then phrase length, then position. Matching whole words means
+# 'date' no longer fires inside 'update'. Text after the matched phrase is
+# returned as the command argument.
+# The point is correct routing, not speed: a route costs a few µs of Python,
+# several times the old chain of C substring checks (see bench_intents.py),
+# and either is negligible next to speech recognition.
+
+import re
+from collections import deque
+from itertools import islice
+
+WORD = re.compile(r"[a-z0-9']+")
+
+# Aura's command set: name -> (phrases, options for 'IntentRouter.add')
+AURA_INTENTS = {
+    'wake': (('wake up',), {'context': 'asleep'}),
+    'hello': (('hello',), {}),
+    'name': (('what is your name', "what's your name"), {'priority': 1}),
+    'date': (('date', "today's date"), {}),
+    'time': (('time', 'what time is it'), {}),
+    'search': (('search', 'search for'), {}),
+    'location': (('location',), {}),
+    'copy': (('copy',), {}),
+    'undo': (('undo',), {}),
+    'paste': (('paste', 'pest'), {}),
+    'list': (('list', 'list files'), {}),
+    'file_open': (('open',), {'context': 'files'}),
+    'file_back': (('back', 'go back'), {'context': 'files'}),
+    'file_next': (('next', 'next page'), {'context': 'files'}),
+    'file_previous': (('previous', 'previous page'), {'context': 'files'}),
+    'file_close': (('close', 'close files'), {'context': 'files'}),
+    'calculator': (('open calculator',), {}),
+    'calendar': (('open calendar',), {}),
+    'whatsapp': (('open whatsapp chat', 'open whatsapp chat of', 'open whatsapp chat for'), {}),
+    'gesture_start': (('launch gesture recognition',), {'priority': 1}),
+    'gesture_stop': (('stop gesture recognition',), {'priority': 1}),
+    'sleep': (('bye', 'sleep', 'good bye', 'goodbye'), {}),
+    'exit': (('exit', 'terminate'), {'priority': 2}),
+}
+
+
+class Intent:
+    """
+    Attributes
+    ----------
+    name : str
+    phrases : tuple of str
+    handler : callable or None
+        called with the 'Match' by 'IntentRouter.dispatch'.
+    priority : int
+        higher wins when several intents match.
+    context : str or None
+        the intent only matches while this context is active.
+    """
+
+    __slots__ = ('name', 'phrases', 'handler', 'priority', 'context')
+
+    def __init__(self, name, phrases, handler=None, priority=0, context=None):
+        self.name = name
+        self.phrases = phrases
+        self.handler = handler
+        self.priority = priority
+        self.context = context
+
+
+class Match:
+    """
+    Attributes
+    ----------
+    intent : Intent
+    text : str
+        the routed transcript.
+    start, end : int
+        character span of the matched phrase.
+    arg : str
+        text after the matched phrase, stripped.
+    """
+
+    __slots__ = ('intent', 'text', 'start', 'end', 'arg')
+
+    def __init__(self, intent, text, start, end):
+        self.intent = intent
+        self.text = text
+        self.start = start
+        self.end = end
+        self.arg = text[end:].strip()
+
+    @property
+    def name(self):
+        return self.intent.name
+
+
+class IntentRouter:
+    """
+    Multi-phrase matcher dispatching transcripts to intents.
+
+    Attributes
+    ----------
+    intents : list of Intent
+    goto : list of dict
+        automaton transitions, word -> state.
+    fail : list of int
+        failure link of every state.
+    out : list of list
+        (intent index, phrase length in words) of phrases ending in every state.
+    """
+
+    def __init__(self):
+        self.intents = []
+        self.goto = None
+        self.fail = None
+        self.out = None
+
+    def add(self, name, phrases, handler=None, priority=0, context=None):
+        """registers an intent, invalidates the compiled automaton."""
+        self.intents.append(Intent(name, tuple(phrases), handler, priority, context))
+        self.goto = None
+        return self
+
+    def intent(self, name, phrases, priority=0, context=None):
+        """decorator form of 'add'."""
+        def register(handler):
+            self.add(name, phrases, handler, priority, context)
+            return handler
+        return register
+
+    def compile(self):
+        """builds the word level Aho-Corasick automaton of all phrases."""
+        goto, out = [{}], [[]]
+        for index, intent in enumerate(self.intents):
+            for phrase in intent.phrases:
+                words = WORD.findall(phrase.lower())
+                state = 0
+                for word in words:
+                    if word not in goto[state]:
+                        goto.append({})
+                        out.append([])
+                        goto[state][word] = len(goto) - 1
+                    state = goto[state][word]
+                out[state].append((index, len(words)))
+
+        fail = [0] * len(goto)
+        pending = deque(goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for word, child in goto[state].items():
+                pending.append(child)
+                f = fail[state]
+                while f and word not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(word, 0)
+                out[child] = out[child] + out[fail[child]]
+        self.goto, self.fail, self.out = goto, fail, out
+        return self
+
+    def route(self, text, contexts=()):
+        """
+        returns the best 'Match' in 'text', None if no intent matches.
+
+        Parameters
+        ----------
+        text : str
+            transcript.
+        contexts : collection of str
+            active contexts, intents with another context are ignored.
+        """
+        if self.goto is None:
+            self.compile()
+        goto, fail, out, intents = self.goto, self.fail, self.out, self.intents
+        best, best_rank = None, None
+        state = 0
+        lowered = text.lower()
+        for i, word in enumerate(WORD.findall(lowered)):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for index, length in out[state]:
+                intent = intents[index]
+                if intent.context is not None and intent.context not in contexts:
+                    continue
+                # priority, then longer phrase, then earlier position
+                rank = (intent.priority, length, -i)
+                if best_rank is None or rank > best_rank:
+                    best, best_rank = (index, i - length + 1, i), rank
+        if best is None:
+            return None
+        index, first, last = best
+        # character span of the winning phrase only
+        spans = [m.span() for m in islice(WORD.finditer(lowered), first, last + 1)]
+        return Match(intents[index], text, spans[0][0], spans[-1][1])
+
+    def dispatch(self, text, contexts=()):
+        """routes 'text' and calls the handler of the match, returns the match."""
+        match = self.route(text, contexts)
+        if match is not None and match.intent.handler is not None:
+            match.intent.handler(match)
+        return match
+
+
+def aura_router(handlers=None):
+    """returns compiled router of 'AURA_INTENTS' with handlers looked up by intent name."""
+    handlers = handlers or {}
+    router = IntentRouter()
+    for name, (phrases, options) in AURA_INTENTS.items():
+        router.add(name, phrases, handlers.get(name), **options)
+    return router.compile()
@@ -0,0 +1,353 @@
+# llm_client.py
+
+# Streaming chat completion clients for Aura's conversational fallback.
+# Every client has 'stream(messages)', which yields text deltas as they
+# arrive, so replies can be spoken sentence by sentence ('sentence_chunks')
+# instead of after the whole completion.
+#   OpenAIChatClient  the OpenAI SDK, default
+#   HTTPChatClient    any OpenAI compatible /chat/completions endpoint over
+#                     plain HTTP, e.g. a local model server or 'MockServer'
+#   MockChatClient    in-process canned replies with configurable delays
+# 'MockServer' streams canned replies in the OpenAI server-sent events
+# format, so the real clients can be tested without network access.
+#
+# Usage: python llm_client.py serve [--port P] [--first-delay S] [--delay S]
+#        python llm_client.py chat [--url URL] TEXT
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# sentence end, optionally followed by closing quotes / brackets
+SENTENCE_END = re.compile(r'[.!?;:]+["\')\]]*\s')
+CLAUSE_END = re.compile(r'[,—-]\s')
+
+
+class ChatClient:
+    """
+    Base class of streaming chat clients.
+
+    Attributes
+    ----------
+    stats : dict
+        'requests', 'errors', mean 'first_token_ms' and 'total_ms'.
+    """
+
+    def __init__(self):
+        self.stats = {'requests': 0, 'errors': 0, 'first_token_ms': 0.0, 'total_ms': 0.0}
+
+    def deltas(self, messages):
+        raise NotImplementedError
+
+    def stream(self, messages):
+        """yields reply text deltas for the chat 'messages' as they arrive."""
+        stats = self.stats
+        stats['requests'] += 1
+        n = stats['requests']
+        start = time.perf_counter()
+        first = True
+        try:
+            for delta in self.deltas(messages):
+                if not delta:
+                    continue
+                if first:
+                    first = False
+                    elapsed = (time.perf_counter() - start) * 1000.0
+                    stats['first_token_ms'] += (elapsed - stats['first_token_ms']) / n
+                yield delta
+        except Exception:
+            stats['errors'] += 1
+            raise
+        elapsed = (time.perf_counter() - start) * 1000.0
+        stats['total_ms'] += (elapsed - stats['total_ms']) / n
+
+    def complete(self, messages):
+        """returns the whole reply for the chat 'messages'."""
+        return ''.join(self.stream(messages)).strip()
+
+    def report(self):
+        """returns a copy of 'stats'."""
+        return dict(self.stats)
+
+
+class OpenAIChatClient(ChatClient):
+    """
+    Streams completions through the OpenAI SDK.
+
+    Attributes
+    ----------
+    client : openai.OpenAI
+        created on first use if not given, reads OPENAI_API_KEY / OPENAI_BASE_URL.
+    """
+
+    def __init__(self, client=None, model=DEFAULT_MODEL, max_tokens=30, temperature=0.7,
+                 timeout=10.0):
+        super().__init__()
+        self.client = client
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.timeout = timeout
+
+    def deltas(self, messages):
+        if self.client is None:
+            from openai import OpenAI
+            self.client = OpenAI()
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            store=True,
+            stream=True,
+            timeout=self.timeout,
+        )
+        try:
+            for chunk in response:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content
+        finally:
+            response.close()
+
+
+class HTTPChatClient(ChatClient):
+    """
+    Streams completions from an OpenAI compatible endpoint with the standard library.
+
+    Attributes
+    ----------
+    url : str
+        base url, '/chat/completions' is appended.
+    """
+
+    def __init__(self, url, api_key=None, model=DEFAULT_MODEL, max_tokens=30,
+                 temperature=0.7, timeout=10.0):
+        super().__init__()
+        self.url = url.rstrip('/') + '/chat/completions'
+        self.api_key = api_key
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.timeout = timeout
+
+    def deltas(self, messages):
+        body = json.dumps({'model': self.model, 'messages': messages, 'stream': True,
+                           'max_tokens': self.max_tokens,
+                           'temperature': self.temperature}).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, method='POST')
+        request.add_header('Content-Type', 'application/json')
+        if self.api_key:
+            request.add_header('Authorization', 'Bearer ' + self.api_key)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            for line in response:
+                line = line.strip()
+                if not line.startswith(b'data:'):
+                    continue
+                data = line[5:].strip()
+                if data == b'[DONE]':
+                    break
+                choices = json.loads(data).get('choices')
+                if choices:
+                    yield choices[0].get('delta', {}).get('content')
+
+
+class MockChatClient(ChatClient):
+    """
+    Yields canned replies word by word, without any network.
+
+    Attributes
+    ----------
+    replies : list of str
+        replies returned in turn.
+    first_delay, delay : float
+        seconds before the first token and between tokens.
+    """
+
+    def __init__(self, replies=None, first_delay=0.3, delay=0.03):
+        super().__init__()
+        self.replies = replies or ["Sure. This is a mock reply, streamed one word at a time!"]
+        self.first_delay = first_delay
+        self.delay = delay
+        self.turn = 0
+
+    def next_reply(self):
+        reply = self.replies[self.turn % len(self.replies)]
+        self.turn += 1
+        return reply
+
+    def deltas(self, messages):
+        reply = self.next_reply()
+        time.sleep(self.first_delay)
+        for i, token in enumerate(tokenize(reply)):
+            if i:
+                time.sleep(self.delay)
+            yield token
+
+
+def tokenize(text):
+    """returns 'text' split into word sized tokens which join back to 'text'."""
+    return re.findall(r'\S+\s*|\s+', text)
+
+
+def sentence_chunks(deltas, min_chars=12, max_chars=120):
+    """
+    yields speakable chunks of a stream of text deltas as soon as they are complete.
+
+    Parameters
+    ----------
+    deltas : iterable of str
+    min_chars : int
+        shorter sentences are merged with the next one, avoids choppy speech.
+    max_chars : int
+        longer text without a sentence end is split at a clause or word boundary.
+    """
+    buffer = ''
+    for delta in deltas:
+        buffer += delta
+        while True:
+            cut = 0
+            for match in SENTENCE_END.finditer(buffer):
+                if match.end() >= min_chars:
+                    cut = match.end()
+                    break
+            if not cut and len(buffer) > max_chars:
+                head = buffer[:max_chars]
+                clauses = list(CLAUSE_END.finditer(head))
+                cut = clauses[-1].end() if clauses else head.rfind(' ') + 1
+                if cut <= 0:
+                    cut = max_chars
+            if not cut:
+                break
+            chunk, buffer = buffer[:cut].strip(), buffer[cut:]
+            if chunk:
+                yield chunk
+    buffer = buffer.strip()
+    if buffer:
+        yield buffer
+
+
+def default_client(max_tokens=30):
+    """
+    returns the configured client: AURA_LLM_URL selects an HTTP endpoint, else OpenAI.
+    'max_tokens' caps every reply.
+    """
+    url = os.environ.get('AURA_LLM_URL')
+    if url:
+        return HTTPChatClient(url, api_key=os.environ.get('OPENAI_API_KEY'), max_tokens=max_tokens)
+    return OpenAIChatClient(max_tokens=max_tokens)
+
+
+class MockServer:
+    """
+    OpenAI compatible streaming endpoint serving canned replies, for tests.
+
+    Attributes
+    ----------
+    url : str
+        base url to give to a client, valid after 'start'.
+    replies, first_delay, delay :
+        see 'MockChatClient'.
+    fail_every : int
+        answer every n-th request with HTTP 500, 0 to never fail.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, replies=None, first_delay=0.3,
+                 delay=0.03, fail_every=0):
+        self.mock = MockChatClient(replies, first_delay, delay)
+        self.fail_every = fail_every
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self.handler())
+        self.server.daemon_threads = True
+        self.url = 'http://{}:{}/v1'.format(*self.server.server_address[:2])
+        self.thread = None
+
+    def handler(self):
+        mock_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                with mock_server.lock:
+                    mock_server.requests += 1
+                    n = mock_server.requests
+                    reply = mock_server.mock.next_reply()
+                if mock_server.fail_every and n % mock_server.fail_every == 0:
+                    self.send_error(500, 'mock failure')
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                model = request.get('model', DEFAULT_MODEL)
+                time.sleep(mock_server.mock.first_delay)
+                for i, token in enumerate(tokenize(reply)):
+                    if i:
+                        time.sleep(mock_server.mock.delay)
+                    self.event({'id': 'mock-{}'.format(n), 'object': 'chat.completion.chunk',
+                                'model': model,
+                                'choices': [{'index': 0, 'delta': {'content': token},
+                                             'finish_reason': None}]})
+                self.event({'id': 'mock-{}'.format(n), 'object': 'chat.completion.chunk',
+                            'model': model,
+                            'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})
+                self.chunk(b'data: [DONE]\n\n')
+                self.chunk(b'')
+
+            def event(self, payload):
+                self.chunk(b'data: ' + json.dumps(payload).encode('utf-8') + b'\n\n')
+
+            def chunk(self, data):
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                self.wfile.flush()
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming chat client / mock server.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help='run the mock server')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--first-delay', type=float, default=0.3)
+    serve.add_argument('--delay', type=float, default=0.03)
+    chat = sub.add_parser('chat', help='stream one reply, print chunks with timings')
+    chat.add_argument('--url', default=os.environ.get('AURA_LLM_URL'))
+    chat.add_argument('text')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = MockServer(port=args.port, first_delay=args.first_delay, delay=args.delay)
+        print("[llm_client] mock server on {}".format(server.url))
+        server.server.serve_forever()
+    else:
+        client = HTTPChatClient(args.url) if args.url else OpenAIChatClient()
+        start = time.perf_counter()
+        for chunk in sentence_chunks(client.stream([{'role': 'user', 'content': args.text}])):
+            print("{:7.1f}ms  {}".format((time.perf_counter() - start) * 1000.0, chunk))
+
+
+if __name__ == '__main__':
+    main()
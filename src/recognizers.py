@@ -0,0 +1,597 @@
+# recognizers.py
+
+# Speech recognition backends for Aura, behind one deadline bound call.
+# Every backend has 'transcribe(utterance, timeout)', which returns the
+# transcript ('' when the speech was not understood) or raises
+# 'RecognitionError':
+#   GoogleRecognizer  the free Google Web Speech API via speech_recognition
+#   VoskRecognizer    offline, on the CPU, with a Vosk model directory
+#   HTTPRecognizer    any endpoint taking a WAV body and answering
+#                     {"text": ...}, e.g. a local model server or 'MockServer'
+#   MockRecognizer    canned transcript with configurable latency and failures
+# 'HedgedRecognizer' tries the backends in order of preference under one
+# deadline per request. When the first backend has not answered within its
+# recent p95 latency, the next one is started as well ("hedged request")
+# and the first transcript wins; a failed backend is replaced right away.
+# A 'CircuitBreaker' per backend skips it for a while after repeated
+# failures or deadline misses, so a dead service costs one timeout, not
+# one per utterance. Calls which can't be cancelled (a CPU engine) run to
+# the end on the worker pool, their results are dropped.
+#
+# Usage: python recognizers.py serve [--port P] [--delay S] [--slow P]
+#        python recognizers.py run FILE.wav [--backends google,http,vosk] [--deadline S]
+
+import abc
+import argparse
+import io
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_DEADLINE = 4.0
+
+
+class RecognitionError(Exception):
+    """the backend failed to answer: no connection, server error, no model."""
+
+
+class RecognitionTimeout(RecognitionError):
+    """no backend answered within the deadline."""
+
+
+def wav_bytes(pcm, sample_rate):
+    """returns 16 bit mono 'pcm' as the bytes of a WAV file."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class Recognizer(abc.ABC):
+    """
+    Base class of recognition backends.
+
+    Attributes
+    ----------
+    name : str
+        label in stats and metrics.
+    """
+
+    name = 'recognizer'
+
+    @abc.abstractmethod
+    def transcribe(self, utterance, timeout):
+        """
+        returns the transcript of 'utterance' ('pcm', 'sample_rate'), '' if
+        nothing was understood; raises RecognitionError.
+        """
+
+
+class GoogleRecognizer(Recognizer):
+    """Google Web Speech API through speech_recognition, the old default."""
+
+    name = 'google'
+
+    def __init__(self, sr=None, language='en-US'):
+        if sr is None:
+            import speech_recognition as sr
+        self.sr = sr
+        self.language = language
+
+    def transcribe(self, utterance, timeout):
+        sr = self.sr
+        # one recognizer per call, 'operation_timeout' is per instance
+        r = sr.Recognizer()
+        r.operation_timeout = timeout
+        audio = sr.AudioData(utterance.pcm, utterance.sample_rate, 2)
+        try:
+            return r.recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            return ''
+        except sr.RequestError as e:
+            raise RecognitionError(str(e))
+
+
+class VoskRecognizer(Recognizer):
+    """
+    Offline recognition with Vosk (pip install vosk, models from
+    https://alphacephei.com/vosk/models). CPU bound, a call can't be
+    interrupted at the deadline.
+    """
+
+    name = 'vosk'
+
+    def __init__(self, model_path):
+        import vosk
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def transcribe(self, utterance, timeout):
+        try:
+            rec = self.vosk.KaldiRecognizer(self.model, utterance.sample_rate)
+            rec.AcceptWaveform(utterance.pcm)
+            return json.loads(rec.FinalResult()).get('text', '')
+        except Exception as e:
+            raise RecognitionError('vosk: {}'.format(e))
+
+
+class HTTPRecognizer(Recognizer):
+    """
+    Posts the utterance as a WAV file, expects {"text": ...} back.
+
+    Attributes
+    ----------
+    url : str
+        full url of the recognition endpoint.
+    """
+
+    name = 'http'
+
+    def __init__(self, url):
+        self.url = url
+
+    def transcribe(self, utterance, timeout):
+        request = urllib.request.Request(self.url, data=wav_bytes(utterance.pcm, utterance.sample_rate),
+                                         method='POST')
+        request.add_header('Content-Type', 'audio/wav')
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read()).get('text', '')
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise RecognitionError('{}: {}'.format(self.url, e))
+
+
+class MockRecognizer(Recognizer):
+    """
+    Canned transcript after a random delay, for tests and benchmarks.
+
+    Attributes
+    ----------
+    text : str
+    delay : float
+        typical latency, s; each call adds exponential 'jitter' on top.
+    slow : float
+        share of calls taking 'slow_delay' instead, the tail.
+    fail_every : int
+        every n-th call fails, 0 to never fail.
+    """
+
+    def __init__(self, text='aura what is the time', delay=0.3, jitter=0.05, slow=0.0,
+                 slow_delay=3.0, fail_every=0, name='mock', seed=None):
+        self.text = text
+        self.delay = delay
+        self.jitter = jitter
+        self.slow = slow
+        self.slow_delay = slow_delay
+        self.fail_every = fail_every
+        self.name = name
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def sample(self):
+        """returns (delay, fail) of the next call."""
+        with self.lock:
+            self.calls += 1
+            fail = bool(self.fail_every) and self.calls % self.fail_every == 0
+            if self.random.random() < self.slow:
+                return self.slow_delay, fail
+            return self.delay + self.random.expovariate(1.0 / self.jitter) if self.jitter else self.delay, fail
+
+    def transcribe(self, utterance, timeout):
+        delay, fail = self.sample()
+        if delay > timeout:
+            time.sleep(timeout)
+            raise RecognitionTimeout('{}: timed out'.format(self.name))
+        time.sleep(delay)
+        if fail:
+            raise RecognitionError('{}: mock failure'.format(self.name))
+        return self.text
+
+
+class CircuitBreaker:
+    """
+    Closed: calls pass. After 'failures' failures in a row it opens and
+    rejects calls for 'cooldown' seconds, then lets one trial call through
+    (half-open) which closes it again on success.
+    """
+
+    def __init__(self, failures=3, cooldown=30.0):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self.failed = 0
+        self.opened = 0.0
+        self.trial = False
+        self.opens = 0
+
+    def allow(self, now):
+        if self.state == 'open' and now - self.opened >= self.cooldown:
+            self.state = 'half-open'
+            self.trial = False
+        if self.state == 'half-open':
+            if self.trial:
+                return False
+            self.trial = True
+            return True
+        return self.state == 'closed'
+
+    def success(self):
+        self.state = 'closed'
+        self.failed = 0
+
+    def failure(self, now):
+        self.failed += 1
+        if self.state == 'half-open' or self.failed >= self.failures:
+            if self.state != 'open':
+                self.opens += 1
+            self.state = 'open'
+            self.opened = now
+            self.failed = 0
+
+
+class Lane:
+    """One backend of a 'HedgedRecognizer' with its breaker and recent latencies."""
+
+    def __init__(self, backend, breaker, window):
+        self.backend = backend
+        self.breaker = breaker
+        self.latencies = deque(maxlen=window)
+        self.inflight = 0
+        self.stats = {'calls': 0, 'wins': 0, 'errors': 0, 'late': 0, 'rejected': 0}
+
+    def quantile(self, q):
+        """returns the 'q' quantile of the recent latencies, s, None if there are none."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Result:
+    """
+    Attributes
+    ----------
+    text : str
+    backend : str
+        name of the backend which answered.
+    ms : float
+        request latency.
+    hedged : bool
+        a second backend was started for this request.
+    """
+
+    __slots__ = ('text', 'backend', 'ms', 'hedged')
+
+    def __init__(self, text, backend, ms, hedged):
+        self.text = text
+        self.backend = backend
+        self.ms = ms
+        self.hedged = hedged
+
+
+class HedgedRecognizer:
+    """
+    Recognition with a deadline, hedging and circuit breaking over backends
+    in order of preference.
+
+    Attributes
+    ----------
+    lanes : list of Lane
+    deadline : float
+        default time limit of a request, s.
+    hedge_quantile : float
+        a request is hedged when the backend is slower than this quantile
+        of its recent latencies.
+    initial_hedge : float
+        hedge delay, s, until a backend has 'min_samples' latencies.
+    on_latency : callable
+        called with (backend name, ms, ok) after every backend call, e.g.
+        to record per backend histograms.
+    stats : dict
+        'requests', 'hedged', 'hedge_wins' (the hedge answered first),
+        'failovers', 'timeouts', 'errors'.
+    """
+
+    def __init__(self, backends, deadline=DEFAULT_DEADLINE, hedge_quantile=0.95, initial_hedge=1.0,
+                 min_hedge=0.05, min_samples=20, window=200, failures=3, cooldown=30.0,
+                 max_inflight=2, on_latency=None):
+        if not backends:
+            raise ValueError('no recognition backend')
+        self.lanes = [Lane(b, CircuitBreaker(failures, cooldown), window) for b in backends]
+        self.deadline = deadline
+        self.hedge_quantile = hedge_quantile
+        self.initial_hedge = initial_hedge
+        self.min_hedge = min_hedge
+        self.min_samples = min_samples
+        self.max_inflight = max_inflight
+        self.on_latency = on_latency
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=len(self.lanes) * max_inflight,
+                                           thread_name_prefix='aura-asr')
+        self.stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'failovers': 0,
+                      'timeouts': 0, 'errors': 0}
+
+    def hedge_delay(self, lane):
+        """returns how long to wait for 'lane' before starting the next backend, s."""
+        with self.lock:
+            if len(lane.latencies) < self.min_samples:
+                return self.initial_hedge
+            return max(self.min_hedge, lane.quantile(self.hedge_quantile))
+
+    def launch(self, utterance, started, end, answers):
+        """starts the first available backend not in 'started', returns its lane or None."""
+        now = time.perf_counter()
+        with self.lock:
+            for lane in self.lanes:
+                if lane in started:
+                    continue
+                if lane.inflight >= self.max_inflight or not lane.breaker.allow(now):
+                    lane.stats['rejected'] += 1
+                    continue
+                lane.inflight += 1
+                lane.stats['calls'] += 1
+                break
+            else:
+                return None
+        started.append(lane)
+        self.executor.submit(self.call, lane, utterance, end, answers)
+        return lane
+
+    def call(self, lane, utterance, end, answers):
+        """runs one backend call on the pool, posts (lane, text, error, seconds) to 'answers'."""
+        start = time.perf_counter()
+        text = error = None
+        try:
+            text = lane.backend.transcribe(utterance, max(0.01, end - start))
+        except RecognitionError as e:
+            error = e
+        except Exception as e:
+            error = RecognitionError('{}: {!r}'.format(lane.backend.name, e))
+        now = time.perf_counter()
+        elapsed = now - start
+        late = error is None and now > end
+        with self.lock:
+            lane.inflight -= 1
+            if error is None and not late:
+                lane.breaker.success()
+            else:
+                lane.breaker.failure(now)
+                lane.stats['late' if late else 'errors'] += 1
+            if error is None or now >= end:
+                # fast failures (connection refused) say nothing about the latency
+                lane.latencies.append(elapsed)
+        if self.on_latency is not None:
+            self.on_latency(lane.backend.name, elapsed * 1000.0, error is None and not late)
+        answers.put((lane, text, error, elapsed))
+
+    def recognize(self, utterance, deadline=None):
+        """
+        returns the 'Result' of the first backend to answer, raises
+        RecognitionTimeout after 'deadline' s, RecognitionError when every
+        available backend failed.
+        """
+        start = time.perf_counter()
+        end = start + (self.deadline if deadline is None else deadline)
+        stats = self.stats
+        answers = queue.Queue()
+        started = []
+        with self.lock:
+            stats['requests'] += 1
+        primary = self.launch(utterance, started, end, answers)
+        if primary is None:
+            with self.lock:
+                stats['errors'] += 1
+            raise RecognitionError('no recognition backend available')
+        # by half the deadline at the latest, the hedge needs time to answer
+        hedge_at = start + min(self.hedge_delay(primary), (end - start) / 2.0)
+        hedged = False
+        pending = 1
+        error = None
+        while True:
+            now = time.perf_counter()
+            wait_until = end if hedged else min(end, hedge_at)
+            try:
+                lane, text, error, _ = answers.get(timeout=max(0.0, wait_until - now))
+            except queue.Empty:
+                if time.perf_counter() >= end:
+                    with self.lock:
+                        stats['timeouts'] += 1
+                    raise RecognitionTimeout('no transcript within {:.1f}s'.format(end - start))
+                hedged = True
+                if self.launch(utterance, started, end, answers) is not None:
+                    pending += 1
+                    with self.lock:
+                        stats['hedged'] += 1
+                continue
+            pending -= 1
+            if error is None:
+                with self.lock:
+                    lane.stats['wins'] += 1
+                    if lane is not primary and hedged:
+                        stats['hedge_wins'] += 1
+                return Result(text, lane.backend.name, (time.perf_counter() - start) * 1000.0, hedged)
+            if time.perf_counter() >= end:
+                with self.lock:
+                    stats['timeouts'] += 1
+                raise RecognitionTimeout('no transcript within {:.1f}s'.format(end - start))
+            if self.launch(utterance, started, end, answers) is not None:
+                pending += 1
+                with self.lock:
+                    stats['failovers'] += 1
+            elif not pending:
+                with self.lock:
+                    stats['errors'] += 1
+                raise error
+
+    def report(self):
+        """returns a copy of 'stats' plus state, calls and p50 / p95 latency per backend."""
+        with self.lock:
+            report = dict(self.stats)
+            for lane in self.lanes:
+                p50, p95 = lane.quantile(0.5), lane.quantile(0.95)
+                report[lane.backend.name] = dict(
+                    lane.stats, state=lane.breaker.state, opens=lane.breaker.opens,
+                    p50_ms=round(p50 * 1000.0, 1) if p50 is not None else None,
+                    p95_ms=round(p95 * 1000.0, 1) if p95 is not None else None)
+            return report
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+def default_recognizer(sr=None, on_latency=None):
+    """
+    returns a 'HedgedRecognizer' over the configured backends: AURA_ASR lists
+    them in order ('google', 'http', 'vosk'), by default Google, then
+    AURA_ASR_URL and the Vosk model in AURA_VOSK_MODEL where set.
+    AURA_ASR_DEADLINE is the time limit per utterance, s.
+
+    With neither AURA_ASR_URL nor AURA_VOSK_MODEL set there is only Google,
+    so nothing to hedge or fail over to; this is logged at startup. For a
+    backup, set one or both:
+        AURA_ASR_URL=http://127.0.0.1:8766/recognize
+            a local model server answering {"text": ...} for a WAV body
+        AURA_VOSK_MODEL=/path/to/vosk-model-small-en-us-0.15
+            an unpacked Vosk model directory (pip install vosk)
+    """
+    url = os.environ.get('AURA_ASR_URL')
+    model = os.environ.get('AURA_VOSK_MODEL')
+    names = os.environ.get('AURA_ASR')
+    if names:
+        names = [n.strip() for n in names.split(',') if n.strip()]
+    else:
+        names = ['google'] + (['http'] if url else []) + (['vosk'] if model else [])
+    backends = []
+    for name in names:
+        try:
+            if name == 'google':
+                backends.append(GoogleRecognizer(sr))
+            elif name == 'http':
+                backends.append(HTTPRecognizer(url or 'http://127.0.0.1:8766/recognize'))
+            elif name == 'vosk':
+                backends.append(VoskRecognizer(model or 'model'))
+            else:
+                print("[recognizers] unknown backend:", name)
+        except Exception as e:
+            print("[recognizers] {} unavailable: {}".format(name, e))
+    if len(backends) < 2:
+        print("[recognizers] only {} configured, hedging and failover inactive "
+              "(set AURA_ASR_URL and/or AURA_VOSK_MODEL for a backup)".format(
+                  backends[0].name if backends else 'no backend'))
+    return HedgedRecognizer(backends, deadline=float(os.environ.get('AURA_ASR_DEADLINE', DEFAULT_DEADLINE)),
+                            on_latency=on_latency)
+
+
+class MockServer:
+    """
+    Recognition endpoint answering with a 'MockRecognizer', for tests.
+
+    Attributes
+    ----------
+    url : str
+        url to give to 'HTTPRecognizer', valid after 'start'.
+    mock : MockRecognizer
+        transcript, latency and failures of the answers.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, mock=None):
+        self.mock = mock or MockRecognizer()
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self.handler())
+        self.server.daemon_threads = True
+        self.url = 'http://{}:{}/recognize'.format(*self.server.server_address[:2])
+        self.thread = None
+
+    def handler(self):
+        mock_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                self.rfile.read(length)
+                with mock_server.lock:
+                    mock_server.requests += 1
+                delay, fail = mock_server.mock.sample()
+                time.sleep(delay)
+                if fail:
+                    self.send_error(500, 'mock failure')
+                    return
+                body = json.dumps({'text': mock_server.mock.text}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up at its deadline
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Speech recognition backends / mock server.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help='run the mock recognition server')
+    serve.add_argument('--port', type=int, default=8766)
+    serve.add_argument('--delay', type=float, default=0.3)
+    serve.add_argument('--slow', type=float, default=0.0, help='share of slow (3s) answers')
+    serve.add_argument('--text', default='aura what is the time')
+    run = sub.add_parser('run', help='recognize a WAV file, print the transcript and timings')
+    run.add_argument('wav')
+    run.add_argument('--backends', help='overrides AURA_ASR')
+    run.add_argument('--deadline', type=float)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = MockServer(port=args.port, mock=MockRecognizer(args.text, args.delay, slow=args.slow))
+        print("[recognizers] mock server on {}".format(server.url))
+        server.server.serve_forever()
+    else:
+        from audio_capture import Utterance
+        with wave.open(args.wav, 'rb') as f:
+            utterance = Utterance(f.readframes(f.getnframes()), f.getframerate(), 0.0, 0.0, 0.0)
+        if args.backends:
+            os.environ['AURA_ASR'] = args.backends
+        recognizer = default_recognizer()
+        try:
+            result = recognizer.recognize(utterance, args.deadline)
+            print("{:7.1f}ms  {}{}  {!r}".format(result.ms, result.backend,
+                                                 ' (hedged)' if result.hedged else '', result.text))
+        except RecognitionError as e:
+            print("failed:", e)
+        print(recognizer.report())
+        recognizer.close()
+
+
+if __name__ == '__main__':
+    main()
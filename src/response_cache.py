@@ -0,0 +1,168 @@
+# response_cache.py
+
+# Local cache of conversational fallback replies.
+# 'ResponseCache' keys replies on the normalized query text plus a context
+# fingerprint (model, system prompt), evicts least recently used entries
+# beyond 'capacity' and expires entries after a per-entry time to live,
+# shorter for time sensitive queries. Entries are kept in memory and
+# written through to an append-only JSON lines file, replayed on start.
+# Queries that refer back to the conversation ("what about it", "say that
+# again") are never cached, their answer depends on context.
+
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+FILLER = {'please', 'aura', 'hey', 'ok', 'okay', 'so', 'um', 'uh', 'can', 'you', 'could', 'would'}
+# words which make the answer depend on the earlier conversation
+CONTEXT_WORDS = {'it', 'its', 'that', 'this', 'these', 'those', 'he', 'she', 'him', 'her',
+                 'they', 'them', 'their', 'there', 'again', 'more', 'else', 'another',
+                 'previous', 'last', 'above', 'same'}
+# words which make the answer go stale quickly
+VOLATILE_WORDS = {'today', 'now', 'tonight', 'tomorrow', 'weather', 'news', 'latest',
+                  'current', 'currently', 'score', 'price'}
+WORD = re.compile(r"[a-z0-9']+")
+
+
+def normalize(query):
+    """returns the words of 'query' that matter, lowercase, without punctuation / filler."""
+    words = WORD.findall(query.lower().replace("what's", "what is"))
+    return " ".join(w for w in words if w not in FILLER)
+
+
+def fingerprint(*context):
+    """returns a short hash of the context a reply depends on."""
+    return hashlib.blake2b("\x00".join(context).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU / TTL cache of replies with write-through persistence.
+
+    Attributes
+    ----------
+    path : str or None
+        JSON lines store, None for a memory only cache.
+    capacity : int
+        max. no. of entries.
+    ttl, volatile_ttl : float
+        seconds an entry lives, 'volatile_ttl' for queries with 'VOLATILE_WORDS'.
+    entries : OrderedDict
+        key -> (expires, reply), least recently used first.
+    stats : dict
+        'hits', 'misses', 'bypassed', 'evictions', 'expired' and mean 'hit_us'.
+    """
+
+    def __init__(self, path=None, capacity=512, ttl=7 * 24 * 3600.0, volatile_ttl=600.0):
+        self.path = path
+        self.capacity = capacity
+        self.ttl = ttl
+        self.volatile_ttl = volatile_ttl
+        self.entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'bypassed': 0, 'evictions': 0, 'expired': 0, 'hit_us': 0.0}
+        self.log = None
+        self.log_records = 0
+        if path is not None:
+            self.load()
+
+    def load(self):
+        """replays the store, drops expired entries and opens it for appending."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        now = time.time()
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        key, expires, reply = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.entries.pop(key, None)
+                    if reply is not None and expires > now:
+                        self.entries[key] = (expires, reply)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+        self.compact()
+
+    def compact(self):
+        """rewrites the store with the live entries only."""
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for key, (expires, reply) in self.entries.items():
+                f.write(json.dumps([key, expires, reply]) + "\n")
+        if self.log is not None:
+            self.log.close()
+        os.replace(tmp, self.path)
+        self.log = open(self.path, 'a', encoding='utf-8')
+        self.log_records = len(self.entries)
+
+    def append_log(self, key, expires, reply):
+        if self.log is None:
+            return
+        self.log.write(json.dumps([key, expires, reply]) + "\n")
+        self.log.flush()
+        self.log_records += 1
+        if self.log_records > 4 * self.capacity:
+            self.compact()
+
+    def key(self, query, context=''):
+        """returns the cache key of 'query', None if it must bypass the cache."""
+        text = normalize(query)
+        if not text or CONTEXT_WORDS.intersection(text.split()):
+            return None
+        return fingerprint(context) + ':' + text
+
+    def get(self, query, context=''):
+        """returns the cached reply to 'query', None on a miss or bypass."""
+        start = time.perf_counter()
+        key = self.key(query, context)
+        if key is None:
+            self.stats['bypassed'] += 1
+            return None
+        entry = self.entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        expires, reply = entry
+        if expires <= time.time():
+            del self.entries[key]
+            self.append_log(key, 0.0, None)
+            self.stats['expired'] += 1
+            self.stats['misses'] += 1
+            return None
+        self.entries.move_to_end(key)
+        stats = self.stats
+        stats['hits'] += 1
+        elapsed = (time.perf_counter() - start) * 1e6
+        stats['hit_us'] += (elapsed - stats['hit_us']) / stats['hits']
+        return reply
+
+    def put(self, query, reply, context=''):
+        """stores 'reply' to 'query' unless the query bypasses the cache."""
+        key = self.key(query, context)
+        if key is None:
+            return
+        volatile = VOLATILE_WORDS.intersection(key.split(':', 1)[1].split())
+        expires = time.time() + (self.volatile_ttl if volatile else self.ttl)
+        self.entries[key] = (expires, reply)
+        self.entries.move_to_end(key)
+        self.append_log(key, expires, reply)
+        while len(self.entries) > self.capacity:
+            old, _ = self.entries.popitem(last=False)
+            self.append_log(old, 0.0, None)
+            self.stats['evictions'] += 1
+
+    def report(self):
+        """returns a copy of 'stats' plus the no. of entries and the hit rate."""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return dict(self.stats, entries=len(self.entries),
+                    hit_rate=self.stats['hits'] / lookups if lookups else 0.0)
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
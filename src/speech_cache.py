@@ -0,0 +1,227 @@
+# speech_cache.py
+
+# Pre-synthesized audio for Aura's fixed phrases.
+# 'SpeechCache' keeps WAV clips rendered by the TTS engine ('save_to_file')
+# in a directory, named by a hash of (text, voice id, rate, volume), so a
+# change of voice never plays stale audio. The store is bounded in bytes
+# and evicts the least recently played clips; recency is the file mtime,
+# bumped on every hit, so the order survives restarts without an index.
+# 'speech_output.SpeechWorker' plays cached clips with a 'ClipPlayer'
+# instead of synthesizing them again, and renders phrases registered with
+# 'warm' while it is idle.
+#
+# Usage: python speech_cache.py [DIR]   (lists the clips in the store)
+
+import argparse
+import glob
+import hashlib
+import os
+import sys
+import threading
+import time
+import wave
+from collections import OrderedDict
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.aura', 'tts')
+
+
+def wav_seconds(path):
+    """returns the duration of a WAV file, raises wave.Error / OSError if it is none."""
+    with wave.open(path, 'rb') as f:
+        return f.getnframes() / float(f.getframerate())
+
+
+class SpeechCache:
+    """
+    Size bounded on-disk store of synthesized clips.
+
+    Attributes
+    ----------
+    directory : str
+    max_bytes : int
+        the least recently played clips are removed beyond this size.
+    clips : OrderedDict
+        key -> file size, least recently played first.
+    stats : dict
+        'hits', 'renders', mean 'render_ms', 'rejected' (engine
+        output which was no WAV file) and 'evictions'.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=32 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.clips = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'renders': 0, 'render_ms': 0.0, 'rejected': 0, 'evictions': 0}
+        os.makedirs(directory, exist_ok=True)
+        found = []
+        for path in glob.glob(os.path.join(directory, '*.wav')):
+            if path.endswith('.tmp.wav'):
+                os.remove(path)  # left over from an interrupted render
+                continue
+            st = os.stat(path)
+            found.append((st.st_mtime, os.path.basename(path)[:-4], st.st_size))
+        for _, key, size in sorted(found):
+            self.clips[key] = size
+            self.bytes += size
+        self.evict()
+
+    @staticmethod
+    def key(text, voice, rate, volume):
+        """returns the clip key of 'text' spoken with these engine settings."""
+        data = "\x00".join((text.strip(), str(voice), str(rate), str(volume)))
+        return hashlib.blake2b(data.encode('utf-8'), digest_size=12).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.wav')
+
+    def temp_path(self, key):
+        """returns the file the engine renders into before 'add'."""
+        return os.path.join(self.directory, key + '.tmp.wav')
+
+    def __contains__(self, key):
+        return key in self.clips
+
+    def get(self, key):
+        """returns the clip path of 'key' and marks it played, None if not cached."""
+        with self.lock:
+            if key not in self.clips:
+                return None
+            self.clips.move_to_end(key)
+            self.stats['hits'] += 1
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            with self.lock:
+                self.bytes -= self.clips.pop(key, 0)
+            return None
+        return path
+
+    def add(self, key, temp_path, render_ms=0.0):
+        """
+        moves a rendered clip into the store, returns its path, None if the
+        engine did not produce a usable WAV file.
+        """
+        try:
+            if wav_seconds(temp_path) <= 0:
+                raise wave.Error('empty clip')
+        except (wave.Error, EOFError, OSError):
+            self.stats['rejected'] += 1
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+        path = self.path(key)
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+        with self.lock:
+            self.bytes += size - self.clips.pop(key, 0)
+            self.clips[key] = size
+            stats = self.stats
+            stats['renders'] += 1
+            stats['render_ms'] += (render_ms - stats['render_ms']) / stats['renders']
+        self.evict()
+        return path
+
+    def evict(self):
+        with self.lock:
+            while self.bytes > self.max_bytes and len(self.clips) > 1:
+                key, size = self.clips.popitem(last=False)
+                self.bytes -= size
+                self.stats['evictions'] += 1
+                try:
+                    os.remove(self.path(key))
+                except OSError:
+                    pass
+
+    def report(self):
+        """returns a copy of 'stats' plus no. of clips and bytes stored."""
+        with self.lock:
+            return dict(self.stats, clips=len(self.clips), bytes=self.bytes)
+
+
+class ClipPlayer:
+    """
+    Non-blocking WAV playback with the engine's 'isBusy' / 'stop' interface,
+    winsound on Windows, PyAudio elsewhere.
+    """
+
+    def __init__(self):
+        self.until = 0.0
+        self.audio = None
+        self.stream = None
+        self.wav = None
+
+    def play(self, path):
+        self.stop()
+        if sys.platform == 'win32':
+            import winsound
+            self.until = time.monotonic() + wav_seconds(path)
+            winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_NODEFAULT)
+            return
+        import pyaudio
+        if self.audio is None:
+            self.audio = pyaudio.PyAudio()
+        wav = self.wav = wave.open(path, 'rb')
+
+        def callback(in_data, frame_count, time_info, status):
+            data = wav.readframes(frame_count)
+            return data, pyaudio.paContinue if data else pyaudio.paComplete
+
+        self.stream = self.audio.open(format=self.audio.get_format_from_width(wav.getsampwidth()),
+                                      channels=wav.getnchannels(), rate=wav.getframerate(),
+                                      output=True, stream_callback=callback)
+
+    def isBusy(self):
+        if self.stream is not None:
+            return self.stream.is_active()
+        return time.monotonic() < self.until
+
+    def stop(self):
+        if sys.platform == 'win32':
+            if self.until > time.monotonic():
+                import winsound
+                winsound.PlaySound(None, 0)
+            self.until = 0.0
+            return
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        if self.wav is not None:
+            self.wav.close()
+            self.wav = None
+
+
+class MockPlayer:
+    """Stand-in for 'ClipPlayer' which 'plays' for the duration of the clip."""
+
+    def __init__(self):
+        self.until = 0.0
+        self.played = []
+
+    def play(self, path):
+        self.played.append(path)
+        self.until = time.monotonic() + wav_seconds(path)
+
+    def isBusy(self):
+        return time.monotonic() < self.until
+
+    def stop(self):
+        self.until = 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the pre-synthesized speech store.')
+    parser.add_argument('directory', nargs='?', default=DEFAULT_DIRECTORY)
+    args = parser.parse_args()
+
+    cache = SpeechCache(args.directory)
+    for key, size in cache.clips.items():
+        print("{}  {:>8} bytes  {:5.2f}s".format(key, size, wav_seconds(cache.path(key))))
+    print(cache.report())
+
+
+if __name__ == '__main__':
+    main()
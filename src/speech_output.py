@@ -0,0 +1,342 @@
+# speech_output.py
+
+# Non-blocking speech output for Aura.
+# 'SpeechWorker' owns the text-to-speech engine on a dedicated thread and
+# speaks utterances from a priority queue, so 'reply' returns at once and
+# the main loop keeps listening and draining typed input while Aura talks.
+# Short utterances queued behind each other are merged into one engine
+# call, and 'interrupt' (barge-in) stops playback and drops what is queued.
+# The engine is driven with 'startLoop(False)' / 'iterate()', which lets
+# the worker check for interruptions between engine steps. With a
+# 'speech_cache.SpeechCache', phrases rendered before are played from disk
+# instead of being synthesized again, see 'warm'.
+
+import itertools
+import queue
+import re
+import threading
+import time
+from collections import deque
+
+from speech_cache import ClipPlayer
+
+URGENT = 0
+NORMAL = 1
+LOW = 2
+
+WORD = re.compile(r"[a-z0-9']+")
+
+
+def pyttsx3_engine(voice_index=1, rate=190, volume=0.7):
+    """returns a configured pyttsx3 engine, must be called on the thread using it."""
+    import pyttsx3
+    engine = pyttsx3.init()
+    voices = engine.getProperty('voices')
+    if len(voices) > voice_index:
+        engine.setProperty('voice', voices[voice_index].id)
+    engine.setProperty('rate', rate)
+    engine.setProperty('volume', volume)
+    return engine
+
+
+class MockEngine:
+    """
+    Stand-in for a pyttsx3 engine which 'speaks' for a time proportional to
+    the text length, for tests and headless runs.
+    """
+
+    def __init__(self, chars_per_second=15.0, synthesis_s=0.0):
+        self.chars_per_second = chars_per_second
+        self.synthesis_s = synthesis_s  # blocking delay before audio starts
+        self.until = 0.0
+        self.spoken = []
+        self.properties = {'voice': 'mock', 'rate': 200, 'volume': 1.0}
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def startLoop(self, use_driver_loop=True):
+        pass
+
+    def endLoop(self):
+        pass
+
+    def say(self, text):
+        time.sleep(self.synthesis_s)
+        self.spoken.append(text)
+        self.until = time.monotonic() + len(text) / self.chars_per_second
+
+    def save_to_file(self, text, path):
+        """writes silence as long as 'text' would be spoken."""
+        import wave
+        time.sleep(self.synthesis_s)
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(16000)
+            f.writeframes(b'\x00\x00' * int(16000 * len(text) / self.chars_per_second))
+
+    def isBusy(self):
+        return time.monotonic() < self.until
+
+    def iterate(self):
+        pass
+
+    def stop(self):
+        self.until = 0.0
+
+
+class SpeechWorker:
+    """
+    Speaks queued utterances on a background thread.
+
+    Attributes
+    ----------
+    engine_factory : callable
+        returns the engine, called once on the worker thread.
+    merge_chars : int
+        queued utterances of the same priority are merged up to this length.
+    echo_window : float
+        seconds spoken text is remembered for 'is_echo'.
+    cache : speech_cache.SpeechCache or None
+        store of pre-synthesized clips.
+    player_factory : callable
+        returns the clip player, called on the worker thread on first use.
+    speaking : bool
+        True while the engine is playing.
+    stats : dict
+        'utterances', 'merged', 'interrupted', mean 'queue_ms' (time from
+        'say' to dequeueing), mean 'start_ms' (time from 'say' until
+        playback has started), 'cached' (utterances played from the cache),
+        'loop_ticks' and 'loop_max_gap_ms' (main loop responsiveness while
+        speaking, see 'tick').
+    """
+
+    def __init__(self, engine_factory=pyttsx3_engine, merge_chars=200, echo_window=10.0,
+                 cache=None, player_factory=ClipPlayer):
+        self.engine_factory = engine_factory
+        self.merge_chars = merge_chars
+        self.echo_window = echo_window
+        self.cache = cache
+        self.player_factory = player_factory
+        self.voice = None  # (voice id, rate, volume) of the engine, the cache key
+        self.renders = deque()  # phrases to synthesize into the cache when idle
+        self.queue = queue.PriorityQueue()
+        self.order = itertools.count()
+        self.generation = 0  # bumped by 'interrupt', older utterances are dropped
+        self.speaking = False
+        self.pending = 0  # utterances queued or being spoken
+        self.done = threading.Condition()
+        self.recent = deque()  # (time, words) of spoken utterances
+        self.last_tick = None
+        self.running = True
+        self.stats = {'utterances': 0, 'merged': 0, 'interrupted': 0, 'queue_ms': 0.0,
+                      'start_ms': 0.0, 'cached': 0, 'loop_ticks': 0, 'loop_max_gap_ms': 0.0}
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def say(self, text, priority=NORMAL, on_start=None):
+        """
+        queues 'text' to be spoken and returns immediately. 'on_start' is
+        called on the worker thread with the 'time.perf_counter' playback
+        started, or None if the utterance was dropped by 'interrupt'.
+        """
+        with self.done:
+            self.pending += 1
+        self.queue.put((priority, next(self.order), self.generation, time.perf_counter(), text, on_start))
+
+    def warm(self, phrases):
+        """renders 'phrases' into the cache while the worker is idle."""
+        if self.cache is not None:
+            self.renders.extend(phrases)
+
+    def cached(self, text):
+        """returns the cache key of 'text' if a clip of it is stored, else None."""
+        if self.voice is None or self.cache is None:
+            return None
+        key = self.cache.key(text, *self.voice)
+        return key if key in self.cache else None
+
+    def interrupt(self):
+        """barge-in: stops current playback and drops queued utterances."""
+        self.generation += 1
+        if self.speaking or not self.queue.empty():
+            self.stats['interrupted'] += 1
+
+    def wait(self, timeout=None):
+        """blocks until everything queued has been spoken, returns False on timeout."""
+        with self.done:
+            return self.done.wait_for(lambda: self.pending == 0, timeout)
+
+    def finish(self, count):
+        with self.done:
+            self.pending -= count
+            if self.pending <= 0:
+                self.done.notify_all()
+
+    def tick(self):
+        """
+        called once per main loop iteration, records the longest gap between
+        iterations while speaking.
+        """
+        now = time.perf_counter()
+        if self.speaking and self.last_tick is not None:
+            gap = (now - self.last_tick) * 1000.0
+            self.stats['loop_ticks'] += 1
+            self.stats['loop_max_gap_ms'] = max(self.stats['loop_max_gap_ms'], gap)
+        self.last_tick = now
+
+    def is_echo(self, text, overlap=0.7):
+        """returns True if 'text' is mostly words Aura just said, e.g. picked up by the mic."""
+        words = set(WORD.findall(text.lower()))
+        words.discard('aura')
+        if not words:
+            return False
+        cutoff = time.monotonic() - self.echo_window
+        spoken = set()
+        for when, said in list(self.recent):
+            if when >= cutoff:
+                spoken |= said
+        return len(words & spoken) >= overlap * len(words)
+
+    def drop(self, item):
+        """drops a queued item of an older generation, see 'interrupt'."""
+        self.finish(1)
+        if item[5] is not None:
+            item[5](None)
+
+    def next_utterance(self):
+        """
+        returns (queued_at, text, count, clip key, on_start callbacks) merged
+        from 'count' queued items, None if idle. Cached phrases are not
+        merged, their clip plays.
+        """
+        try:
+            item = self.queue.get(timeout=0.1)
+        except queue.Empty:
+            return None
+        priority, _, generation, queued, text, on_start = item
+        if generation != self.generation:
+            self.drop(item)
+            return None
+        callbacks = [on_start] if on_start is not None else []
+        key = self.cached(text)
+        if key is not None:
+            return queued, text, 1, key, callbacks
+        count = 1
+        # merge short replies queued behind this one
+        while len(text) < self.merge_chars:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[2] != self.generation:
+                self.drop(item)
+                continue
+            if (item[0] != priority or len(text) + len(item[4]) > self.merge_chars
+                    or self.cached(item[4]) is not None):
+                self.queue.put(item)
+                break
+            text += " " + item[4]
+            if item[5] is not None:
+                callbacks.append(item[5])
+            count += 1
+            self.stats['merged'] += 1
+        return queued, text, count, None, callbacks
+
+    def render(self, engine, text):
+        """synthesizes 'text' into the cache, unless a clip of it is stored."""
+        key = self.cache.key(text, *self.voice)
+        if key in self.cache:
+            return
+        path = self.cache.temp_path(key)
+        start = time.perf_counter()
+        engine.save_to_file(text, path)
+        engine.iterate()
+        while engine.isBusy() and self.running:
+            engine.iterate()
+            time.sleep(0.01)
+        if self.cache.add(key, path, (time.perf_counter() - start) * 1000.0) is None:
+            # e.g. the macOS driver writes AIFF files
+            print("[Speech] engine output can't be cached, speech cache disabled")
+            self.renders.clear()
+            self.cache = None
+
+    def play(self, key, player):
+        """starts the clip of 'key', returns the player, None if it can't be played."""
+        path = self.cache.get(key)
+        if path is None:
+            return None
+        try:
+            player.play(path)
+        except Exception as e:
+            print("[Speech] clip playback failed, speech cache disabled:", e)
+            self.renders.clear()
+            self.cache = None
+            return None
+        self.stats['cached'] += 1
+        return player
+
+    def run(self):
+        engine = self.engine_factory()
+        engine.startLoop(False)
+        if self.cache is not None:
+            self.voice = tuple(engine.getProperty(name) for name in ('voice', 'rate', 'volume'))
+        player = None
+        try:
+            while self.running:
+                utterance = self.next_utterance()
+                if utterance is None:
+                    if self.renders and self.cache is not None:
+                        self.render(engine, self.renders.popleft())
+                    continue
+                queued, text, count, key, callbacks = utterance
+                generation = self.generation
+                stats = self.stats
+                stats['utterances'] += 1
+                stats['queue_ms'] += ((time.perf_counter() - queued) * 1000.0 - stats['queue_ms']) / stats['utterances']
+                self.recent.append((time.monotonic(), set(WORD.findall(text.lower()))))
+                while self.recent and self.recent[0][0] < time.monotonic() - self.echo_window:
+                    self.recent.popleft()
+
+                self.speaking = True
+                device = None
+                if key is not None:
+                    player = player or self.player_factory()
+                    device = self.play(key, player)
+                if device is None:
+                    device = engine
+                    engine.say(text)
+                    engine.iterate()
+                started = time.perf_counter()
+                stats['start_ms'] += ((started - queued) * 1000.0 - stats['start_ms']) / stats['utterances']
+                for on_start in callbacks:
+                    on_start(started)
+                while device.isBusy():
+                    if generation != self.generation or not self.running:
+                        device.stop()
+                        break
+                    if device is engine:
+                        engine.iterate()
+                    time.sleep(0.01)
+                self.speaking = False
+                self.finish(count)
+        finally:
+            self.speaking = False
+            if player is not None:
+                player.stop()
+            engine.endLoop()
+            with self.done:
+                self.pending = 0
+                self.done.notify_all()
+
+    def report(self):
+        """returns a copy of 'stats' plus the no. of queued utterances."""
+        return dict(self.stats, queued=self.queue.qsize())
+
+    def close(self, drain=True, timeout=10.0):
+        """stops the worker, after speaking what is queued if 'drain'."""
+        if drain:
+            self.wait(timeout)
+        self.running = False
+        self.thread.join(timeout)
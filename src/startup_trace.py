@@ -0,0 +1,117 @@
+# startup_trace.py
+
+# Startup profiling and lazy initialization.
+# 'trace' records how long imports and subsystem initializations take,
+# relative to the first import of this module, and on which thread they
+# ran. 'Lazy' wraps a subsystem that should only be built on first use,
+# or warmed up on a background thread so it does not delay the UI.
+# Set AURA_STARTUP_TRACE=1 to print the full trace once startup is done.
+
+import importlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ORIGIN = time.perf_counter()
+
+
+class StartupTrace:
+    """
+    Attributes
+    ----------
+    spans : list of tuple
+        (name, start ms since 'ORIGIN', duration ms, thread name).
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.lock = threading.Lock()
+        self.enabled = bool(os.environ.get('AURA_STARTUP_TRACE'))
+
+    @contextmanager
+    def span(self, name):
+        """records the time spent in the with block as 'name'."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                self.spans.append(((name, (start - ORIGIN) * 1000.0, (end - start) * 1000.0,
+                                    threading.current_thread().name)))
+
+    def call(self, name, fn, *args, **kwargs):
+        """returns fn(*args, **kwargs), recorded as 'name'."""
+        with self.span(name):
+            return fn(*args, **kwargs)
+
+    def import_module(self, name):
+        """returns the imported module, recorded as 'import <name>'."""
+        with self.span('import ' + name):
+            return importlib.import_module(name)
+
+    def mark(self, name):
+        """records an instant, e.g. 'chat window ready', returns ms since start."""
+        now = (time.perf_counter() - ORIGIN) * 1000.0
+        with self.lock:
+            self.spans.append((name, now, 0.0, threading.current_thread().name))
+        return now
+
+    def report(self):
+        """returns the spans ordered by start time."""
+        with self.lock:
+            return sorted(self.spans, key=lambda span: span[1])
+
+    def print_report(self):
+        print("[Startup] {:>9} {:>9}  {:<16} {}".format('start ms', 'took ms', 'thread', 'step'))
+        for name, start, duration, thread in self.report():
+            print("[Startup] {:>9.1f} {:>9.1f}  {:<16} {}".format(start, duration, thread[:16], name))
+
+
+trace = StartupTrace()
+
+
+class Lazy:
+    """
+    Subsystem built by 'factory' on first 'get', at most once.
+
+    Attributes
+    ----------
+    name : str
+        label in the startup trace.
+    ready : bool
+        True once built.
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.value = None
+        self.ready = False
+        self.error = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        """returns the subsystem, building it now if needed (re-raises a failed build)."""
+        if not self.ready:
+            with self.lock:
+                if not self.ready and self.error is None:
+                    try:
+                        self.value = trace.call('init ' + self.name, self.factory)
+                        self.ready = True
+                    except Exception as e:
+                        self.error = e
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def warm(self):
+        """builds the subsystem on a background thread, returns self."""
+        def build():
+            try:
+                self.get()
+            except Exception as e:
+                print("[Startup] {} failed: {}".format(self.name, e))
+        threading.Thread(target=build, name='warm-' + self.name, daemon=True).start()
+        return self
@@ -0,0 +1,47 @@
+# test_gesture_actuation.py
+
+# Regression tests for 'LevelActuator', run with: python -m pytest
+
+import time
+
+from gesture_actuation import LevelActuator, MemoryLevel
+
+
+def settle(actuator, level, timeout=2.0):
+    """waits until 'actuator' has applied 'level', returns the backend level."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with actuator.cond:
+            if actuator.pending is None and actuator.level is not None and abs(actuator.level - level) < 1e-9:
+                break
+        time.sleep(0.005)
+    return actuator.backend.value
+
+
+def test_relative_change_during_fade_keeps_the_rest_of_the_fade():
+    actuator = LevelActuator(MemoryLevel(0.5), min_interval=0.0, fade_step=0.02, fade_interval=0.01)
+    actuator.change_level(0.3)
+    # let the fade towards 0.8 start, then change again before it ends
+    deadline = time.monotonic() + 2.0
+    while not actuator.backend.history and time.monotonic() < deadline:
+        time.sleep(0.001)
+    actuator.change_level(0.1)
+    assert abs(settle(actuator, 0.9) - 0.9) < 1e-9
+    actuator.close()
+
+
+def test_relative_changes_are_clamped():
+    actuator = LevelActuator(MemoryLevel(0.9), min_interval=0.0)
+    actuator.change_level(0.5)
+    assert settle(actuator, 1.0) == 1.0
+    actuator.change_level(-0.2)
+    assert abs(settle(actuator, 0.8) - 0.8) < 1e-9
+    actuator.close()
+
+
+def test_set_level_replaces_pending_changes():
+    actuator = LevelActuator(MemoryLevel(0.5), min_interval=0.0)
+    actuator.set_level(0.2)
+    actuator.change_level(0.1)
+    assert abs(settle(actuator, 0.3) - 0.3) < 1e-9
+    actuator.close()
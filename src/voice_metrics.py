@@ -0,0 +1,389 @@
+# voice_metrics.py
+
+# Per utterance latency tracing for Aura's voice pipeline.
+# Every command gets a 'Trace' when it enters the pipeline (end of speech
+# detected, or text typed) which collects the time spent per stage:
+#   wake        local wake word check
+#   recognize   speech recognition, 'asr_<backend>' has every backend call
+#   queue       waiting for the command thread
+#   route       intent matching
+#   handler     command handler, or 'llm' for the conversational fallback
+#   llm_first   LLM request until the first spoken chunk
+#   first_reply start of the trace until the first 'reply'
+#   tts_start   first 'reply' until its audio started
+#   response    start of the trace until audio started, the number to set
+#               command latency SLOs on
+#   command     whole command on the command thread
+# Finished traces are queued and folded into log bucketed histograms (p50 /
+# p95 / p99 within ~2.5%) off the command thread, optionally written as
+# JSON lines into a rotating file, and are served as
+# Prometheus text on http://127.0.0.1:PORT/metrics (JSON on /metrics.json)
+# by a small Flask app on a background thread.
+#
+# Usage: python voice_metrics.py [--port P]   (serves generated traces)
+
+import argparse
+import itertools
+import json
+import logging
+import logging.handlers
+import math
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Prometheus histogram bounds, ms
+BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2000, 3000, 5000, 10000)
+
+
+class Histogram:
+    """
+    Latency histogram with logarithmic buckets, constant memory and O(1) 'record'.
+
+    Attributes
+    ----------
+    count : int
+    total : float
+        sum of the recorded values, ms.
+    max : float
+    """
+
+    MIN_MS = 0.01
+    GROWTH = 1.05  # bucket width, relative error of a percentile <= 2.5%
+    LOG_GROWTH = math.log(GROWTH)
+    SIZE = int(math.log(1e6 / MIN_MS) / math.log(GROWTH)) + 2  # up to ~17 minutes
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * self.SIZE
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms):
+        index = int(math.log(ms / self.MIN_MS) / self.LOG_GROWTH) + 1 if ms > self.MIN_MS else 0
+        self.counts[min(index, self.SIZE - 1)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, q):
+        """returns the 'q' (0-1) quantile, 0.0 if empty."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                # geometric middle of the bucket
+                return min(self.MIN_MS * self.GROWTH ** (index - 0.5), self.max) if index else self.MIN_MS
+        return self.max
+
+    def cumulative(self, bound):
+        """returns the no. of values up to 'bound' ms, to bucket precision."""
+        last = int(math.log(bound / self.MIN_MS) / self.LOG_GROWTH) + 1
+        return sum(self.counts[:min(last, self.SIZE)])
+
+    def summary(self):
+        return {'count': self.count, 'mean': self.total / self.count if self.count else 0.0,
+                'p50': self.percentile(0.5), 'p95': self.percentile(0.95),
+                'p99': self.percentile(0.99), 'max': self.max}
+
+
+class Span:
+    """Context manager adding the time spent in the with block to a trace stage."""
+
+    __slots__ = ('trace', 'stage', 'start')
+
+    def __init__(self, trace, stage):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.trace.add(self.stage, (time.perf_counter() - self.start) * 1000.0)
+
+
+class Trace:
+    """
+    Stages of one command.
+
+    Attributes
+    ----------
+    id : int
+    source : str
+        'voice' or 'typed'.
+    start : float
+        'time.perf_counter' the command entered the pipeline.
+    posted : float or None
+        when it was handed to the command thread.
+    stages : dict
+        stage -> ms.
+    """
+
+    __slots__ = ('id', 'source', 'start', 'posted', 'stages', 'replied', 'audio', 'done')
+
+    def __init__(self, id, source, start):
+        self.id = id
+        self.source = source
+        self.start = start
+        self.posted = None
+        self.stages = {}
+        self.replied = None  # time of the first reply
+        self.audio = None  # True once its audio started, False if it was dropped
+        self.done = False
+
+    def add(self, stage, ms):
+        self.stages[stage] = self.stages.get(stage, 0.0) + ms
+
+    def span(self, stage):
+        """returns context manager adding the time spent in the with block to 'stage'."""
+        return Span(self, stage)
+
+
+class VoiceMetrics:
+    """
+    Collects finished traces into per stage histograms.
+
+    Attributes
+    ----------
+    histograms : dict
+        stage -> Histogram.
+    finished : queue.SimpleQueue
+        finished traces not in the histograms yet, see 'drain'.
+    log : logging.Logger or None
+        JSON lines trace log, rotated at 'max_bytes'.
+    stats : dict
+        'traces' finished and 'dropped' (first reply never played, e.g.
+        interrupted).
+    """
+
+    def __init__(self, path=None, max_bytes=1024 * 1024, backups=3, drain_s=1.0):
+        self.histograms = {}
+        self.finished = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.drain_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.ids = itertools.count(1)
+        self.local = threading.local()
+        self.server = None
+        self.stats = {'traces': 0, 'dropped': 0}
+        self.log = None
+        if path is not None:
+            self.log = logging.getLogger('aura.trace.{}'.format(id(self)))
+            self.log.propagate = False
+            self.log.setLevel(logging.INFO)
+            self.log.addHandler(logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8', delay=True))
+        self.drain_s = drain_s
+        threading.Thread(target=self.run, name='metrics-drain', daemon=True).start()
+
+    def trace(self, source, start=None):
+        """returns a new trace starting at 'start' (default now)."""
+        return Trace(next(self.ids), source, start if start is not None else time.perf_counter())
+
+    @property
+    def current(self):
+        """trace of the command running on this thread, None outside commands."""
+        return getattr(self.local, 'trace', None)
+
+    @contextmanager
+    def command(self, trace):
+        """runs a command of 'trace' on this thread, see 'span' / 'replying'."""
+        start = time.perf_counter()
+        if trace.posted is not None:
+            trace.add('queue', (start - trace.posted) * 1000.0)
+        self.local.trace = trace
+        try:
+            yield trace
+        finally:
+            self.local.trace = None
+            trace.add('command', (time.perf_counter() - start) * 1000.0)
+            with self.lock:
+                trace.done = True
+                finished = trace.replied is None or trace.audio is not None
+            if finished:
+                self.finish(trace)
+
+    def span(self, stage):
+        """returns context manager adding the time in the with block to 'stage' of the current trace."""
+        trace = getattr(self.local, 'trace', None)
+        return nullcontext() if trace is None else Span(trace, stage)
+
+    def add(self, stage, ms):
+        """adds 'ms' to 'stage' of the current trace, records it directly outside commands."""
+        trace = self.current
+        if trace is None:
+            self.record(stage, ms)
+        else:
+            trace.add(stage, ms)
+
+    def replying(self):
+        """
+        called by 'reply'; returns the callback for when its audio starts,
+        for the first reply of the current trace, else None.
+        """
+        trace = self.current
+        if trace is None or trace.replied is not None:
+            return None
+        trace.replied = time.perf_counter()
+        trace.add('first_reply', (trace.replied - trace.start) * 1000.0)
+        return lambda started: self.audio_started(trace, started)
+
+    def audio_started(self, trace, started):
+        """'started' is the 'time.perf_counter' audio started, None if it was dropped."""
+        with self.lock:
+            if started is None:
+                trace.audio = False
+                self.stats['dropped'] += 1
+            else:
+                trace.audio = True
+                trace.add('tts_start', (started - trace.replied) * 1000.0)
+                trace.add('response', (started - trace.start) * 1000.0)
+            finished = trace.done
+        if finished:
+            self.finish(trace)
+
+    def record(self, stage, ms):
+        """records a value outside of traces."""
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.record(ms)
+
+    def finish(self, trace):
+        self.finished.put((time.time(), trace))
+
+    def drain(self):
+        """folds the finished traces into the histograms and writes them to the log."""
+        with self.drain_lock:
+            traces = []
+            while True:
+                try:
+                    traces.append(self.finished.get_nowait())
+                except queue.Empty:
+                    break
+            with self.lock:
+                for _, trace in traces:
+                    for stage, ms in trace.stages.items():
+                        histogram = self.histograms.get(stage)
+                        if histogram is None:
+                            histogram = self.histograms[stage] = Histogram()
+                        histogram.record(ms)
+                self.stats['traces'] += len(traces)
+            if self.log is not None:
+                for finished, trace in traces:
+                    self.log.info(json.dumps({'id': trace.id, 'source': trace.source, 'time': finished,
+                                              'stages': {k: round(v, 2) for k, v in trace.stages.items()}}))
+
+    def run(self):
+        while not self.stopped.wait(self.drain_s):
+            self.drain()
+
+    def snapshot(self):
+        """returns stage -> count, mean, p50, p95, p99 and max in ms."""
+        self.drain()
+        with self.lock:
+            return {stage: histogram.summary() for stage, histogram in sorted(self.histograms.items())}
+
+    def prometheus(self):
+        """returns the histograms in the Prometheus text format."""
+        lines = ['# HELP aura_stage_ms Time per voice pipeline stage in ms.',
+                 '# TYPE aura_stage_ms histogram']
+        self.drain()
+        with self.lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                for bound in BOUNDS_MS:
+                    lines.append('aura_stage_ms_bucket{{stage="{}",le="{}"}} {}'.format(
+                        stage, bound, histogram.cumulative(bound)))
+                lines.append('aura_stage_ms_bucket{{stage="{}",le="+Inf"}} {}'.format(stage, histogram.count))
+                lines.append('aura_stage_ms_sum{{stage="{}"}} {:.3f}'.format(stage, histogram.total))
+                lines.append('aura_stage_ms_count{{stage="{}"}} {}'.format(stage, histogram.count))
+            lines.append('# TYPE aura_traces_total counter')
+            lines.append('aura_traces_total {}'.format(self.stats['traces']))
+            lines.append('# TYPE aura_traces_dropped_total counter')
+            lines.append('aura_traces_dropped_total {}'.format(self.stats['dropped']))
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host='127.0.0.1'):
+        """serves /metrics and /metrics.json on a daemon thread, returns self."""
+        def run():
+            try:
+                from flask import Flask, Response, jsonify
+                from werkzeug.serving import make_server
+            except ImportError as e:
+                print("[Metrics] flask not available, no metrics endpoint:", e)
+                return
+            app = Flask('aura_metrics')
+            app.add_url_rule('/metrics', 'metrics',
+                             lambda: Response(self.prometheus(), mimetype='text/plain; version=0.0.4'))
+            app.add_url_rule('/metrics.json', 'metrics_json',
+                             lambda: jsonify(stages=self.snapshot(), **self.report()))
+            try:
+                self.server = make_server(host, port, app, threaded=True)
+            except OSError as e:
+                print("[Metrics] can't listen on {}:{}: {}".format(host, port, e))
+                return
+            self.server.serve_forever()
+        threading.Thread(target=run, name='metrics', daemon=True).start()
+        return self
+
+    def report(self):
+        """returns a copy of 'stats'."""
+        self.drain()
+        with self.lock:
+            return dict(self.stats)
+
+    def print_report(self):
+        print("[Metrics] {:<12} {:>6} {:>9} {:>9} {:>9} {:>9}".format('stage', 'count', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms'))
+        for stage, s in self.snapshot().items():
+            print("[Metrics] {:<12} {:>6} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+                stage, s['count'], s['p50'], s['p95'], s['p99'], s['max']))
+
+    def close(self):
+        self.stopped.set()
+        self.drain()
+        if self.server is not None:
+            self.server.shutdown()
+        if self.log is not None:
+            for handler in self.log.handlers:
+                handler.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve generated voice traces on a metrics endpoint.')
+    parser.add_argument('--port', type=int, default=27006)
+    parser.add_argument('--count', type=int, default=200)
+    args = parser.parse_args()
+
+    metrics = VoiceMetrics()
+    rng = random.Random(0)
+    for _ in range(args.count):
+        trace = metrics.trace('voice', time.perf_counter() - rng.uniform(0.3, 0.6))
+        trace.add('recognize', rng.lognormvariate(6.3, 0.4))
+        trace.posted = time.perf_counter()
+        with metrics.command(trace):
+            with metrics.span('route'):
+                pass
+            started = metrics.replying()
+        started(time.perf_counter() + rng.uniform(0.01, 0.2))
+    metrics.print_report()
+    metrics.serve(args.port)
+    print("[Metrics] http://127.0.0.1:{}/metrics, Ctrl+C to stop".format(args.port))
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        metrics.close()
+
+
+if __name__ == '__main__':
+    main()
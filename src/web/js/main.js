@@ -13,31 +13,167 @@ document.getElementById("userInput").addEventListener("keyup", function (event)
 
 eel.expose(addUserMsg);
 eel.expose(addAppMsg);
+eel.expose(addMessages);
 
+//Messages are rendered in batches, once per animation frame, and only a
+//window of them is kept in the DOM. The full transcript stays in
+//'transcript'; older / newer messages are swapped in while scrolling.
+var WINDOW = 150;       //message nodes kept while following new messages
+var PAGE = 50;          //messages loaded when scrolling to the window edge
+var STICK_PX = 30;      //distance from the bottom that still follows new messages
+var CLASSES = {"user": "message from", "app": "message to"};
+var ANIMATIONS = {"user": " ready rtol", "app": " ready ltor"};
+
+var messages = document.getElementById("messages");
+var transcript = [];    //[kind, html] of every message, kind is "user" or "app"
+var pending = [];       //messages not rendered yet
+var nodes = [];         //message nodes in the DOM, in order
+var first = 0;          //transcript index of nodes[0]
+var frameRequested = false;
+var scrollRequested = false;
 
 function addUserMsg(msg) {
-    element = document.getElementById("messages");
-    element.innerHTML += '<div class="message from ready rtol">' + msg + '</div>';
-    element.scrollTop = element.scrollHeight - element.clientHeight - 15;
-    //add delay for animation to complete and then modify class to => "message from"
-    index = element.childElementCount - 1;
-    setTimeout(changeClass.bind(null, element, index, "message from"), 500);
+    queueMessage("user", msg);
 }
 
 function addAppMsg(msg) {
-    element = document.getElementById("messages");
-    element.innerHTML += '<div class="message to ready ltor">' + msg + '</div>';
-    element.scrollTop = element.scrollHeight - element.clientHeight - 15;
-    //add delay for animation to complete and then modify class to => "message to"
-    index = element.childElementCount - 1;
-    setTimeout(changeClass.bind(null, element, index, "message to"), 500);
+    queueMessage("app", msg);
+}
+
+//batch of [kind, html] from app.ChatBot
+function addMessages(batch) {
+    for (var i = 0; i < batch.length; i++) {
+        queueMessage(batch[i][0], batch[i][1]);
+    }
+}
+
+function queueMessage(kind, html) {
+    pending.push([kind, html]);
+    if (!frameRequested) {
+        frameRequested = true;
+        requestAnimationFrame(flush);
+    }
+}
+
+function atBottom() {
+    return messages.scrollHeight - messages.scrollTop - messages.clientHeight <= STICK_PX;
+}
+
+function makeNode(message, animate) {
+    var node = document.createElement("div");
+    node.className = CLASSES[message[0]] + (animate ? ANIMATIONS[message[0]] : "");
+    node.innerHTML = message[1];
+    return node;
 }
 
-function changeClass(element, index, newClass) {
-    console.log(newClass +' '+ index);
-    element.children[index].className = newClass;
+//appends transcript[start, end) after the last node
+function append(start, end, animate) {
+    var fragment = document.createDocumentFragment();
+    for (var i = start; i < end; i++) {
+        var node = makeNode(transcript[i], animate);
+        fragment.appendChild(node);
+        nodes.push(node);
+    }
+    messages.appendChild(fragment);
+}
+
+function trimTop(count) {
+    for (var i = 0; i < count; i++) {
+        nodes[i].remove();
+    }
+    if (count > 0) {
+        nodes = nodes.slice(count);
+        first += count;
+    }
 }
 
+function trimBottom(count) {
+    for (var i = nodes.length - count; i < nodes.length; i++) {
+        nodes[i].remove();
+    }
+    if (count > 0) {
+        nodes = nodes.slice(0, nodes.length - count);
+    }
+}
+
+function flush() {
+    frameRequested = false;
+    var follow = atBottom();
+    var tail = first + nodes.length == transcript.length;
+    var start = transcript.length;
+    for (var i = 0; i < pending.length; i++) {
+        transcript.push(pending[i]);
+    }
+    pending = [];
+    if (!tail) {
+        //reading older messages, new ones are loaded when scrolling down
+        return;
+    }
+    var end = transcript.length;
+    if (follow) {
+        //no more than the last WINDOW messages can stay anyway
+        start = Math.max(start, end - WINDOW);
+        if (start > first + nodes.length) {
+            trimTop(nodes.length);
+            first = start;
+        }
+    } else {
+        end = Math.min(end, first + 2 * WINDOW);
+    }
+    append(start, end, true);
+    if (follow) {
+        trimTop(nodes.length - WINDOW);
+        messages.scrollTop = messages.scrollHeight;
+    }
+}
+
+function loadOlder() {
+    var start = Math.max(0, first - PAGE);
+    var fragment = document.createDocumentFragment();
+    var added = [];
+    for (var i = start; i < first; i++) {
+        var node = makeNode(transcript[i], false);
+        fragment.appendChild(node);
+        added.push(node);
+    }
+    var height = messages.scrollHeight;
+    messages.insertBefore(fragment, nodes.length ? nodes[0] : null);
+    nodes = added.concat(nodes);
+    first = start;
+    //keep the messages being read in place
+    messages.scrollTop += messages.scrollHeight - height;
+    trimBottom(nodes.length - 2 * WINDOW);
+}
+
+function loadNewer() {
+    var start = first + nodes.length;
+    append(start, Math.min(transcript.length, start + PAGE), false);
+    var height = messages.scrollHeight;
+    trimTop(nodes.length - 2 * WINDOW);
+    messages.scrollTop -= height - messages.scrollHeight;
+}
+
+function onScroll() {
+    scrollRequested = false;
+    if (messages.scrollTop < 2 * STICK_PX && first > 0) {
+        loadOlder();
+    } else if (atBottom() && first + nodes.length < transcript.length) {
+        loadNewer();
+    }
+}
+
+messages.addEventListener("scroll", function () {
+    if (!scrollRequested) {
+        scrollRequested = true;
+        requestAnimationFrame(onScroll);
+    }
+}, {passive: true});
+
+//after the slide in animation the message keeps its plain class
+messages.addEventListener("animationend", function (event) {
+    event.target.classList.remove("ready", "rtol", "ltor");
+});
+
 
 function getUserInput() {
     element = document.getElementById("userInput");
@@ -46,4 +182,4 @@ function getUserInput() {
         element.value = "";
         eel.getUserInput(msg);
     }
-}
\ No newline at end of file
+}